@@ -0,0 +1,118 @@
+# backend/ai_services.py
+"""
+Lapisan import malas (lazy) untuk stack AI JemberTrip.
+
+langchain_chroma, langchain_huggingface, langchain_groq dan sklearn baru
+di-import saat pertama kali dipakai (umumnya di thread warm-up), bukan saat
+`import main`. Durasi setiap import & fase startup dicatat untuk laporan.
+"""
+import os
+import time
+import logging
+import importlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+
+logger = logging.getLogger("uvicorn")
+
+# Nama model LLM yang dipakai chatbot & generator deskripsi
+NAMA_MODEL_LLM = "llama-3.3-70b-versatile"
+# Backend embedding: "torch" (HuggingFaceEmbeddings) atau "onnx" (int8, lihat embedding_backends.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+
+IMPORT_TIMINGS: Dict[str, float] = {}
+PHASE_TIMINGS: Dict[str, float] = {}
+_timing_lock = threading.Lock()
+
+
+def lazy_import(module_name: str):
+    """Import modul saat dibutuhkan dan catat lama import pertamanya."""
+    if module_name in IMPORT_TIMINGS:
+        return importlib.import_module(module_name)
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    elapsed = time.perf_counter() - start
+    with _timing_lock:
+        IMPORT_TIMINGS.setdefault(module_name, elapsed)
+    return module
+
+
+@contextmanager
+def timed_phase(name: str):
+    """Catat durasi satu fase startup (mis. load model, buka Vector DB)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _timing_lock:
+            PHASE_TIMINGS[name] = time.perf_counter() - start
+
+
+def startup_report() -> Dict[str, List[Dict]]:
+    """Laporan durasi import & fase startup, diurutkan dari yang paling lama."""
+    with _timing_lock:
+        imports = sorted(IMPORT_TIMINGS.items(), key=lambda kv: kv[1], reverse=True)
+        phases = list(PHASE_TIMINGS.items())
+    return {
+        "imports": [{"module": m, "seconds": round(t, 3)} for m, t in imports],
+        "phases": [{"phase": p, "seconds": round(t, 3)} for p, t in phases],
+    }
+
+
+def log_startup_report():
+    report = startup_report()
+    logger.info("⏱️ Laporan waktu startup:")
+    for row in report["imports"]:
+        logger.info(f"   import {row['module']:<28} {row['seconds']:>7.3f}s")
+    for row in report["phases"]:
+        logger.info(f"   fase   {row['phase']:<28} {row['seconds']:>7.3f}s")
+
+
+# ==========================================
+#           FACTORY LAYANAN AI
+# ==========================================
+def create_embedding_model(model_name: str):
+    """Buat model embedding sesuai env `EMBEDDING_BACKEND` ("torch" default, atau "onnx")."""
+    if EMBEDDING_BACKEND == "onnx":
+        try:
+            backends = lazy_import("embedding_backends")
+            return backends.OnnxInt8Embeddings(model_name)
+        except ImportError as e:
+            logger.warning(f"⚠️ Backend ONNX tidak tersedia ({e}), kembali ke PyTorch.")
+    HuggingFaceEmbeddings = lazy_import("langchain_huggingface").HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=model_name, model_kwargs={'device': 'cpu'})
+
+
+def with_query_cache(model):
+    """Bungkus model embedding dengan cache LRU untuk embed_query."""
+    backends = lazy_import("embedding_backends")
+    return backends.CachedQueryEmbeddings(
+        model,
+        maxsize=int(os.getenv("QUERY_EMBED_CACHE_SIZE", "1024")),
+        ttl=float(os.getenv("QUERY_EMBED_CACHE_TTL", "0")),
+    )
+
+
+def embedding_model_key(model) -> str:
+    """Identitas model untuk kunci cache embedding (backend berbeda = vektor berbeda)."""
+    return getattr(model, "model_name", str(model))
+
+
+def open_vector_db(persist_directory: str, embedding_function):
+    Chroma = lazy_import("langchain_chroma").Chroma
+    return Chroma(persist_directory=persist_directory, embedding_function=embedding_function)
+
+
+def create_groq_llm(api_key: str, temperature: float = 0.7, **kwargs):
+    """ChatGroq; kwargs diteruskan (mis. max_retries, http_client dari groq_pool)."""
+    ChatGroq = lazy_import("langchain_groq").ChatGroq
+    return ChatGroq(temperature=temperature, model_name=NAMA_MODEL_LLM, api_key=api_key, **kwargs)
+
+
+def chat_prompt_template():
+    return lazy_import("langchain_core.prompts").ChatPromptTemplate
+
+
+def document_class():
+    return lazy_import("langchain_core.documents").Document
@@ -0,0 +1,43 @@
+import time
+import numpy as np
+from scipy.sparse import random as sparse_random
+from sklearn.metrics.pairwise import cosine_similarity
+
+import recommender
+
+# Benchmark skala CF: cosine_similarity user×user penuh vs skor KNN satu user (sparse).
+# Jalankan dari folder backend:  python benchmark_cf_scaling.py
+N_ITEMS = 56
+CLICKS_PER_USER = 8
+USER_COUNTS = [1_000, 10_000, 100_000, 300_000]
+MAX_DENSE_USERS = 10_000   # di atas ini matriks U×U tidak muat di memori
+
+def print_markdown_table(results, headers):
+    print("| " + " | ".join(headers) + " |")
+    print("| " + " | ".join([":---:" for _ in headers]) + " |")
+    for row in results:
+        print("| " + " | ".join([str(row[h]) for h in headers]) + " |")
+
+def timed_ms(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t) * 1000)
+    return np.median(times)
+
+results = []
+for n_users in USER_COUNTS:
+    R = sparse_random(n_users, N_ITEMS, density=CLICKS_PER_USER / N_ITEMS, format="csr", random_state=42)
+    R.data[:] = np.ceil(R.data * 3)
+    norms = recommender.row_norms(R)
+    row = n_users // 2
+
+    sparse_ms = timed_ms(lambda: recommender.top_k_indices(recommender.user_knn_scores(R, row, 30, norms), 6))
+    if n_users <= MAX_DENSE_USERS:
+        dense_ms = f"{timed_ms(lambda: cosine_similarity(R.toarray())[row], repeat=1):.1f} ms"
+    else:
+        dense_ms = "n/a (U×U > RAM)"
+    results.append({'Jumlah User': f"{n_users:,}", 'Dense user×user': dense_ms, 'Sparse 1 user': f"{sparse_ms:.2f} ms"})
+
+print_markdown_table(results, ['Jumlah User', 'Dense user×user', 'Sparse 1 user'])
@@ -0,0 +1,80 @@
+# backend/benchmark_chat_concurrency.py
+"""
+Load test: latensi route sync lain (list-wisata, healthz) selama N chat
+/api/v1/chat sedang menunggu LLM. Dengan chat async, thread pool FastAPI
+tidak tersita sehingga latensi probe tetap rendah walau chat menumpuk.
+
+Butuh backend yang sudah menyala (status /readyz = ready) dan token user:
+    BENCH_URL=http://localhost:8000 BENCH_TOKEN=<jwt> python benchmark_chat_concurrency.py
+(atau BENCH_USERNAME + BENCH_PASSWORD untuk login otomatis)
+"""
+import os
+import time
+import asyncio
+
+import aiohttp
+import numpy as np
+
+BASE_URL = os.getenv("BENCH_URL", "http://localhost:8000").rstrip("/")
+CONCURRENT_CHATS = [0, 10, 50, 100]
+PROBE_ROUTES = ["/api/v1/list-wisata?view=card", "/healthz"]
+PROBES_PER_ROUTE = 40
+QUESTION = "Rekomendasi pantai yang bagus di Jember dong"
+
+def print_markdown_table(results, headers):
+    print("| " + " | ".join(headers) + " |")
+    print("| " + " | ".join([":---:" for _ in headers]) + " |")
+    for row in results:
+        print("| " + " | ".join([str(row[h]) for h in headers]) + " |")
+
+async def get_token(session):
+    if os.getenv("BENCH_TOKEN"):
+        return os.getenv("BENCH_TOKEN")
+    async with session.post(f"{BASE_URL}/api/auth/login", json={
+        "username": os.environ["BENCH_USERNAME"], "password": os.environ["BENCH_PASSWORD"]
+    }) as r:
+        r.raise_for_status()
+        return (await r.json())["access_token"]
+
+async def one_chat(session, headers):
+    start = time.perf_counter()
+    async with session.post(f"{BASE_URL}/api/v1/chat", json={"question": QUESTION}, headers=headers) as r:
+        await r.read()
+        return r.status, time.perf_counter() - start
+
+async def probe(session, route):
+    """Probe berurutan (bukan paralel) agar yang terukur adalah antrean di server."""
+    latencies = []
+    for _ in range(PROBES_PER_ROUTE):
+        start = time.perf_counter()
+        async with session.get(f"{BASE_URL}{route}") as r:
+            await r.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+async def run_level(session, headers, n_chats):
+    chats = [asyncio.create_task(one_chat(session, headers)) for _ in range(n_chats)]
+    await asyncio.sleep(0.2 if n_chats else 0)  # beri waktu chat masuk ke server dulu
+    probes = await asyncio.gather(*[probe(session, route) for route in PROBE_ROUTES])
+    chat_results = await asyncio.gather(*chats)
+    latencies = np.concatenate(probes)
+    ok = sum(1 for status, _ in chat_results if status == 200)
+    return {
+        'Chat Paralel': n_chats,
+        'Probe p50': f"{np.percentile(latencies, 50):.1f} ms",
+        'Probe p95': f"{np.percentile(latencies, 95):.1f} ms",
+        'Probe Max': f"{latencies.max():.1f} ms",
+        'Chat Sukses': f"{ok}/{n_chats}",
+        'Chat p50': f"{np.percentile([d for _, d in chat_results], 50):.2f} s" if chat_results else "-",
+    }
+
+async def main():
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=600)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        headers = {"Authorization": f"Bearer {await get_token(session)}"}
+        results = [await run_level(session, headers, n) for n in CONCURRENT_CHATS]
+    print_markdown_table(results, ['Chat Paralel', 'Probe p50', 'Probe p95', 'Probe Max', 'Chat Sukses', 'Chat p50'])
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+# backend/benchmark_cold_start.py
+"""
+Mengukur cold-start backend: lama `import main`, RSS proses setelah import,
+dan waktu sampai request pertama (/healthz) dilayani uvicorn.
+
+Jalankan dari folder backend:  python benchmark_cold_start.py
+"""
+import os
+import sys
+import time
+import subprocess
+import urllib.request
+
+PORT = int(os.getenv("BENCH_PORT", "8765"))
+
+IMPORT_SNIPPET = r"""
+import time, resource
+t = time.perf_counter()
+import main
+elapsed = time.perf_counter() - t
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+heavy = [m for m in ("langchain_chroma", "langchain_huggingface", "langchain_groq", "sklearn", "torch") if m in __import__("sys").modules]
+print(f"{elapsed:.3f}|{rss_mb:.1f}|{','.join(heavy) or '-'}")
+"""
+
+
+def measure_import():
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+    elapsed, rss, heavy = out.stdout.strip().splitlines()[-1].split("|")
+    return float(elapsed), float(rss), heavy
+
+
+def measure_first_request(timeout: float = 120.0):
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{PORT}/healthz", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - start
+            except Exception:
+                time.sleep(0.05)
+        return float("nan")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    elapsed, rss, heavy = measure_import()
+    ttfr = measure_first_request()
+    print("| Metrik | Nilai |")
+    print("| :---: | :---: |")
+    print(f"| Waktu `import main` | {elapsed:.3f} s |")
+    print(f"| Max RSS setelah import | {rss:.1f} MB |")
+    print(f"| Modul AI ikut ter-import | {heavy} |")
+    print(f"| Time-to-first-request (/healthz) | {ttfr:.3f} s |")
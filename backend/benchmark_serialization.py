@@ -0,0 +1,78 @@
+import time
+import gzip
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import fast_response
+from fast_response import FastJSONResponse
+
+# Before/after serialisasi respons besar: encoder default FastAPI (jsonable_encoder
+# + json.dumps) vs FastJSONResponse (orjson langsung), plus ukuran di kabel
+# tanpa kompresi / gzip / br.  Jalankan dari folder backend:  python benchmark_serialization.py
+PATH_CSV_DATA = "data/destinasi_final.csv"
+ACTIVITY_COUNTS = [1_000, 10_000]
+REPEAT = 20
+
+def print_markdown_table(results, headers):
+    print("| " + " | ".join(headers) + " |")
+    print("| " + " | ".join([":---:" for _ in headers]) + " |")
+    for row in results:
+        print("| " + " | ".join([str(row[h]) for h in headers]) + " |")
+
+def timed_ms(fn, repeat=REPEAT):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t) * 1000)
+    return np.median(times)
+
+def fake_activities(n):
+    now = datetime(2026, 1, 1)
+    return [{
+        "id": i, "user_display": f"user{i % 300} ({i % 300})",
+        "wisata_display": f"Wisata {i % 56} ({i % 56})", "waktu": now - timedelta(minutes=i)
+    } for i in range(n)]
+
+def fake_report(n):
+    rng = random.Random(42)
+    users = {}
+    for a in fake_activities(n):
+        uid = rng.randrange(300)
+        users.setdefault(uid, []).append({"id": a["id"], "wisata_id": str(a["id"] % 56), "wisata_name": a["wisata_display"], "timestamp": a["waktu"]})
+    return [{"user_info": {"id": uid, "username": f"user{uid}", "full_name": f"User {uid}"}, "total_clicks": len(h), "history": h}
+            for uid, h in users.items()]
+
+payloads = {}
+df = pd.read_csv(PATH_CSV_DATA, dtype=str).fillna("Tidak ada data")
+rows = df.to_dict("records")
+payloads[f"list-wisata ({len(rows)} destinasi)"] = {"status": "success", "data": rows}
+payloads["list-wisata view=card"] = {"status": "success", "data": [{f: r.get(f) for f in ("id", "nama_wisata", "kategori", "alamat", "gambar", "harga_tiket", "rating")} for r in rows]}
+for n in ACTIVITY_COUNTS:
+    payloads[f"activities ({n:,} klik)"] = {"status": "success", "data": fake_activities(n)}
+    payloads[f"user-activity-report ({n:,} klik)"] = {"status": "success", "data": fake_report(n)}
+
+results = []
+for name, content in payloads.items():
+    default_ms = timed_ms(lambda: JSONResponse(jsonable_encoder(content)))
+    fast_ms = timed_ms(lambda: FastJSONResponse(content))
+    body = FastJSONResponse(content).body
+    gzip_ms = timed_ms(lambda: gzip.compress(body, compresslevel=fast_response.GZIP_LEVEL), repeat=5)
+    row = {
+        'Payload': name, 'Default FastAPI': f"{default_ms:.2f} ms", 'orjson': f"{fast_ms:.2f} ms",
+        'Speed-up': f"{default_ms / fast_ms:.1f}x", 'Tanpa Kompresi': f"{len(JSONResponse(jsonable_encoder(content)).body) / 1024:.1f} KB",
+        'gzip': f"{len(gzip.compress(body, compresslevel=fast_response.GZIP_LEVEL)) / 1024:.1f} KB ({gzip_ms:.2f} ms)", 'br': "-",
+    }
+    if fast_response.brotli is not None:
+        br_ms = timed_ms(lambda: fast_response.compress(body, "br"), repeat=5)
+        row['br'] = f"{len(fast_response.compress(body, 'br')) / 1024:.1f} KB ({br_ms:.2f} ms)"
+    results.append(row)
+
+print_markdown_table(results, ['Payload', 'Default FastAPI', 'orjson', 'Speed-up', 'Tanpa Kompresi', 'gzip', 'br'])
+if fast_response.brotli is None:
+    print("\n(brotli tidak terpasang: kolom br dilewati — pip install brotli)")
@@ -0,0 +1,157 @@
+# backend/cache_utils.py
+"""Cache LRU in-memory (thread-safe) dengan TTL opsional dan penghitung hit/miss."""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class RecommendationCache:
+    """Cache hasil rekomendasi per (jenis, user_id), berlaku untuk satu versi model
+    dan satu versi snapshot katalog.
+
+    Entri user dihapus saat ia mencatat klik baru; `bump_version()` membatalkan
+    semua entri sekaligus (model CF di-refresh / embedding berubah). Entri dari
+    versi katalog lama otomatis dianggap miss.
+    """
+
+    def __init__(self, kinds=("personal", "hybrid"), maxsize: int = 10000, ttl: Optional[float] = None):
+        self.kinds = tuple(kinds)
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, user_id: int, catalog_version: int = 0) -> Any:
+        entry = self._cache.get((kind, user_id))
+        if entry is not None and entry[:2] == (self.version, catalog_version):
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        return None
+
+    def set(self, kind: str, user_id: int, value: Any, version: int, catalog_version: int = 0):
+        """Simpan hasil yang dihitung pada `version` (diambil sebelum menghitung)."""
+        if version == self.version:
+            self._cache.set((kind, user_id), (version, catalog_version, value))
+
+    def invalidate_user(self, user_id: int):
+        for kind in self.kinds:
+            self._cache.pop((kind, user_id))
+
+    def bump_version(self):
+        with self._lock:
+            self.version += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "version": self.version,
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "ttl_seconds": self._cache.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class RetrievalCache:
+    """Cache hasil pencarian Vector DB: (query ternormalisasi, filter, k) -> daftar
+    (id dokumen, skor). Hanya id & skor yang disimpan; isi dokumen diambil ulang
+    per id, sehingga hit melewati embedding query dan pencarian HNSW.
+
+    Entri berlaku untuk satu versi index; `version` berubah saat dokumen di
+    Vector DB berubah (lewat server atau `python vector_sync.py`) dan entri versi
+    lama otomatis dianggap miss. Penulisan Chroma di luar vector_sync tidak
+    terdeteksi; untuk itu entri juga kedaluwarsa setelah `ttl` detik.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = None):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str, k: int, filter: Optional[dict] = None) -> tuple:
+        # Normalisasi sama dengan cache embed_query (tokenizer MiniLM uncased)
+        return (" ".join(str(query).lower().split()), k, tuple(sorted((filter or {}).items())))
+
+    def get(self, key: tuple, version: int) -> Any:
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def set(self, key: tuple, hits: list, version: int):
+        """Simpan hasil yang dihitung pada `version` (diambil sebelum mencari)."""
+        self._cache.set(key, (version, tuple(hits)))
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "ttl_seconds": self._cache.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self._cache.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
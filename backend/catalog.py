@@ -0,0 +1,212 @@
+# backend/catalog.py
+"""
+Katalog destinasi wisata di memori dengan indeks siap pakai.
+
+Menggantikan scan linear `data_wisata_csv` per request: lookup id → baris,
+kategori → daftar id, dan proyeksi "kartu" ringkas (field yang dipakai
+frontend untuk kartu wisata) dihitung sekali setiap katalog berubah.
+
+Katalog disimpan sebagai snapshot immutable bernomor versi. Writer (endpoint
+admin) membangun snapshot baru dari salinan baris lalu menukar satu referensi
+di bawah lock; pembaca cukup mengambil `catalog.snapshot()` sekali per request
+tanpa lock dan tidak pernah melihat data setengah jadi. Baris (dict) di dalam
+snapshot tidak boleh diubah di tempat — writer selalu membuat dict baru.
+
+Sumber data katalog adalah tabel `destinasi` (models.Destinasi). CSV
+`destinasi_final.csv` tetap menjadi format pertukaran untuk pipeline data:
+lihat `import_csv()` / `export_csv()` dan tools/catalog_csv.py.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+import models
+
+# Field yang ditampilkan di kartu wisata (list, rekomendasi, batch)
+CARD_FIELDS = ("id", "nama_wisata", "kategori", "alamat", "gambar", "harga_tiket", "rating")
+
+
+class CatalogSnapshot:
+    __slots__ = ("version", "rows", "_by_id", "_positions", "_by_kategori", "_cards", "_digest")
+
+    def __init__(self, rows: Iterable[dict], version: int):
+        self.version = version
+        self.rows: Tuple[dict, ...] = tuple(r if isinstance(r["id"], str) else dict(r, id=str(r["id"])) for r in rows)
+        self._by_id: Dict[str, dict] = {r["id"]: r for r in self.rows}
+        self._positions: Dict[str, int] = {r["id"]: pos for pos, r in enumerate(self.rows)}
+        self._by_kategori: Dict[str, Tuple[str, ...]] = {}
+        for r in self.rows:
+            self._by_kategori.setdefault(r.get("kategori", ""), []).append(r["id"])
+        self._by_kategori = {k: tuple(v) for k, v in self._by_kategori.items()}
+        self._cards: Dict[str, dict] = {r["id"]: {f: r.get(f) for f in CARD_FIELDS} for r in self.rows}
+        self._digest: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, wisata_id) -> bool:
+        return str(wisata_id) in self._by_id
+
+    def get(self, wisata_id) -> Optional[dict]:
+        return self._by_id.get(str(wisata_id))
+
+    def position(self, wisata_id) -> Optional[int]:
+        return self._positions.get(str(wisata_id))
+
+    def card(self, wisata_id) -> Optional[dict]:
+        return self._cards.get(str(wisata_id))
+
+    def ids_in_kategori(self, kategori: str) -> Tuple[str, ...]:
+        return self._by_kategori.get(kategori, ())
+
+    @property
+    def digest(self) -> str:
+        """Hash isi katalog (untuk ETag). Nomor versi hanya berlaku per proses dan
+        mulai dari awal setiap restart, jadi ETag diturunkan dari isi snapshot."""
+        if self._digest is None:
+            payload = json.dumps(self.rows, sort_keys=True, default=str, ensure_ascii=False)
+            self._digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+        return self._digest
+
+    def rows_for(self, ids: Iterable[str]) -> List[dict]:
+        """Baris katalog untuk daftar id, urutan dipertahankan (id tak dikenal dilewati)."""
+        return [self._by_id[i] for i in map(str, ids) if i in self._by_id]
+
+
+class Catalog:
+    def __init__(self, rows: Iterable[dict] = ()):
+        self._write_lock = threading.Lock()
+        self._snapshot = CatalogSnapshot(rows, 0)
+        self._listeners: List[Callable[[CatalogSnapshot], None]] = []
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Versi katalog saat ini. Ambil sekali per request, lalu pakai objek itu."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def on_change(self, callback: Callable[[CatalogSnapshot], None]):
+        """Callback(snapshot baru) setiap `update()`, dijalankan di bawah lock writer
+        sebelum snapshot dipasang (mis. menyimpan ke disk). Exception = batal."""
+        self._listeners.append(callback)
+
+    def load(self, rows: Iterable[dict]) -> CatalogSnapshot:
+        """Ganti seluruh isi katalog (mis. saat startup), tanpa memanggil listener."""
+        with self._write_lock:
+            self._snapshot = CatalogSnapshot(rows, self._snapshot.version + 1)
+            return self._snapshot
+
+    def update(self, mutate: Callable[[List[dict]], List[dict]], commit: Optional[Callable[[], None]] = None,
+               rollback: Optional[Callable[[], None]] = None) -> CatalogSnapshot:
+        """Writer: `mutate(salinan daftar baris)` mengembalikan daftar baru.
+
+        Writer lain menunggu sampai snapshot baru terpasang, sehingga tidak ada
+        perubahan yang hilang. Urutan: mutate (cukup flush ke DB) -> listener ->
+        `commit()` -> snapshot dipasang. Exception di mana pun sebelum snapshot
+        dipasang memanggil `rollback()` dan membatalkan perubahan, sehingga tabel
+        tidak pernah berisi perubahan yang tidak ada di katalog/index memori.
+        """
+        with self._write_lock:
+            try:
+                snapshot = CatalogSnapshot(mutate(list(self._snapshot.rows)), self._snapshot.version + 1)
+                for callback in self._listeners:
+                    callback(snapshot)
+                if commit is not None:
+                    commit()
+            except BaseException:
+                if rollback is not None:
+                    rollback()
+                raise
+            self._snapshot = snapshot
+            return snapshot
+
+
+# ==========================================
+#   TABEL DESTINASI <-> BARIS KATALOG / CSV
+# ==========================================
+# Urutan kolom sama dengan destinasi_final.csv
+CSV_COLUMNS = [
+    "id", "nama_wisata", "kategori", "kota", "alamat", "deskripsi", "gambar", "fitur", "fitur_bersih",
+    "latitude", "longitude", "jam_buka", "jam_tutup", "rating", "telepon", "website", "harga_tiket",
+    "sumber_data", "tanggal_verifikasi", "combined_text",
+]
+EMPTY_VALUE = "Tidak ada data"
+
+
+def row_from_model(d: models.Destinasi) -> dict:
+    """Baris katalog (id string, kolom kosong diisi EMPTY_VALUE seperti fillna lama)."""
+    row = {col: getattr(d, col) for col in CSV_COLUMNS}
+    row = {k: (EMPTY_VALUE if v is None else v) for k, v in row.items()}
+    row["id"] = str(d.id)
+    return row
+
+
+def find_row(db: Session, wisata_id) -> Optional[models.Destinasi]:
+    wisata_id = str(wisata_id)
+    return db.get(models.Destinasi, int(wisata_id)) if wisata_id.isdigit() else None
+
+
+def next_position(db: Session) -> int:
+    return (db.query(func.max(models.Destinasi.position)).scalar() or 0) + 1
+
+
+def sync_id_sequence(db: Session):
+    """Postgres: majukan sequence `destinasi.id` setelah INSERT dengan id eksplisit,
+    agar INSERT berikutnya (admin add-wisata) tidak mendapat id yang sudah dipakai.
+    SQLite (AUTOINCREMENT) memperbarui sqlite_sequence sendiri."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(text(
+        "SELECT setval(pg_get_serial_sequence('destinasi', 'id'), "
+        "COALESCE((SELECT max(id) FROM destinasi), 1), (SELECT max(id) FROM destinasi) IS NOT NULL)"
+    ))
+
+
+def load_rows(db: Session) -> List[dict]:
+    rows = db.query(models.Destinasi).order_by(models.Destinasi.position, models.Destinasi.id).all()
+    return [row_from_model(d) for d in rows]
+
+
+def catalog_frame(rows) -> Optional[pd.DataFrame]:
+    """DataFrame baris katalog, bentuk yang dipakai sinkronisasi Vector DB & SBERT."""
+    if not rows:
+        return None
+    df = pd.DataFrame(list(rows)).fillna(EMPTY_VALUE)
+    df['id'] = df['id'].astype(str)
+    return df
+
+
+def import_csv(db: Session, path: str, replace: bool = False) -> int:
+    """Muat CSV ke tabel destinasi (id dari CSV dipertahankan, urutan = urutan baris)."""
+    df = pd.read_csv(path, dtype=str)
+    df = df.astype(object).where(df.notna(), None)
+    if replace:
+        db.query(models.Destinasi).delete()
+    columns = [c for c in CSV_COLUMNS if c in df.columns and c != "id"]
+    for pos, rec in enumerate(df.to_dict("records"), start=1):
+        fields = {c: rec[c] for c in columns}
+        if rec.get("id"):
+            fields["id"] = int(float(rec["id"]))
+        db.add(models.Destinasi(position=pos, **fields))
+    db.flush()
+    sync_id_sequence(db)
+    db.commit()
+    return len(df)
+
+
+def export_csv(db: Session, path: str) -> int:
+    """Tulis tabel destinasi ke CSV (urutan admin), atomik lewat file sementara."""
+    rows = db.query(models.Destinasi).order_by(models.Destinasi.position, models.Destinasi.id).all()
+    df = pd.DataFrame([{col: getattr(d, col) for col in CSV_COLUMNS} for d in rows], columns=CSV_COLUMNS)
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return len(df)
@@ -0,0 +1,116 @@
+# backend/embedding_backends.py
+"""
+Backend & pembungkus model embedding.
+
+- OnnxInt8Embeddings: all-MiniLM-L6-v2 sebagai model ONNX int8.
+- CachedQueryEmbeddings: cache LRU untuk embed_query (dipakai semua backend).
+
+Antarmukanya sama dengan `HuggingFaceEmbeddings` (embed_documents / embed_query),
+jadi bisa langsung dipakai Chroma, cache embedding, dan endpoint rekomendasi.
+Aktifkan dengan env `EMBEDDING_BACKEND=onnx`.
+
+Dependensi opsional (tidak ada di requirements.txt):
+    pip install onnxruntime optimum[exporters]
+Model di-export & dikuantisasi sekali ke `ONNX_MODEL_DIR` (default models/onnx-int8).
+"""
+import os
+import logging
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger("uvicorn")
+
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "models/onnx-int8")
+
+
+def export_quantized_model(model_name: str, output_dir: str = ONNX_MODEL_DIR) -> str:
+    """Export model HF ke ONNX lalu kuantisasi dinamis bobotnya ke int8."""
+    from optimum.exporters.onnx import main_export
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    fp32_dir = os.path.join(output_dir, "fp32")
+    int8_path = os.path.join(output_dir, "model_int8.onnx")
+    if os.path.exists(int8_path):
+        return int8_path
+
+    logger.info(f"📦 Export {model_name} ke ONNX ({fp32_dir})...")
+    main_export(model_name, output=fp32_dir, task="feature-extraction")
+    logger.info("🗜️ Kuantisasi dinamis int8...")
+    quantize_dynamic(os.path.join(fp32_dir, "model.onnx"), int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxInt8Embeddings(Embeddings):
+    """Sentence embedding (mean pooling + L2 normalize) via ONNX Runtime di CPU."""
+
+    def __init__(self, model_name: str, model_dir: str = ONNX_MODEL_DIR, batch_size: int = 32, max_length: int = 256):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = f"{model_name}@onnx-int8"
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            export_quantized_model(model_name, model_dir), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        batch = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+        )
+        feeds = {k: v.astype(np.int64) for k, v in batch.items() if k in self.input_names}
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling dengan attention mask, sama seperti modul Pooling sentence-transformers
+        mask = batch["attention_mask"][..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        out = []
+        for start in range(0, len(texts), self.batch_size):
+            out.extend(self._encode(list(texts[start:start + self.batch_size])).tolist())
+        return out
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+
+def normalize_query(text: str) -> str:
+    """Kunci cache query: huruf kecil + spasi dirapikan (tokenizer MiniLM uncased)."""
+    return " ".join(str(text).lower().split())
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """Pembungkus model embedding: `embed_query` lewat cache LRU bersama.
+
+    Dipakai sebagai embedding_function Chroma dan oleh endpoint rekomendasi,
+    sehingga query populer ("pantai", preferensi onboarding) tidak di-embed ulang.
+    """
+
+    def __init__(self, base: Embeddings, maxsize: int = 1024, ttl: float = 0):
+        from cache_utils import LRUCache
+
+        self.base = base
+        self.model_name = getattr(base, "model_name", str(base))
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        vec = self.cache.get(key)
+        if vec is None:
+            vec = tuple(self.base.embed_query(key))
+            self.cache.set(key, vec)
+        return list(vec)
@@ -0,0 +1,152 @@
+# backend/embedding_store.py
+"""
+Cache SBERT embedding destinasi di disk.
+
+Setiap baris disimpan dengan kunci (nama model | id destinasi | hash teks),
+sehingga saat startup hanya destinasi yang baru / berubah teksnya yang perlu
+di-embed ulang. Kunci dan matriks disimpan bersama dalam satu file .npz agar
+pembaca tidak pernah memasangkan matriks baru dengan daftar kunci lama.
+"""
+import os
+import hashlib
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("uvicorn")
+
+
+def text_hash(text: str) -> str:
+    """Hash pendek (SHA-1) dari teks yang di-embed."""
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+
+def make_key(item_id: str, text: str, model_name: str) -> str:
+    return f"{model_name}|{item_id}|{text_hash(text)}"
+
+
+class EmbeddingStore:
+    """Penyimpanan embedding dalam satu file `<base>.npz` (array `keys` + `matrix`)."""
+
+    def __init__(self, base_path: str, model_name: str):
+        self.path = f"{base_path}.npz"
+        self.model_name = model_name
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}, None
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                keys, matrix = data["keys"].tolist(), data["matrix"]
+            if matrix.ndim != 2 or matrix.shape[0] != len(keys):
+                logger.warning("⚠️ Cache embedding tidak konsisten, diabaikan.")
+                return {}, None
+            return {k: i for i, k in enumerate(keys)}, matrix
+        except Exception as e:
+            logger.warning(f"⚠️ Gagal membaca cache embedding: {e}")
+            return {}, None
+
+    def _save(self, keys: List[str], matrix: np.ndarray):
+        # Kunci + matriks dalam satu file sementara, lalu satu os.replace:
+        # worker lain melihat pasangan lama atau baru, tidak pernah campuran
+        tmp_path = f"{self.path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(tmp_path, keys=np.array(keys, dtype=str), matrix=matrix)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"⚠️ Gagal menyimpan cache embedding: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load_or_embed(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        known: Optional[Dict[str, np.ndarray]] = None,
+    ) -> np.ndarray:
+        """Kembalikan matriks embedding (float32) sesuai urutan `ids`.
+
+        Urutan sumber: `known` (mis. vektor dari ChromaDB) -> cache di disk ->
+        `embed_fn` untuk baris yang belum punya vektor. Cache ditulis ulang
+        jika ada baris baru.
+        """
+        known = known or {}
+        keys = [make_key(str(i), t, self.model_name) for i, t in zip(ids, texts)]
+        cached_index, cached_matrix = self._load()
+
+        from_known = [pos for pos, i in enumerate(ids) if str(i) in known]
+        missing = [
+            pos for pos, k in enumerate(keys)
+            if str(ids[pos]) not in known and k not in cached_index
+        ]
+        new_vecs = None
+        if missing:
+            new_vecs = np.asarray(embed_fn([texts[pos] for pos in missing]), dtype=np.float32)
+
+        if new_vecs is not None and new_vecs.size:
+            dim = new_vecs.shape[1]
+        elif from_known:
+            dim = len(known[str(ids[from_known[0]])])
+        elif cached_matrix is not None:
+            dim = cached_matrix.shape[1]
+        else:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        out = np.empty((len(keys), dim), dtype=np.float32)
+        for pos, k in enumerate(keys):
+            item_id = str(ids[pos])
+            if item_id in known:
+                out[pos] = known[item_id]
+            elif k in cached_index:
+                out[pos] = cached_matrix[cached_index[k]]
+        if missing:
+            out[missing] = new_vecs
+
+        reused = len(keys) - len(missing) - len(from_known)
+        logger.info(
+            f"💾 Embedding destinasi: {len(from_known)} dari Vector DB, "
+            f"{reused} dari cache disk, {len(missing)} di-embed baru."
+        )
+
+        # Tulis ulang jika ada baris baru, entri lama yang tidak dipakai,
+        # atau vektor dari Vector DB yang belum sama dengan isi cache
+        known_changed = any(
+            keys[pos] not in cached_index
+            or not np.array_equal(cached_matrix[cached_index[keys[pos]]], out[pos])
+            for pos in from_known
+        )
+        if missing or known_changed or len(cached_index) != len(keys):
+            self._save(keys, out)
+        return out
+
+
+def fetch_tourism_vectors(vector_db, texts: Dict[str, str]) -> Dict[str, np.ndarray]:
+    """Ambil vektor dokumen `tourism` yang sudah tersimpan di ChromaDB.
+
+    `texts` = wisata_id -> teks yang seharusnya di-embed. Dokumen hanya dipakai
+    jika teksnya persis sama, sehingga semua vektor berasal dari ruang embedding
+    yang sama; dokumen usang dianggap tidak ada sehingga di-embed ulang.
+    """
+    if vector_db is None:
+        return {}
+    try:
+        res = vector_db._collection.get(where={"type": "tourism"}, include=["embeddings", "metadatas", "documents"])
+    except Exception as e:
+        logger.warning(f"⚠️ Gagal membaca vektor tourism dari Vector DB: {e}")
+        return {}
+
+    embeddings = res.get("embeddings")
+    metadatas = res.get("metadatas") or []
+    documents = res.get("documents") or []
+    if embeddings is None or len(embeddings) == 0:
+        return {}
+
+    found = {}
+    for meta, doc, vec in zip(metadatas, documents, embeddings):
+        wid = str((meta or {}).get("id", ""))
+        if wid in found or texts.get(wid) != doc:
+            continue
+        found[wid] = np.asarray(vec, dtype=np.float32)
+    return found
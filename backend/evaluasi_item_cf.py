@@ -0,0 +1,93 @@
+import pandas as pd
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.model_selection import KFold
+import warnings
+warnings.filterwarnings('ignore')
+
+import recommender
+
+# Helper functions
+def print_markdown_table(results, headers):
+    print("| " + " | ".join(headers) + " |")
+    print("| " + " | ".join([":---:" for _ in headers]) + " |")
+    for row in results:
+        print("| " + " | ".join([str(row[h]) for h in headers]) + " |")
+
+# Load Data
+df_dest = pd.read_csv("data/destinasi_final.csv")
+df_implicit = pd.read_csv("data/implicit_data_new.csv")
+df_dest['id'] = df_dest['id'].astype(str)
+df_implicit['wisata_id'] = df_implicit['wisata_id'].astype(str)
+df_implicit['timestamp'] = pd.to_datetime(df_implicit['timestamp'])
+df_implicit = df_implicit.sort_values(by='timestamp')
+
+dest_ids = df_dest['id'].tolist()
+kf_user = KFold(n_splits=10, shuffle=True, random_state=42)
+all_users = df_implicit['user_id'].unique()
+all_items = dest_ids
+
+# PARAMETER (User-KNN dari evaluasi_knn_lengkap.py; Top-N tetangga Item-CF sama dengan server)
+BEST_K_CF = 30
+ITEM_CF_TOP_N = [10, 20, 30]
+
+print("\n" + "="*80)
+print("=== EVALUASI ITEM-BASED CF vs USER-KNN (PRECISION, RECALL, F1-SCORE @6) ===")
+print("="*80)
+
+def evaluate(scorer):
+    """Evaluasi satu fungsi skor (R_train, user_row, seen_mask) -> skor item / None."""
+    precisions, recalls, f1s = [], [], []
+    for train_idx, test_idx in kf_user.split(df_implicit):
+        train_clicks = df_implicit.iloc[train_idx]
+        test_clicks = df_implicit.iloc[test_idx]
+        R_df = pd.DataFrame(0.0, index=all_users, columns=all_items)
+        for (u, i), count in train_clicks.groupby(['user_id', 'wisata_id']).size().items():
+            if u in R_df.index and i in R_df.columns: R_df.at[u, i] = float(count)
+        R_train = csr_matrix(R_df.values)
+        context = scorer.prepare(R_train) if hasattr(scorer, "prepare") else None
+
+        for u_id, u_test in test_clicks.groupby('user_id'):
+            if u_id not in R_df.index: continue
+            row = R_df.index.get_loc(u_id)
+            item_scores = scorer(R_train, row, context)
+            if item_scores is None: continue
+            seen = R_df.iloc[row].values > 0
+
+            top_idx = recommender.top_k_indices(item_scores, 6, exclude=seen)
+            if len(top_idx) == 0 or item_scores[top_idx[0]] == 0: continue
+            top_6_recs = [all_items[i] for i in top_idx]
+
+            test_visited_ids = set(u_test['wisata_id'].astype(str).tolist())
+            hits = sum(1 for rid in top_6_recs if rid in test_visited_ids)
+            precision = hits / 6.0
+            recall = hits / len(test_visited_ids)
+            f1 = (2 * precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+            precisions.append(precision); recalls.append(recall); f1s.append(f1)
+    return precisions, recalls, f1s
+
+def user_knn(R_train, row, _):
+    return recommender.user_knn_scores(R_train, row, k=BEST_K_CF)
+
+class ItemCF:
+    def __init__(self, top_n): self.top_n = top_n
+    def prepare(self, R_train): return recommender.build_item_neighbors(R_train, self.top_n)
+    def __call__(self, R_train, row, context):
+        neighbor_idx, neighbor_sim = context
+        start, end = R_train.indptr[row], R_train.indptr[row + 1]
+        scores = recommender.item_cf_scores(neighbor_idx, neighbor_sim, R_train.indices[start:end], R_train.data[start:end])
+        return scores if scores.any() else None
+
+final_results = []
+methods = [('User-KNN (CF)', f"K={BEST_K_CF}", user_knn)] + [
+    ('Item-Based CF', f"Top-N={n}", ItemCF(n)) for n in ITEM_CF_TOP_N
+]
+for name, param, scorer in methods:
+    precisions, recalls, f1s = evaluate(scorer)
+    final_results.append({
+        'Metode': name, 'Parameter': param,
+        'Precision@6': f"{np.mean(precisions)*100:.2f}%", 'Recall@6': f"{np.mean(recalls)*100:.2f}%",
+        'F1-Score@6': f"{np.mean(f1s)*100:.2f}%"
+    })
+
+print_markdown_table(final_results, ['Metode', 'Parameter', 'Precision@6', 'Recall@6', 'F1-Score@6'])
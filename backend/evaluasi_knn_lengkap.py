@@ -7,6 +7,9 @@ from sentence_transformers import SentenceTransformer
 import warnings
 warnings.filterwarnings('ignore')
 
+import recommender
+import vector_sync
+
 # Helper functions
 def calculate_mrr(recs, relevant_set, n):
     for i, item in enumerate(recs[:n]):
@@ -32,13 +35,14 @@ df_implicit['wisata_id'] = df_implicit['wisata_id'].astype(str)
 df_implicit['timestamp'] = pd.to_datetime(df_implicit['timestamp'])
 df_implicit = df_implicit.sort_values(by='timestamp')
 
-df_dest['clean_text'] = (df_dest['nama_wisata'] + " " + df_dest['kategori'] + " " + df_dest['deskripsi']).fillna("")
+# Teks yang sama dengan dokumen tourism yang di-embed server (vektor CBF)
+df_dest['doc_text'] = [vector_sync.tourism_text(row) for _, row in df_dest.iterrows()]
 dest_ids = df_dest['id'].tolist()
 dest_id_to_idx = {idx: i for i, idx in enumerate(dest_ids)}
 
 print("Loading SBERT Model...")
 sbert_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-sbert_embeddings = sbert_model.encode(df_dest['clean_text'].tolist(), convert_to_numpy=True)
+sbert_embeddings = sbert_model.encode(df_dest['doc_text'].tolist(), convert_to_numpy=True)
 
 kf = KFold(n_splits=10, shuffle=True, random_state=42)
 kf_user = KFold(n_splits=10, shuffle=True, random_state=42)
@@ -150,16 +154,13 @@ for k in k_values:
             # CBF
             query_text = " ".join(u_train['wisata_name'].tolist())
             q_vec = sbert_model.encode([query_text], convert_to_numpy=True)
-            cbf_scores = pd.Series(cosine_similarity(q_vec, sbert_embeddings).flatten(), index=dest_ids)
-
-            cf_norm = (cf_scores - cf_scores.min()) / (cf_scores.max() - cf_scores.min()) if cf_scores.max() > cf_scores.min() else cf_scores * 0.0
-            cbf_norm = (cbf_scores - cbf_scores.min()) / (cbf_scores.max() - cbf_scores.min()) if cbf_scores.max() > cbf_scores.min() else cbf_scores * 0.0
-
-            hybrid_scores = (0.5 * cf_norm) + (0.5 * cbf_norm)
-            hybrid_scores = hybrid_scores.drop(index=u_train_items, errors='ignore')
+            cbf_scores = cosine_similarity(q_vec, sbert_embeddings).flatten()
 
-            top_6_recs = hybrid_scores.nlargest(6).index.tolist()
-            if not top_6_recs or hybrid_scores[top_6_recs[0]] == 0: continue
+            # Kernel hybrid bersama server (recommender.py): min-max, blend, mask, Top-6
+            seen = recommender.seen_mask(dest_id_to_idx, u_train_items, len(dest_ids))
+            top_idx, hybrid_scores = recommender.hybrid_top_k(cf_scores.to_numpy(), cbf_scores, 0.5, 6, seen)
+            top_6_recs = [dest_ids[j] for j in top_idx]
+            if not top_6_recs or hybrid_scores[top_idx[0]] == 0: continue
 
             test_visited_ids = set(u_test['wisata_id'].astype(str).tolist())
             hits = sum(1 for rid in top_6_recs if rid in test_visited_ids)
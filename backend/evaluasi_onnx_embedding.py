@@ -0,0 +1,81 @@
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+import ai_services
+from embedding_backends import OnnxInt8Embeddings
+
+# Uji paritas backend ONNX int8 terhadap model PyTorch + benchmark latensi embed_query.
+# Jalankan dari folder backend:  python evaluasi_onnx_embedding.py
+NAMA_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+MIN_MEAN_COSINE = 0.98   # batas lulus paritas rata-rata
+MIN_TOP6_OVERLAP = 0.80  # rata-rata irisan Top-6 destinasi per query
+N_LATENCY = 200
+
+def print_markdown_table(results, headers):
+    print("| " + " | ".join(headers) + " |")
+    print("| " + " | ".join([":---:" for _ in headers]) + " |")
+    for row in results:
+        print("| " + " | ".join([str(row[h]) for h in headers]) + " |")
+
+def latency_ms(fn, texts):
+    fn(texts[0])  # warmup
+    times = []
+    for i in range(N_LATENCY):
+        t = time.perf_counter()
+        fn(texts[i % len(texts)])
+        times.append((time.perf_counter() - t) * 1000)
+    return np.percentile(times, 50), np.percentile(times, 95)
+
+# Load Data
+df_dest = pd.read_csv("data/destinasi_final.csv").fillna("")
+df_dest['clean_text'] = df_dest['nama_wisata'] + " " + df_dest['kategori'] + " " + df_dest['deskripsi']
+with open("tests/regression_suite.json", encoding="utf-8") as f:
+    queries = [tc["query"] for tc in json.load(f)["test_cases"]]
+queries += ["pantai", "wisata alam", "air terjun", "kuliner khas jember", "Alam Pantai Edukasi"]
+
+print("Loading model PyTorch & ONNX int8...")
+ai_services.EMBEDDING_BACKEND = "torch"
+torch_model = ai_services.create_embedding_model(NAMA_MODEL)
+onnx_model = OnnxInt8Embeddings(NAMA_MODEL)
+
+# --- 1. PARITAS VEKTOR ---
+docs_torch = np.array(torch_model.embed_documents(df_dest['clean_text'].tolist()))
+docs_onnx = np.array(onnx_model.embed_documents(df_dest['clean_text'].tolist()))
+q_torch = np.array([torch_model.embed_query(q) for q in queries])
+q_onnx = np.array([onnx_model.embed_query(q) for q in queries])
+
+def rowwise_cosine(a, b):
+    return (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+cos_docs = rowwise_cosine(docs_torch, docs_onnx)
+cos_queries = rowwise_cosine(q_torch, q_onnx)
+
+# --- 2. KESEPAKATAN RANKING (Top-6 destinasi per query) ---
+top_torch = np.argsort(-(q_torch @ docs_torch.T), axis=1)[:, :6]
+top_onnx = np.argsort(-(q_onnx @ docs_onnx.T), axis=1)[:, :6]
+overlap = np.mean([len(set(a) & set(b)) / 6.0 for a, b in zip(top_torch, top_onnx)])
+
+# --- 3. LATENSI embed_query ---
+p50_t, p95_t = latency_ms(torch_model.embed_query, queries)
+p50_o, p95_o = latency_ms(onnx_model.embed_query, queries)
+
+print("\n" + "="*80)
+print("=== PARITAS & LATENSI: PyTorch vs ONNX int8 ===")
+print("="*80)
+print_markdown_table([
+    {'Metrik': 'Cosine dokumen (rata-rata / min)', 'Nilai': f"{cos_docs.mean():.4f} / {cos_docs.min():.4f}"},
+    {'Metrik': 'Cosine query (rata-rata / min)', 'Nilai': f"{cos_queries.mean():.4f} / {cos_queries.min():.4f}"},
+    {'Metrik': 'Irisan Top-6 destinasi', 'Nilai': f"{overlap*100:.2f}%"},
+    {'Metrik': 'Latensi PyTorch p50 / p95', 'Nilai': f"{p50_t:.2f} ms / {p95_t:.2f} ms"},
+    {'Metrik': 'Latensi ONNX int8 p50 / p95', 'Nilai': f"{p50_o:.2f} ms / {p95_o:.2f} ms"},
+    {'Metrik': 'Speed-up p50', 'Nilai': f"{p50_t / p50_o:.2f}x"},
+], ['Metrik', 'Nilai'])
+
+lulus = min(cos_docs.mean(), cos_queries.mean()) >= MIN_MEAN_COSINE and overlap >= MIN_TOP6_OVERLAP
+print(f"\nHasil uji paritas: {'LULUS' if lulus else 'GAGAL'}")
+sys.exit(0 if lulus else 1)
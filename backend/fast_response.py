@@ -0,0 +1,150 @@
+# backend/fast_response.py
+"""
+Jalur respons cepat untuk endpoint dengan payload JSON besar.
+
+- FastJSONResponse: serialisasi dengan orjson (datetime & model Pydantic langsung
+  didukung), jatuh ke `json` standar jika orjson tidak terpasang. Endpoint
+  mengembalikan objek ini secara langsung, sehingga jsonable_encoder FastAPI
+  tidak dijalankan sama sekali.
+- CompressionMiddleware: kompresi br/gzip sesuai `Accept-Encoding` untuk respons
+  di atas COMPRESS_MIN_BYTES, hanya pada path yang didaftarkan (opt-in). Hanya
+  respons satu-potong (punya content-length) yang dikompres; stream NDJSON/SSE
+  dilewatkan apa adanya agar tetap mengalir. ETag kuat dilemahkan (`W/`) pada
+  body terkompres, karena validator kuat wajib berbeda per content-coding (RFC 9110).
+
+Dependensi opsional (tidak ada di requirements.txt):
+    pip install brotli
+Tanpa brotli, klien yang mendukung br tetap mendapat gzip.
+"""
+import re
+import gzip
+import json
+import os
+from typing import Any, Iterable
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback tanpa orjson
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # kualitas menengah: rasio mendekati gzip-9 dengan CPU jauh lebih kecil dari q11
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+
+def _default(obj: Any):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Tipe {type(obj).__name__} tidak bisa diserialisasi ke JSON")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def pick_encoding(accept_encoding: str) -> str:
+    """Pilih 'br' / 'gzip' / '' dari header Accept-Encoding (q=0 berarti ditolak)."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try: q = float(params.strip()[2:])
+            except ValueError: q = 0.0
+        accepted[name.strip()] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return ""
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def weak_etag(headers: MutableHeaders):
+    """ETag kuat -> W/ (body terkompres bukan representasi byte-identik)."""
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """Middleware ASGI murni: menahan `http.response.start` sampai potongan body
+    pertama datang, lalu memutuskan apakah respons dikompres.
+
+    `paths` = daftar regex path (full match) yang boleh dikompres; path lain
+    dilewatkan tanpa disentuh.
+    """
+
+    def __init__(self, app, paths: Iterable[str], minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.paths = [re.compile(p) for p in paths]
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not any(p.fullmatch(scope["path"]) for p in self.paths):
+            return await self.app(scope, receive, send)
+        encoding = pick_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if not encoding:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                if message["status"] == 304:
+                    # 304 harus membawa validator & Vary yang sama dengan 200 terkompres
+                    headers = MutableHeaders(raw=message["headers"])
+                    weak_etag(headers)
+                    headers.add_vary_header("Accept-Encoding")
+                    passthrough = True
+                    return await send(message)
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough or start_message is None:
+                return await send(message)
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            # Stream (more_body) / sudah terkompres / kecil / bukan teks -> kirim apa adanya
+            if (message.get("more_body", False) or "content-encoding" in headers
+                    or len(body) < self.minimum_size or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                passthrough = True
+                await send(start_message)
+                return await send(message)
+
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            weak_etag(headers)
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
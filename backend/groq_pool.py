@@ -0,0 +1,324 @@
+# backend/groq_pool.py
+"""
+Pool klien Groq yang sadar kesehatan key.
+
+Satu ChatGroq berumur panjang per API key, masing-masing dengan httpx client
+sendiri (koneksi keep-alive dipakai ulang, bukan klien baru per request).
+Klien dibuat sekali saat warm-up (build_clients), bukan di jalur request.
+Setiap panggilan memilih key yang sedang tidak cooldown dengan panggilan
+berjalan (in-flight) paling sedikit; seri dipecah oleh sisa kuota dari header
+`x-ratelimit-remaining-*` lalu key yang paling lama tidak dipakai.
+
+- 429: key cooldown sesuai `retry-after` / `x-ratelimit-reset-*` (atau
+  GROQ_COOLDOWN_SECONDS), lalu dicoba ulang di key lain dengan backoff + jitter.
+- 5xx / gangguan jaringan (APIConnectionError/APITimeoutError Groq, TransportError
+  httpx): cooldown pendek, dicoba ulang di key lain.
+- 401/403: key dianggap mati selama GROQ_DEAD_KEY_COOLDOWN_SECONDS.
+- 4xx lain (prompt salah, dsb.) langsung dilempar tanpa retry.
+- Exception lain (bug kode, validasi, dsb.) dilempar apa adanya tanpa cooldown.
+
+Retry bawaan SDK dimatikan (max_retries=0) agar tidak mengulang di key yang sama.
+"""
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+import ai_services
+
+logger = logging.getLogger("uvicorn")
+
+GROQ_MAX_ATTEMPTS = int(os.getenv("GROQ_MAX_ATTEMPTS", "3"))
+GROQ_BACKOFF_SECONDS = float(os.getenv("GROQ_BACKOFF_SECONDS", "0.5"))
+GROQ_COOLDOWN_SECONDS = float(os.getenv("GROQ_COOLDOWN_SECONDS", "30"))
+GROQ_ERROR_COOLDOWN_SECONDS = float(os.getenv("GROQ_ERROR_COOLDOWN_SECONDS", "5"))
+GROQ_DEAD_KEY_COOLDOWN_SECONDS = float(os.getenv("GROQ_DEAD_KEY_COOLDOWN_SECONDS", "600"))
+GROQ_TIMEOUT_SECONDS = float(os.getenv("GROQ_TIMEOUT_SECONDS", "60"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+
+TOKEN_FIELDS = ("input_tokens", "output_tokens", "total_tokens")
+
+# Dicek lewat nama kelas di MRO agar tidak perlu mengimpor groq/httpx di sini.
+# APITimeoutError turunan APIConnectionError; TimeoutException turunan TransportError.
+NETWORK_ERRORS = frozenset({"APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException"})
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Durasi header Groq ("2m59.56s", "7.66s", "120ms") atau angka detik -> detik."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    return sum(float(n) * _UNIT_SECONDS[u] for n, u in parts) if parts else None
+
+
+class GroqUnavailable(RuntimeError):
+    """Tidak ada key yang bisa dipakai (belum dikonfigurasi / semua cooldown)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class KeyState:
+    def __init__(self, key: str, slot: int):
+        self.key = key
+        self.slot = slot
+        self.llm = None
+        self.in_flight = 0
+        self.requests = 0
+        self.errors: Counter = Counter()
+        self.tokens: Counter = Counter()
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return f"key_{self.slot}(...{self.key[-4:]})"
+
+
+def is_network_error(error: Exception) -> bool:
+    return any(cls.__name__ in NETWORK_ERRORS for cls in type(error).__mro__)
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class GroqPool:
+    def __init__(self, factory: Optional[Callable[[KeyState], Any]] = None,
+                 max_attempts: int = GROQ_MAX_ATTEMPTS, backoff: float = GROQ_BACKOFF_SECONDS):
+        self.factory = factory or self._create_llm
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._keys: List[KeyState] = []
+        self.retries = 0
+
+    # ------------------------------------------
+    # Konfigurasi & klien
+    # ------------------------------------------
+    def set_keys(self, keys: List[str]):
+        with self._lock:
+            self._keys = [KeyState(key, slot) for slot, key in enumerate(keys, start=1)]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def build_clients(self):
+        """Buat ChatGroq + httpx client untuk setiap key (import langchain_groq butuh
+        waktu). Dipanggil saat warm-up, di luar _lock, agar _acquire hanya memilih key."""
+        with self._lock:
+            pending = [s for s in self._keys if s.llm is None]
+        for state in pending:
+            state.llm = self.factory(state)
+
+    def _create_llm(self, state: KeyState):
+        """ChatGroq dengan httpx client per key; hook respons mencatat header rate-limit."""
+        httpx = ai_services.lazy_import("httpx")
+        limits = httpx.Limits(max_connections=GROQ_MAX_CONNECTIONS, max_keepalive_connections=GROQ_MAX_CONNECTIONS)
+
+        def on_response(response):
+            self._update_limits(state, response.headers)
+
+        async def on_response_async(response):
+            self._update_limits(state, response.headers)
+
+        return ai_services.create_groq_llm(
+            state.key, max_retries=0,
+            http_client=httpx.Client(timeout=GROQ_TIMEOUT_SECONDS, limits=limits, event_hooks={"response": [on_response]}),
+            http_async_client=httpx.AsyncClient(timeout=GROQ_TIMEOUT_SECONDS, limits=limits, event_hooks={"response": [on_response_async]}),
+        )
+
+    def _update_limits(self, state: KeyState, headers):
+        remaining_requests = _int_header(headers, "x-ratelimit-remaining-requests")
+        remaining_tokens = _int_header(headers, "x-ratelimit-remaining-tokens")
+        with self._lock:
+            if remaining_requests is not None:
+                state.remaining_requests = remaining_requests
+            if remaining_tokens is not None:
+                state.remaining_tokens = remaining_tokens
+            # Kuota habis: istirahatkan key sampai reset tanpa menunggu 429 dulu
+            if remaining_requests == 0 or remaining_tokens == 0:
+                reset = max(parse_duration(headers.get("x-ratelimit-reset-requests")) or 0.0,
+                            parse_duration(headers.get("x-ratelimit-reset-tokens")) or 0.0)
+                state.cooldown_until = max(state.cooldown_until, time.monotonic() + (reset or GROQ_COOLDOWN_SECONDS))
+
+    # ------------------------------------------
+    # Penjadwalan
+    # ------------------------------------------
+    def _healthy_keys(self, now: float) -> List[KeyState]:
+        """Key yang kliennya sudah dibuat & tidak cooldown; GroqUnavailable jika tidak ada.
+        Dipanggil di bawah _lock."""
+        if not self._keys:
+            raise GroqUnavailable("No API Key")
+        ready = [s for s in self._keys if s.llm is not None]
+        if not ready:
+            raise GroqUnavailable("Klien Groq belum siap (warm-up).", retry_after=GROQ_ERROR_COOLDOWN_SECONDS)
+        healthy = [s for s in ready if s.cooldown_until <= now]
+        if not healthy:
+            wait = min(s.cooldown_until for s in ready) - now
+            raise GroqUnavailable("Semua Groq API key sedang cooldown (rate limit).", retry_after=wait)
+        return healthy
+
+    def check_available(self):
+        """Pre-check tanpa memesan key, mis. sebelum StreamingResponse dimulai
+        (setelah header 200 terkirim, GroqUnavailable tidak bisa lagi jadi 503)."""
+        with self._lock:
+            self._healthy_keys(time.monotonic())
+
+    def _acquire(self, exclude: set) -> KeyState:
+        with self._lock:
+            now = time.monotonic()
+            healthy = self._healthy_keys(now)
+            # Semua key yang belum dicoba sedang cooldown -> boleh ulang key yang sehat
+            candidates = [s for s in healthy if s.slot not in exclude] or healthy
+            state = min(candidates, key=lambda s: (
+                s.in_flight,
+                -(s.remaining_requests if s.remaining_requests is not None else float("inf")),
+                s.last_used,
+            ))
+            state.in_flight += 1
+            state.requests += 1
+            state.last_used = now
+            return state
+
+    def _release(self, state: KeyState, usage: Optional[dict] = None):
+        with self._lock:
+            state.in_flight -= 1
+            for field in TOKEN_FIELDS:
+                state.tokens[field] += (usage or {}).get(field) or 0
+
+    def _record_failure(self, state: KeyState, error: Exception) -> bool:
+        """Catat error & pasang cooldown. True jika boleh dicoba ulang di key lain."""
+        status_code = getattr(error, "status_code", None)
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        if status_code == 429:
+            kind, retryable = "429", True
+            cooldown = (parse_duration(headers.get("retry-after"))
+                        or parse_duration(headers.get("x-ratelimit-reset-requests"))
+                        or parse_duration(headers.get("x-ratelimit-reset-tokens"))
+                        or GROQ_COOLDOWN_SECONDS)
+        elif status_code in (401, 403):
+            kind, retryable, cooldown = str(status_code), True, GROQ_DEAD_KEY_COOLDOWN_SECONDS
+        elif status_code is None:
+            if not is_network_error(error):
+                # Bukan kesalahan key/jaringan -> jangan hukum key, lempar apa adanya
+                return False
+            kind, retryable, cooldown = "network", True, GROQ_ERROR_COOLDOWN_SECONDS
+        elif status_code >= 500:
+            kind, retryable, cooldown = "5xx", True, GROQ_ERROR_COOLDOWN_SECONDS
+        else:
+            kind, retryable, cooldown = str(status_code), False, 0.0
+        with self._lock:
+            state.errors[kind] += 1
+            state.last_error = f"{kind}: {str(error)[:200]}"
+            if cooldown:
+                state.cooldown_until = max(state.cooldown_until, time.monotonic() + cooldown)
+        if retryable:
+            logger.warning(f"⚠️ Groq {state.label} gagal ({kind}), cooldown {cooldown:.0f}s.")
+        return retryable
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _should_retry(self, state: KeyState, error: Exception, attempt: int) -> bool:
+        retry = self._record_failure(state, error) and attempt + 1 < self.max_attempts
+        if retry:
+            with self._lock:
+                self.retries += 1
+        return retry
+
+    # ------------------------------------------
+    # Pemanggilan LLM
+    # ------------------------------------------
+    def invoke(self, messages: Any):
+        tried = set()
+        for attempt in range(self.max_attempts):
+            state = self._acquire(tried)
+            tried.add(state.slot)
+            response = None
+            try:
+                response = state.llm.invoke(messages)
+                return response
+            except Exception as e:
+                if not self._should_retry(state, e, attempt):
+                    raise
+            finally:
+                self._release(state, getattr(response, "usage_metadata", None))
+            time.sleep(self._backoff_delay(attempt))
+
+    async def ainvoke(self, messages: Any):
+        tried = set()
+        for attempt in range(self.max_attempts):
+            state = self._acquire(tried)
+            tried.add(state.slot)
+            response = None
+            try:
+                response = await state.llm.ainvoke(messages)
+                return response
+            except Exception as e:
+                if not self._should_retry(state, e, attempt):
+                    raise
+            finally:
+                self._release(state, getattr(response, "usage_metadata", None))
+            await asyncio.sleep(self._backoff_delay(attempt))
+
+    async def astream(self, messages: Any):
+        """Stream potongan jawaban. Retry hanya jika gagal sebelum potongan pertama
+        (setelah itu teks sudah terkirim ke klien)."""
+        tried = set()
+        for attempt in range(self.max_attempts):
+            state = self._acquire(tried)
+            tried.add(state.slot)
+            usage, started = Counter(), False
+            try:
+                async for chunk in state.llm.astream(messages):
+                    started = True
+                    chunk_usage = getattr(chunk, "usage_metadata", None) or {}
+                    usage.update({field: chunk_usage.get(field) or 0 for field in TOKEN_FIELDS})
+                    yield chunk
+                return
+            except Exception as e:
+                if started or not self._should_retry(state, e, attempt):
+                    raise
+            finally:
+                self._release(state, usage)
+            await asyncio.sleep(self._backoff_delay(attempt))
+
+    # ------------------------------------------
+    # Metrik
+    # ------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            keys = [{
+                "key": s.label,
+                "in_flight": s.in_flight,
+                "requests": s.requests,
+                "errors": dict(s.errors),
+                "tokens": dict(s.tokens),
+                "cooldown_seconds": round(max(0.0, s.cooldown_until - now), 1),
+                "remaining_requests": s.remaining_requests,
+                "remaining_tokens": s.remaining_tokens,
+                "last_error": s.last_error,
+            } for s in self._keys]
+        return {"keys": keys, "retries": self.retries}
@@ -8,6 +8,8 @@ from langchain_core.documents import Document
 from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+import vector_sync
+
 def run_ingestion():
     CSV_PATH = "data/destinasi_final.csv"
     KB_PATH = "data/knowledge_base.csv"   # <- FAQ, transportasi, kontak darurat, dll
@@ -80,6 +82,7 @@ def run_ingestion():
 
     # --- 4. SIMPAN KE VECTOR DB ---
     vector_db = Chroma.from_documents(documents=all_docs, embedding=embeddings, persist_directory=CHROMA_PATH)
+    vector_sync.mark_index_changed(CHROMA_PATH)  # server yang berjalan membatalkan retrieval cache
     print(f"\n[DONE] INGESTION SELESAI! Total {len(all_docs)} dokumen berhasil diindeks ke ChromaDB.")
 
 if __name__ == "__main__":
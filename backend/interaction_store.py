@@ -0,0 +1,202 @@
+# backend/interaction_store.py
+"""
+Matriks interaksi user × destinasi (jumlah klik) yang tinggal di memori.
+
+Dibangun sekali dari tabel `history` saat startup, lalu diperbarui di tempat
+setiap kali `POST /api/history` mencatat klik. Endpoint rekomendasi cukup
+membaca matriks CSR yang sudah jadi, tanpa `History.query.all()` per request.
+
+Pembaca mengambil `snapshot()`: CSR, label baris/kolom, indeks user, dan norma
+baris yang dibangun bersama dan tidak pernah diubah di tempat (copy-on-write),
+sehingga klik/hapus user yang berjalan bersamaan tidak mengacak hasil skor.
+
+Klik yang dicatat worker uvicorn lain ikut terbaca lewat `catch_up()`, yang
+hanya mengambil baris `history` dengan id lebih besar dari yang sudah dimuat.
+Komponen lain (mis. profil user) bisa berlangganan setiap klik lewat `on_click()`.
+"""
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sqlalchemy.orm import Session
+
+import models
+from recommender import row_norms
+
+
+class MatrixSnapshot(NamedTuple):
+    """Matriks CSR beserta label & norma yang konsisten satu sama lain (read-only)."""
+    R: csr_matrix
+    user_ids: List[int]
+    user_index: Dict[int, int]
+    item_ids: List[str]
+    norms: np.ndarray
+
+
+class InteractionStore:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.user_ids: List[int] = []
+        self.user_index: Dict[int, int] = {}
+        # Klik mentah per user (termasuk wisata_id yang tidak ada di katalog)
+        self._rows: List[Dict[str, float]] = []
+        self.item_ids: List[str] = []
+        self.item_index: Dict[str, int] = {}
+        self.last_history_id = 0
+        # id history yang sudah dicatat langsung lewat add_click tapi belum
+        # terlewati catch_up (bisa ada id lebih kecil dari worker lain)
+        self._applied_ids = set()
+        self._snapshot: Optional[MatrixSnapshot] = None
+        self._listeners: List[Callable] = []
+
+    def on_click(self, callback: Callable):
+        """Daftarkan callback(user_id, wisata_id, history_id, timestamp) untuk setiap klik baru."""
+        self._listeners.append(callback)
+
+    # ---------- Pembangunan & sinkronisasi ----------
+    def rebuild(self, clicks: Iterable[Tuple[int, int, str]], item_ids: List[str]):
+        """Bangun ulang dari daftar (history_id, user_id, wisata_id) berurutan id."""
+        with self._lock:
+            self.user_ids, self.user_index, self._rows = [], {}, []
+            self.last_history_id = 0
+            self._applied_ids = set()
+            self.item_ids = [str(i) for i in item_ids]
+            self.item_index = {iid: pos for pos, iid in enumerate(self.item_ids)}
+            for hist_id, user_id, wisata_id in clicks:
+                self._add(user_id, str(wisata_id))
+                self.last_history_id = max(self.last_history_id, hist_id or 0)
+            self._snapshot = None
+
+    def load_from_db(self, db: Session, item_ids: List[str]):
+        clicks = db.query(models.History.id, models.History.user_id, models.History.wisata_id)\
+            .order_by(models.History.id).all()
+        self.rebuild(clicks, item_ids)
+
+    def catch_up(self, db: Session) -> Set[int]:
+        """Muat klik baru (id > last_history_id), mis. yang dicatat worker lain.
+
+        Mengembalikan user_id yang mendapat klik baru.
+        """
+        new_clicks = db.query(models.History.id, models.History.user_id, models.History.wisata_id, models.History.timestamp)\
+            .filter(models.History.id > self.last_history_id).order_by(models.History.id).all()
+        touched = set()
+        with self._lock:
+            for hist_id, user_id, wisata_id, timestamp in new_clicks:
+                if hist_id in self._applied_ids:
+                    self._applied_ids.discard(hist_id)
+                else:
+                    self._apply(user_id, str(wisata_id))
+                    self._notify(user_id, str(wisata_id), hist_id, timestamp)
+                    touched.add(user_id)
+                self.last_history_id = max(self.last_history_id, hist_id)
+        return touched
+
+    def set_items(self, item_ids: List[str]):
+        """Ganti daftar kolom (katalog destinasi berubah)."""
+        with self._lock:
+            self.item_ids = [str(i) for i in item_ids]
+            self.item_index = {iid: pos for pos, iid in enumerate(self.item_ids)}
+            self._snapshot = None
+
+    # ---------- Mutasi ----------
+    def _add(self, user_id: int, wisata_id: str) -> bool:
+        """Tambah satu klik. True jika sel (user, item) sudah ada sebelumnya."""
+        row = self.user_index.get(user_id)
+        if row is None:
+            row = len(self.user_ids)
+            self.user_index[user_id] = row
+            self.user_ids.append(user_id)
+            self._rows.append({})
+        existed = wisata_id in self._rows[row]
+        self._rows[row][wisata_id] = self._rows[row].get(wisata_id, 0.0) + 1.0
+        return existed
+
+    def add_click(self, user_id: int, wisata_id: str, history_id: Optional[int] = None,
+                  timestamp: Optional[datetime] = None):
+        with self._lock:
+            if history_id is not None:
+                if history_id <= self.last_history_id or history_id in self._applied_ids:
+                    return  # sudah dimuat (mis. lewat catch_up)
+                self._applied_ids.add(history_id)
+            self._apply(user_id, str(wisata_id))
+            self._notify(user_id, str(wisata_id), history_id, timestamp)
+
+    def _notify(self, user_id: int, wisata_id: str, history_id: Optional[int], timestamp: Optional[datetime]):
+        for callback in self._listeners:
+            callback(user_id, wisata_id, history_id, timestamp)
+
+    def _apply(self, user_id: int, wisata_id: str):
+        with self._lock:
+            known_user = user_id in self.user_index
+            existed = self._add(user_id, wisata_id)
+            col = self.item_index.get(wisata_id)
+            snap = self._snapshot
+            if snap is None or col is None:
+                return
+            if known_user and existed:
+                # Sel sudah ada di CSR -> salin data & norma (pembaca lama tetap memegang
+                # array lama), struktur indices/indptr dipakai bersama
+                row = snap.user_index[user_id]
+                start, end = snap.R.indptr[row], snap.R.indptr[row + 1]
+                pos = start + int(np.searchsorted(snap.R.indices[start:end], col))
+                data = snap.R.data.copy()
+                data[pos] += 1.0
+                norms = snap.norms.copy()
+                norms[row] = np.sqrt(np.square(data[start:end]).sum())
+                R = csr_matrix((data, snap.R.indices, snap.R.indptr), shape=snap.R.shape, copy=False)
+                self._snapshot = snap._replace(R=R, norms=norms)
+            else:
+                self._snapshot = None  # struktur berubah, dibangun ulang saat dibaca
+
+    def remove_user(self, user_id: int):
+        with self._lock:
+            row = self.user_index.pop(user_id, None)
+            if row is None:
+                return
+            del self.user_ids[row]
+            del self._rows[row]
+            self.user_index = {uid: pos for pos, uid in enumerate(self.user_ids)}
+            self._snapshot = None
+
+    # ---------- Pembacaan ----------
+    def has_user(self, user_id: int) -> bool:
+        return user_id in self.user_index
+
+    def user_item_ids(self, user_id: int) -> List[str]:
+        """Daftar wisata_id unik yang pernah diklik user (urutan klik pertama)."""
+        with self._lock:
+            row = self.user_index.get(user_id)
+            return list(self._rows[row].keys()) if row is not None else []
+
+    def user_clicks(self, user_id: int) -> Dict[str, float]:
+        """Jumlah klik user per wisata_id."""
+        with self._lock:
+            row = self.user_index.get(user_id)
+            return dict(self._rows[row]) if row is not None else {}
+
+    def snapshot(self) -> MatrixSnapshot:
+        """CSR (user × item), label, indeks user & norma baris dari satu versi yang sama."""
+        with self._lock:
+            if self._snapshot is None:
+                indptr, indices, data = [0], [], []
+                for clicks in self._rows:
+                    cells = sorted(
+                        (self.item_index[iid], count) for iid, count in clicks.items() if iid in self.item_index
+                    )
+                    indices.extend(c for c, _ in cells)
+                    data.extend(v for _, v in cells)
+                    indptr.append(len(indices))
+                R = csr_matrix(
+                    (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+                    shape=(len(self.user_ids), len(self.item_ids))
+                )
+                self._snapshot = MatrixSnapshot(R, list(self.user_ids), dict(self.user_index),
+                                                list(self.item_ids), row_norms(R))
+            return self._snapshot
+
+    def matrix(self) -> Tuple[csr_matrix, List[int], List[str]]:
+        """Matriks CSR (user × item) beserta label baris & kolomnya."""
+        snap = self.snapshot()
+        return snap.R, list(snap.user_ids), list(snap.item_ids)
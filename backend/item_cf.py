@@ -0,0 +1,131 @@
+# backend/item_cf.py
+"""
+Model Item-Based Collaborative Filtering yang dihitung di background.
+
+Daftar Top-N tetangga per `wisata_id` dibangun dari interaction store dan
+di-refresh berkala (ITEM_CF_REFRESH_SECONDS) atau setiap N klik baru
+(ITEM_CF_REFRESH_CLICKS). Skor online untuk satu user hanya penjumlahan
+daftar tetangga dari beberapa item yang pernah ia klik.
+"""
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+import recommender
+
+logger = logging.getLogger("uvicorn")
+
+ITEM_CF_TOP_N = int(os.getenv("ITEM_CF_TOP_N", "20"))
+ITEM_CF_REFRESH_SECONDS = int(os.getenv("ITEM_CF_REFRESH_SECONDS", "600"))
+ITEM_CF_REFRESH_CLICKS = int(os.getenv("ITEM_CF_REFRESH_CLICKS", "50"))
+
+
+class ItemCFSnapshot(NamedTuple):
+    """Daftar item & tetangga Top-N yang konsisten satu sama lain (read-only).
+
+    Model selalu diganti utuh dengan satu assignment, jadi pembaca yang memegang
+    satu snapshot tidak pernah memasangkan `item_index` baru dengan tetangga lama.
+    """
+    item_ids: List[str]
+    item_index: Dict[str, int]
+    neighbor_idx: np.ndarray
+    neighbor_sim: np.ndarray
+    version: int
+
+    def score(self, clicked_ids: List[str], weights: Optional[List[float]] = None) -> np.ndarray:
+        """Skor semua item (urut `self.item_ids`) untuk daftar item yang diklik user."""
+        pairs = [(self.item_index[i], w) for i, w in zip(clicked_ids, weights or [1.0] * len(clicked_ids)) if i in self.item_index]
+        if not pairs:
+            return np.zeros(len(self.item_ids))
+        items = np.array([p[0] for p in pairs])
+        return recommender.item_cf_scores(self.neighbor_idx, self.neighbor_sim, items, np.array([p[1] for p in pairs]))
+
+
+class ItemCFModel:
+    def __init__(self, top_n: int = ITEM_CF_TOP_N, refresh_clicks: int = ITEM_CF_REFRESH_CLICKS):
+        self.top_n = top_n
+        self.refresh_clicks = refresh_clicks
+        self._snapshot = ItemCFSnapshot([], {}, np.empty((0, 0), dtype=np.int32), np.empty((0, 0), dtype=np.float32), 0)
+        self.built_at: Optional[float] = None
+        self.clicks_since_refresh = 0
+        self._refreshing = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+
+    def snapshot(self) -> ItemCFSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def on_refresh(self, callback: Callable[[], None]):
+        """Daftarkan callback yang dipanggil setiap model selesai di-refresh."""
+        self._listeners.append(callback)
+
+    def refresh(self, store):
+        """Bangun ulang daftar tetangga dari interaction store."""
+        if not self._refreshing.acquire(blocking=False):
+            return  # refresh lain sedang berjalan
+        try:
+            start = time.perf_counter()
+            R, _, item_ids = store.matrix()
+            neighbor_idx, neighbor_sim = recommender.build_item_neighbors(R, self.top_n)
+            # Satu assignment: pembaca melihat model lama atau baru, tidak pernah campuran
+            self._snapshot = ItemCFSnapshot(list(item_ids), {iid: i for i, iid in enumerate(item_ids)},
+                                            neighbor_idx, neighbor_sim, self._snapshot.version + 1)
+            self.built_at = time.time()
+            self.clicks_since_refresh = 0
+            logger.info(f"🔁 Item-CF v{self.version}: {len(item_ids)} item, {time.perf_counter() - start:.3f}s")
+        finally:
+            self._refreshing.release()
+        for callback in self._listeners:
+            callback()
+
+    def set_items(self, item_ids: List[str]):
+        """Ganti daftar item (katalog ditambah/dihapus/diurutkan) tanpa menghitung
+        ulang kemiripan: kosinus antar item yang tersisa tidak berubah. Item baru
+        belum punya klik -> tanpa tetangga; tetangga yang dihapus dikosongkan
+        sampai refresh berikutnya."""
+        with self._refreshing:
+            old = self._snapshot
+            item_ids = list(item_ids)
+            new_index = {iid: i for i, iid in enumerate(item_ids)}
+            # Posisi lama -> posisi baru (-1 = dihapus); elemen terakhir untuk slot kosong (-1)
+            old_to_new = np.array([new_index.get(iid, -1) for iid in old.item_ids] + [-1], dtype=np.int32)
+            top_n = old.neighbor_idx.shape[1]
+            neighbor_idx = np.full((len(item_ids), top_n), -1, dtype=np.int32)
+            neighbor_sim = np.zeros((len(item_ids), top_n), dtype=np.float32)
+            kept = [(new_index[iid], pos) for pos, iid in enumerate(old.item_ids) if iid in new_index]
+            if kept and top_n:
+                new_rows, old_rows = (np.array(v) for v in zip(*kept))
+                remapped = old_to_new[old.neighbor_idx[old_rows]]
+                neighbor_idx[new_rows] = remapped
+                neighbor_sim[new_rows] = np.where(remapped >= 0, old.neighbor_sim[old_rows], 0.0)
+            self._snapshot = ItemCFSnapshot(item_ids, new_index, neighbor_idx, neighbor_sim, old.version + 1)
+        for callback in self._listeners:
+            callback()
+
+    def register_click(self) -> bool:
+        """Catat satu klik baru. True jika sudah waktunya refresh."""
+        self.clicks_since_refresh += 1
+        return self.clicks_since_refresh >= self.refresh_clicks
+
+    def score(self, clicked_ids: List[str], weights: Optional[List[float]] = None) -> np.ndarray:
+        """Lihat ItemCFSnapshot.score; pemanggil yang juga butuh `item_ids` sebaiknya
+        memakai satu snapshot() untuk keduanya."""
+        return self._snapshot.score(clicked_ids, weights)
+
+    def start_scheduler(self, job: Callable[[], None], interval: int = ITEM_CF_REFRESH_SECONDS):
+        """Jalankan `job` (catch-up klik + refresh) berkala di thread daemon."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    job()
+                except Exception as e:
+                    logger.error(f"❌ Refresh Item-CF gagal: {e}")
+        threading.Thread(target=loop, name="item-cf-refresh", daemon=True).start()
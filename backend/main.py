@@ -9,32 +9,48 @@ import random
 import re
 import string
 import difflib 
+import hashlib
+import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 
 # --- FASTAPI IMPORTS ---
-from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Form, Request
+from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Form, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer 
 from fastapi.staticfiles import StaticFiles 
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from sqlalchemy import func 
 from jose import JWTError, jwt 
 from dotenv import load_dotenv
 
-# --- AI & LANGCHAIN ---
-from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_groq import ChatGroq 
-from langchain_core.prompts import ChatPromptTemplate
+# --- AI & LANGCHAIN (di-import malas lewat ai_services) ---
+import ai_services
 
 # --- DATABASE SETUP ---
 import models 
 from database import engine, get_db, SessionLocal
 import security
+from embedding_store import EmbeddingStore, fetch_tourism_vectors
+from interaction_store import InteractionStore
+import catalog as catalog_store
+from catalog import Catalog
+from profile_store import UserProfileStore
+from cache_utils import RecommendationCache, RetrievalCache
+from item_cf import ItemCFModel
+import recommender
+import vector_sync
+from fast_response import FastJSONResponse, CompressionMiddleware
+from semantic_cache import SemanticAnswerCache, is_follow_up
+from groq_pool import GroqPool, GroqUnavailable
 
 # Load Environment
 load_dotenv()
@@ -99,19 +115,67 @@ app.add_middleware(
     allow_methods=["*"], allow_headers=["*"]
 )
 
+# --- KOMPRESI RESPONS (opt-in; gzip/br sesuai Accept-Encoding, di atas COMPRESS_MIN_BYTES) ---
+# Hanya endpoint dengan payload JSON besar; endpoint lain tidak disentuh.
+COMPRESSED_PATHS = (
+    r"/api/v1/list-wisata",
+    r"/api/chat/\d+/messages",
+    r"/api/admin/activities",
+    r"/api/admin/user-activity-report",
+)
+if os.getenv("RESPONSE_COMPRESSION", "0") == "1":
+    app.add_middleware(CompressionMiddleware, paths=COMPRESSED_PATHS)
+
 # --- GLOBAL VARS ---
 NAMA_MODEL_EMBEDDING = "sentence-transformers/all-MiniLM-L6-v2"
 PATH_DB_VEKTOR = "db_jembertrip_v2"
 PATH_CSV_DATA = "data/destinasi_final.csv" 
 if not os.path.exists(PATH_CSV_DATA) and not os.path.exists(f"../{PATH_CSV_DATA}"):
      PATH_CSV_DATA = "data/destinasi_processed.csv"
-PATH_KNOWLEDGE_BASE = "data/knowledge_base.csv"
 
 vector_db = None
 embedding_model = None
-data_wisata_csv = [] 
+catalog = Catalog()   # snapshot katalog destinasi (immutable, bernomor versi) + indeks id/kategori/kartu
 sbert_embeddings = None
 dest_ids = []
+dest_index = {}      # wisata_id -> posisi baris di sbert_embeddings / kolom skor
+# Snapshot katalog yang sedang tercermin di dest_ids / sbert_embeddings / Vector DB.
+# index_lock menjaga ketiganya berubah bersama (perubahan admin vs warm-up).
+indexed_snapshot = None
+index_lock = threading.Lock()
+index_version = 0    # naik setiap dokumen tourism di Vector DB berubah
+interaction_store = InteractionStore()
+item_cf_model = ItemCFModel()
+# Vektor profil user (rata-rata embedding destinasi yang diklik), diperbarui per klik
+profile_store = UserProfileStore()
+interaction_store.on_click(profile_store.add_click)
+# Mesin CF untuk /recommendations/personal: "user" (User-KNN, default) atau "item" (Item-CF precomputed)
+CF_ENGINE = os.getenv("CF_ENGINE", "user").lower()
+# Cache hasil rekomendasi per user; versi naik saat katalog / model CF berubah
+rec_cache = RecommendationCache(
+    maxsize=int(os.getenv("REC_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("REC_CACHE_TTL", "300")),
+)
+item_cf_model.on_refresh(rec_cache.bump_version)
+# Cache top-k Vector DB (id + skor) per query, berlaku untuk satu current_index_version().
+# TTL = jaring pengaman untuk penulis index di luar vector_sync (mis. Chroma diubah manual).
+retrieval_cache = RetrievalCache(
+    maxsize=int(os.getenv("RETRIEVAL_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("RETRIEVAL_CACHE_TTL", "3600")),
+)
+
+# Status warm-up model AI (diisi oleh thread background saat startup)
+warmup_state = {"status": "starting", "started_at": None, "ready_at": None, "error": None}
+WARMUP_RETRY_AFTER_SECONDS = int(os.getenv("WARMUP_RETRY_AFTER_SECONDS", "15"))
+# Jumlah user per potongan pada endpoint rekomendasi batch
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "256"))
+# Executor terbatas untuk retrieval chat (embed query CPU-bound), terpisah dari thread pool FastAPI
+CHAT_RETRIEVAL_WORKERS = int(os.getenv("CHAT_RETRIEVAL_WORKERS", "4"))
+chat_executor = ThreadPoolExecutor(max_workers=CHAT_RETRIEVAL_WORKERS, thread_name_prefix="chat-retrieval")
+# Jawaban chatbot untuk pertanyaan yang hampir sama (lihat semantic_cache.py)
+answer_cache = SemanticAnswerCache()
+# Time-to-first-token /api/v1/chat/stream (ms), jendela bergulir untuk /api/admin/metrics
+chat_ttft_ms = deque(maxlen=1000)
 
 # ==========================================
 #   HELPER: URL PUBLIK UNTUK GAMBAR
@@ -120,8 +184,8 @@ def get_public_url() -> str:
     """Ambil URL publik dari env. Fallback ke ngrok domain default."""
     url = os.getenv("PUBLIC_URL", "https://numbness-afterglow-parade.ngrok-free.dev")
     return url.rstrip("/")
-GROQ_API_KEYS = []
-current_key_index = 0
+# Satu ChatGroq per API key, dipilih per panggilan (lihat groq_pool.py)
+groq_pool = GroqPool()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 # ==========================================
@@ -130,203 +194,298 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 @app.on_event("startup")
 def startup_event():
-    global vector_db, embedding_model, data_wisata_csv, GROQ_API_KEYS
-    global sbert_embeddings, dest_ids
+    """Bagian ringan saja (API key & CSV destinasi). Model AI dipanaskan di background."""
+    global dest_ids, dest_index, indexed_snapshot
     logger.info("--- 🚀 SERVER STARTUP: Hybrid Knowledge Engine v25.0 ---")
 
     # 1. Load API Keys
-    GROQ_API_KEYS = []
+    groq_keys = []
     count_keys = 0
     for i in range(1, 21):
         key = os.getenv(f"GROQ_API_KEY_{i}")
         if key: 
-            GROQ_API_KEYS.append(key)
+            groq_keys.append(key)
             count_keys += 1
     if count_keys == 0 and os.getenv("GROQ_API_KEY"):
-        GROQ_API_KEYS.append(os.getenv("GROQ_API_KEY"))
+        groq_keys.append(os.getenv("GROQ_API_KEY"))
         count_keys = 1
+    groq_pool.set_keys(groq_keys)
     logger.info(f"🔑 Terdeteksi {count_keys} Groq API Keys siap digunakan.")
 
-    # 2. Inisialisasi AI & Vector DB
+    # 2. Data Destinasi (tabel destinasi) -> langsung tersedia untuk list-wisata & detail.
+    #    Tabel masih kosong (deploy pertama) -> impor sekali dari CSV.
+    final_csv_path = PATH_CSV_DATA if os.path.exists(PATH_CSV_DATA) else f"../{PATH_CSV_DATA}"
+    db = SessionLocal()
     try:
-        # Load Embedding Model
-        embedding_model = HuggingFaceEmbeddings(
-            model_name=NAMA_MODEL_EMBEDDING, 
-            model_kwargs={'device': 'cpu'}
-        )
-        
-        
-        _ = embedding_model.embed_query("warmup jembertrip")
+        if db.query(models.Destinasi).count() == 0 and os.path.exists(final_csv_path):
+            imported = catalog_store.import_csv(db, final_csv_path)
+            logger.info(f"📥 Impor {imported} destinasi dari {final_csv_path} ke tabel destinasi.")
+        rows = catalog_store.load_rows(db)
+    finally:
+        db.close()
+    if rows:
+        logger.info(f"📊 Data Destinasi: {len(rows)} baris dari tabel destinasi")
+        # Simpan ke memori (katalog berindeks) untuk kebutuhan list-wisata & detail
+        catalog.load(pd.DataFrame(rows).fillna("Tidak ada data").to_dict('records'))
+    indexed_snapshot = catalog.snapshot()
+    dest_ids = [r["id"] for r in indexed_snapshot.rows]
+    dest_index = {iid: pos for pos, iid in enumerate(dest_ids)}
+
+    # 3. Matriks interaksi user-item (klik) untuk CF, dibangun sekali dari tabel history
+    db = SessionLocal()
+    try:
+        interaction_store.load_from_db(db, dest_ids)
+        logger.info(f"👥 Interaction store: {len(interaction_store.user_ids)} user, {interaction_store.last_history_id} klik terakhir.")
+    finally:
+        db.close()
+    item_cf_model.refresh(interaction_store)
+    item_cf_model.start_scheduler(refresh_item_cf)
+
+    # 4. Model AI, Vector DB & Embeddings dipanaskan di background agar
+    #    uvicorn langsung menerima request (health check tidak timeout)
+    threading.Thread(
+        target=warmup_ai_engine, args=(final_csv_path,), name="ai-warmup", daemon=True
+    ).start()
+
+
+def refresh_item_cf():
+    """Muat klik baru dari tabel history lalu bangun ulang tetangga Item-CF."""
+    db = SessionLocal()
+    try:
+        interaction_store.catch_up(db)
+    finally:
+        db.close()
+    item_cf_model.refresh(interaction_store)
 
-        
-        final_csv_path = PATH_CSV_DATA if os.path.exists(PATH_CSV_DATA) else f"../{PATH_CSV_DATA}"
-        final_kb_path = PATH_KNOWLEDGE_BASE if os.path.exists(PATH_KNOWLEDGE_BASE) else f"../{PATH_KNOWLEDGE_BASE}"
+
+def warmup_ai_engine(final_csv_path: str):
+    global vector_db, embedding_model, sbert_embeddings
+    warmup_state.update(status="warming_up", started_at=datetime.utcnow(), error=None)
+    try:
+        # Load Embedding Model
+        with ai_services.timed_phase("load_embedding_model"):
+            embedding_model = ai_services.with_query_cache(
+                ai_services.create_embedding_model(NAMA_MODEL_EMBEDDING)
+            )
+            _ = embedding_model.embed_query("warmup jembertrip")
 
         # Load ChromaDB
-        vector_db = Chroma(persist_directory=PATH_DB_VEKTOR, embedding_function=embedding_model)
-        
-        # Cek jumlah data saat ini
-        db_count = vector_db._collection.count()
-        db_is_empty = db_count == 0
-
-        # PROSES DATA WISATA (CSV)
-        if os.path.exists(final_csv_path):
-            logger.info(f"📊 Membaca Data Destinasi: {final_csv_path}")
-            df = pd.read_csv(final_csv_path).fillna("Tidak ada data")
-            if 'id' in df.columns: 
-                df['id'] = df['id'].astype(str)
-            
-            # Simpan ke memori untuk kebutuhan list-wisata
-            data_wisata_csv = df.to_dict('records')
-            
-            # Hitung SBERT Embeddings HANYA untuk destinasi wisata (untuk CF/CBF)
-            logger.info("🧠 Menghitung SBERT Embeddings untuk destinasi wisata...")
-            global dest_ids, sbert_embeddings
-            df['clean_text'] = (df['nama_wisata'].fillna('') + " " + df['kategori'].fillna('') + " " + df['deskripsi'].fillna(''))
-            dest_ids = df['id'].astype(str).tolist()
-            sbert_embeddings = np.array(embedding_model.embed_documents(df['clean_text'].tolist()))
-            logger.info("✅ SBERT Embeddings berhasil dihitung.")
-
-            # db jembertrip 
-            if db_is_empty:
-                logger.info("📥 Mengisi Vector DB dengan Detail Wisata, Kuliner & Hotel (CSV)...")
-                
-                # 1. Index Destinasi Wisata
-                texts_tourism = []
-                metas_tourism = []
-                for _, row in df.iterrows():
-                    content = (
-                        f"Nama Wisata: {row['nama_wisata']}. "
-                        f"Kategori: {row['kategori']}. "
-                        f"Alamat: {row['alamat']}. "
-                        f"Deskripsi: {row['deskripsi']}. "
-                        f"Harga Tiket: {row['harga_tiket']}."
-                    )
-                    texts_tourism.append(content)
-                    meta = row.to_dict()
-                    meta['type'] = 'tourism' 
-                    metas_tourism.append(meta)
-
-                vector_db.add_texts(texts=texts_tourism, metadatas=metas_tourism)
-                logger.info(f"✅ {len(texts_tourism)} destinasi wisata di-index.")
-
-                # 2. Index Kuliner
-                kuliner_path = "data/kuliner.csv" if os.path.exists("data/kuliner.csv") else "../data/kuliner.csv"
-                if os.path.exists(kuliner_path):
-                    df_kul = pd.read_csv(kuliner_path).fillna("")
-                    texts_kul = []
-                    metas_kul = []
-                    for _, row in df_kul.iterrows():
-                        content = (
-                            f"Kuliner/Oleh-oleh: {row['nama']}. "
-                            f"Kategori: {row['kategori']}. "
-                            f"Alamat: {row['alamat']}. "
-                            f"Menu Andalan: {row['menu']}. "
-                            f"Harga: {row['harga']}."
-                        )
-                        texts_kul.append(content)
-                        metas_kul.append({"type": "kuliner", "kategori": row['kategori'], "content": content})
-                    vector_db.add_texts(texts=texts_kul, metadatas=metas_kul)
-                    logger.info(f"✅ {len(texts_kul)} tempat kuliner di-index.")
-
-                # 3. Index Hotel
-                hotel_path = "data/hotel.csv" if os.path.exists("data/hotel.csv") else "../data/hotel.csv"
-                if os.path.exists(hotel_path):
-                    df_htl = pd.read_csv(hotel_path).fillna("")
-                    texts_htl = []
-                    metas_htl = []
-                    for _, row in df_htl.iterrows():
-                        content = (
-                            f"Hotel/Penginapan: {row['nama']}. "
-                            f"Kelas: {row['kelas']}. "
-                            f"Alamat: {row['alamat']}. "
-                            f"Fasilitas: {row['fasilitas']}. "
-                            f"Estimasi Harga: {row['harga']}."
-                        )
-                        texts_htl.append(content)
-                        metas_htl.append({"type": "hotel", "kategori": row['kelas'], "content": content})
-                    vector_db.add_texts(texts=texts_htl, metadatas=metas_htl)
-                    logger.info(f"✅ {len(texts_htl)} tempat penginapan di-index.")
-
-            # Load & Index Transportasi (Khusus Chatbot RAG, tidak masuk CF/CBF)
-            transport_path = "data/transportasi.csv" if os.path.exists("data/transportasi.csv") else "../data/transportasi.csv"
-            if db_is_empty and os.path.exists(transport_path):
-                df_transport = pd.read_csv(transport_path).fillna("")
-                texts_transport = []
-                metas_transport = []
-                for _, row in df_transport.iterrows():
-                    content = (
-                        f"Transportasi: {row['kategori']} - {row['nama_layanan']}. "
-                        f"Rute: {row['rute_relasi']}. "
-                        f"Jadwal: {row['jam_berangkat']} sampai {row['jam_tiba']}. "
-                        f"Kelas: {row['kelas_tipe']}. "
-                        f"Estimasi Harga: {row['estimasi_harga']}. "
-                        f"Sumber: {row['sumber']}."
-                    )
-                    texts_transport.append(content)
-                    metas_transport.append({"type": "transportation", "kategori": row['kategori'], "content": content})
-                vector_db.add_texts(texts=texts_transport, metadatas=metas_transport)
-                logger.info(f"✅ {len(texts_transport)} rute transportasi berhasil di-index untuk chatbot.")
-
-            # Load & Index Event/Budaya (Khusus Chatbot RAG)
-            event_path = "data/event.csv" if os.path.exists("data/event.csv") else "../data/event.csv"
-            if db_is_empty and os.path.exists(event_path):
-                df_evt = pd.read_csv(event_path).fillna("")
-                texts_evt = []
-                metas_evt = []
-                for _, row in df_evt.iterrows():
-                    content = (
-                        f"Event/Budaya: {row['nama_event']}. "
-                        f"Kategori: {row['kategori']}. "
-                        f"Lokasi: {row['lokasi']}. "
-                        f"Waktu Pelaksanaan: {row['waktu_pelaksanaan']}. "
-                        f"Deskripsi: {row['deskripsi']}."
-                    )
-                    texts_evt.append(content)
-                    metas_evt.append({"type": "event", "kategori": row['kategori'], "content": content})
-                vector_db.add_texts(texts=texts_evt, metadatas=metas_evt)
-                logger.info(f"✅ {len(texts_evt)} event budaya berhasil di-index untuk chatbot.")
-
-        # PROSES KNOWLEDGE BASE
-        if os.path.exists(final_kb_path) and db_is_empty:
-            logger.info("📥 Mengisi Vector DB dengan Knowledge Base (CSV)...")
-            df_kb = pd.read_csv(final_kb_path).fillna("")
-            texts_kb = []
-            metas_kb = []
-            
-            for _, row in df_kb.iterrows():
-                combined = f"Topik: {row.get('topik', 'Umum')} | Tanya: {row.get('question', '')} | Jawab: {row.get('answer', '')}"
-                texts_kb.append(combined)
-                metas_kb.append({"type": "knowledge", "topik": row.get('topik', 'Umum'), "content": combined})
-            
-            vector_db.add_texts(texts=texts_kb, metadatas=metas_kb)
-            logger.info(f"✅ {len(texts_kb)} item Knowledge Base berhasil di-index.")
+        with ai_services.timed_phase("open_vector_db"):
+            vector_db = ai_services.open_vector_db(PATH_DB_VEKTOR, embedding_model)
 
-        if not db_is_empty:
-            logger.info(f"ℹ️ Vector DB sudah berisi {db_count} item. Menggunakan data yang ada.")
+        # Klien Groq (import langchain_groq + httpx) dibuat di sini, bukan saat chat pertama
+        with ai_services.timed_phase("groq_clients"):
+            groq_pool.build_clients()
 
+        embedding_store = EmbeddingStore(
+            os.path.join(os.path.dirname(final_csv_path), "destinasi_embeddings"),
+            ai_services.embedding_model_key(embedding_model)
+        )
+        # Kerja berat dilakukan di luar index_lock. Jika admin mengubah katalog
+        # selama itu, putaran berikutnya mengulang (hanya yang berubah di-embed).
+        while True:
+            with index_lock:
+                snap, ids = indexed_snapshot, list(dest_ids)
+            df = catalog_store.catalog_frame(snap.rows)
+
+            # Sinkronisasi inkremental: Wisata, Kuliner, Hotel, Transportasi, Event
+            # & Knowledge Base. Hanya baris baru/berubah yang di-embed ulang.
+            with ai_services.timed_phase("vector_index_sync"):
+                vector_sync.sync_vector_index(vector_db, vector_sync.collect_source_documents(df),
+                                              persist_directory=PATH_DB_VEKTOR)
+            if df is None:
+                break
+
+            # SBERT Embeddings HANYA untuk destinasi wisata (untuk CF/CBF) = embedding
+            # teks dokumen tourism. Vektor di Vector DB dipakai ulang; yang belum ada
+            # diambil dari cache disk atau di-embed baru dari teks yang sama.
+            logger.info("🧠 Menyiapkan SBERT Embeddings untuk destinasi wisata...")
+            with ai_services.timed_phase("destination_embeddings"):
+                texts = [vector_sync.tourism_text(row) for _, row in df.iterrows()]
+                embeddings = embedding_store.load_or_embed(
+                    ids, texts, embedding_model.embed_documents,
+                    known=fetch_tourism_vectors(vector_db, dict(zip(ids, texts)))
+                )
+
+            with index_lock:
+                if indexed_snapshot is not snap:
+                    logger.info("🔁 Katalog berubah selama warm-up, sinkronisasi diulang.")
+                    continue
+                sbert_embeddings = embeddings
+                logger.info("✅ SBERT Embeddings siap.")
+                with ai_services.timed_phase("user_profiles"):
+                    build_user_profiles(sbert_embeddings, dest_ids)
+                logger.info(f"👤 Profil user siap: {len(profile_store)} user.")
+                break
+
+        warmup_state.update(status="ready", ready_at=datetime.utcnow())
+        rec_cache.bump_version()
+        ai_services.log_startup_report()
         logger.info("✨ Hybrid Knowledge Engine siap tempur, Lur!")
 
     except Exception as e:
+        warmup_state.update(status="failed", error=str(e))
         logger.error(f"❌ Startup Error: {e}")
 
+
+def build_user_profiles(embeddings: np.ndarray, item_ids: List[str]):
+    """Bangun vektor profil semua user dari tabel history + embedding destinasi."""
+    db = SessionLocal()
+    try:
+        clicks = db.query(models.History.id, models.History.user_id, models.History.wisata_id, models.History.timestamp)\
+            .order_by(models.History.id)
+        profile_store.rebuild(clicks, embeddings, item_ids)
+    finally:
+        db.close()
+
+
+def rebuild_profiles_for_items(wisata_ids: List[str], embeddings: np.ndarray, item_ids: List[str]):
+    """Bangun ulang profil user yang pernah mengklik `wisata_ids` saja (vektornya berubah/hilang)."""
+    db = SessionLocal()
+    try:
+        users = [uid for (uid,) in db.query(models.History.user_id)
+                 .filter(models.History.wisata_id.in_(wisata_ids)).distinct().all()]
+        if not users:
+            profile_store.set_items(embeddings, item_ids)
+            return 0
+        clicks = db.query(models.History.id, models.History.user_id, models.History.wisata_id, models.History.timestamp)\
+            .filter(models.History.user_id.in_(users)).order_by(models.History.id)
+        profile_store.rebuild_users(users, clicks, embeddings, item_ids)
+        return len(users)
+    finally:
+        db.close()
+
+
+# ==========================================
+#   SINKRONISASI PERUBAHAN KATALOG (ADMIN)
+# ==========================================
+def sync_catalog_change(snapshot):
+    """Listener `catalog.on_change`: jalan di bawah lock writer katalog, sebelum
+    snapshot baru dipasang, jadi hanya mengerjakan bagian yang benar-benar berubah:
+
+    - destinasi baru / teks berubah: di-embed & di-upsert ke Vector DB
+    - hanya field non-teks (mis. gambar) berubah: metadata Vector DB saja, tanpa embed
+    - dihapus: dokumen `tourism:<id>` dihapus
+    - profil user: dibangun ulang hanya untuk user yang mengklik item yang vektornya
+      berubah/hilang; tambah/urutan cukup mengganti matriks item
+    - Item-CF: daftar tetangga dipetakan ulang ke daftar item baru (tanpa hitung ulang)
+    """
+    global dest_ids, dest_index, sbert_embeddings, indexed_snapshot, index_version
+    old = catalog.snapshot()
+    # Writer selalu membuat dict baru untuk baris yang diubah -> cukup bandingkan identitas
+    changed = [r for r in snapshot.rows if old.get(r["id"]) is not r]
+    removed = [r["id"] for r in old.rows if r["id"] not in snapshot]
+    reembed, meta_only, vectors, profiles_rebuilt = [], [], {}, 0
+
+    with index_lock:
+        new_ids = [r["id"] for r in snapshot.rows]
+        new_embeddings = sbert_embeddings
+        if sbert_embeddings is not None and vector_db is not None:
+            try:
+                docs = vector_sync.build_tourism_documents(catalog_store.catalog_frame(changed)) if changed else []
+                edited = [old.get(r["id"]) for r in changed if r["id"] in old]
+                old_texts = {doc_id: text for doc_id, text, _ in
+                             vector_sync.build_tourism_documents(catalog_store.catalog_frame(edited))} if edited else {}
+                for row, doc in zip(changed, docs):
+                    (meta_only if old_texts.get(doc[0]) == doc[1] else reembed).append((row, doc))
+
+                if removed:
+                    vector_db.delete(ids=[f"tourism:{wid}" for wid in removed])
+                if reembed:
+                    vecs = embedding_model.embed_documents([text for _, (_, text, _) in reembed])
+                    # Vektor yang sama dipakai Vector DB & SBERT (seperti saat startup)
+                    vector_db._collection.upsert(
+                        ids=[doc_id for _, (doc_id, _, _) in reembed], embeddings=vecs,
+                        metadatas=[meta for _, (_, _, meta) in reembed], documents=[text for _, (_, text, _) in reembed],
+                    )
+                    vectors = {row["id"]: np.asarray(v, dtype=np.float32) for (row, _), v in zip(reembed, vecs)}
+                if meta_only:
+                    vector_db._collection.update(
+                        ids=[doc_id for _, (doc_id, _, _) in meta_only], metadatas=[meta for _, (_, _, meta) in meta_only],
+                    )
+                if reembed or removed:
+                    index_version += 1
+                    vector_sync.mark_index_changed(PATH_DB_VEKTOR)  # worker lain ikut membatalkan cache
+            except Exception as e:
+                logger.error(f"❌ Sinkronisasi Vector DB gagal (diperbaiki saat restart): {e}")
+
+        if sbert_embeddings is not None and (vectors or new_ids != dest_ids):
+            # Matriks baru (copy-on-write): pembaca yang memegang matriks lama tetap aman
+            new_embeddings = np.zeros((len(new_ids), sbert_embeddings.shape[1]), dtype=np.float32)
+            for pos, wid in enumerate(new_ids):
+                if wid in vectors:
+                    new_embeddings[pos] = vectors[wid]
+                elif wid in dest_index:
+                    new_embeddings[pos] = sbert_embeddings[dest_index[wid]]
+
+        if new_embeddings is not None and profile_store.ready:
+            # Item lama yang vektornya berubah / hilang -> profil pengkliknya usang
+            stale = [wid for wid in vectors if wid in old] + removed
+            if stale:
+                profiles_rebuilt = rebuild_profiles_for_items(stale, new_embeddings, new_ids)
+            elif new_embeddings is not sbert_embeddings:
+                profile_store.set_items(new_embeddings, new_ids)
+
+        dest_ids, dest_index, sbert_embeddings = new_ids, {iid: pos for pos, iid in enumerate(new_ids)}, new_embeddings
+        indexed_snapshot = snapshot
+
+    if new_ids != interaction_store.item_ids:
+        interaction_store.set_items(new_ids)
+        item_cf_model.set_items(new_ids)  # ikut menaikkan versi rec_cache
+    elif changed or removed:
+        rec_cache.bump_version()
+    logger.info(f"🗂️ Katalog v{snapshot.version}: {len(reembed)} di-embed ulang, {len(meta_only)} metadata saja, "
+                f"{len(removed)} dihapus, {profiles_rebuilt} profil dibangun ulang, index v{index_version}.")
+
+
+catalog.on_change(sync_catalog_change)
+
+
+async def require_ai_ready():
+    """Dependency untuk endpoint berbasis model: 503 + Retry-After selama warm-up.
+    Async (cukup cek flag) agar tidak butuh slot thread pool."""
+    if warmup_state["status"] != "ready":
+        raise HTTPException(
+            status_code=503,
+            detail="Cak Jember masih pemanasan, coba lagi sebentar ya Lur.",
+            headers={"Retry-After": str(WARMUP_RETRY_AFTER_SECONDS)}
+        )
+
+# ==========================================
+#           HEALTH & READINESS
+# ==========================================
+@app.get("/healthz")
+def healthz():
+    """Liveness: proses hidup dan bisa melayani request."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: model embedding, Vector DB & embeddings destinasi sudah siap."""
+    body = {
+        "status": warmup_state["status"],
+        "started_at": warmup_state["started_at"],
+        "ready_at": warmup_state["ready_at"],
+        "error": warmup_state["error"],
+        "startup_report": ai_services.startup_report(),
+    }
+    if warmup_state["status"] != "ready":
+        return JSONResponse(
+            status_code=503, content=jsonable_encoder(body),
+            headers={"Retry-After": str(WARMUP_RETRY_AFTER_SECONDS)}
+        )
+    return body
+
 # ==========================================
 #           HELPER FUNCTIONS
 # ==========================================
-def get_groq_llm():
-    global GROQ_API_KEYS, current_key_index
-    if not GROQ_API_KEYS: raise HTTPException(500, "No API Key")
-    key = GROQ_API_KEYS[current_key_index]
-    current_key_index = (current_key_index + 1) % len(GROQ_API_KEYS)
-    
-    return ChatGroq(temperature=0.7, model_name="llama-3.3-70b-versatile", api_key=key) 
+def groq_unavailable_error(e: GroqUnavailable) -> HTTPException:
+    """Tanpa key sama sekali -> 500 (salah konfigurasi); semua key cooldown -> 503 + Retry-After."""
+    if e.retry_after is None:
+        return HTTPException(500, str(e))
+    return HTTPException(503, f"Cak Jember lagi kewalahan, coba lagi sebentar ya Lur. ({e})",
+                         headers={"Retry-After": str(max(1, int(e.retry_after + 0.999)))})
 
-def save_csv_changes():
-    global data_wisata_csv
-    if data_wisata_csv:
-        df = pd.DataFrame(data_wisata_csv)
-        target_path = PATH_CSV_DATA if os.path.exists(PATH_CSV_DATA) else f"../{PATH_CSV_DATA}"
-        df.to_csv(target_path, index=False)
 
 # ==========================================
 #           MODEL PYDANTIC
@@ -349,6 +508,8 @@ class ChatRequest(BaseModel):
     language: str = "id" 
 class RecommendationRequest(BaseModel):
     query: str; k: int = 5
+class BatchRecommendationRequest(BaseModel):
+    user_ids: Optional[List[int]] = None  # None = semua user
 class ChatMessageResponse(BaseModel):
     id: int; session_id: int; sender: str; content: str
     recommendations: Optional[List[Dict[str, Any]]] = None; sources: Optional[List[str]] = None
@@ -428,6 +589,7 @@ def onboard_user(data: UserOnboard, current_user: models.User = Depends(get_curr
     current_user.preferences = json.dumps(data.categories)
     current_user.has_onboarded = 1
     db.commit()
+    rec_cache.invalidate_user(current_user.id)  # cold start hybrid memakai preferensi
     return {"status": "success", "message": "Preferences saved"}
 
 @app.put("/api/users/me")
@@ -456,6 +618,9 @@ def delete_my_account(current_user: models.User = Depends(get_current_user), db:
         # Hapus User
         db.delete(current_user)
         db.commit()
+        interaction_store.remove_user(current_user.id)
+        profile_store.remove_user(current_user.id)
+        rec_cache.invalidate_user(current_user.id)
         return {"status": "success", "message": "Akun dan semua data terkait berhasil dihapus permanen."}
     except Exception as e:
         db.rollback()
@@ -491,6 +656,10 @@ def record_history(item: HistoryCreate, current_user: models.User = Depends(get_
             timestamp=datetime.utcnow()
         )
         db.add(new_h); db.commit()
+        interaction_store.add_click(current_user.id, new_h.wisata_id, new_h.id)
+        rec_cache.invalidate_user(current_user.id)
+        if item_cf_model.register_click():
+            threading.Thread(target=refresh_item_cf, name="item-cf-refresh-now", daemon=True).start()
         return {"status": "success"}
     except Exception:
         raise HTTPException(500, "Gagal simpan history")
@@ -500,71 +669,80 @@ def get_my_history(current_user: models.User = Depends(get_current_user), db: Se
     history_list = db.query(models.History).filter(models.History.user_id == current_user.id).order_by(models.History.timestamp.desc()).limit(10).all()
     return {"status": "success", "data": history_list}
 
+def cached_recommendations(kind: str, current_user: models.User, db: Session, response: Response, compute):
+    """Ambil rekomendasi dari rec_cache, atau hitung lalu simpan. Header X-Cache: HIT/MISS."""
+    # Klik baru dari worker lain juga membatalkan cache user yang bersangkutan
+    for user_id in interaction_store.catch_up(db):
+        rec_cache.invalidate_user(user_id)
+
+    snap = catalog.snapshot()  # satu versi katalog untuk seluruh request
+    cached = rec_cache.get(kind, current_user.id, snap.version)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        return {"status": "success", "data": cached}
+
+    response.headers["X-Cache"] = "MISS"
+    version = rec_cache.version
+    data = compute(current_user, db, snap)
+    if data is not None:  # None = error, jangan di-cache
+        rec_cache.set(kind, current_user.id, data, version, snap.version)
+    return {"status": "success", "data": data or []}
+
 @app.get("/api/v1/recommendations/personal")
-def get_personal_recommendations(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_personal_recommendations(response: Response, current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
     """SINKRON DENGAN FRONTEND: Menampilkan 6 Rekomendasi Spesial (Memory-Based CF)"""
-    global dest_ids, data_wisata_csv
+    return cached_recommendations("personal", current_user, db, response, compute_personal_recommendations)
+
+def compute_personal_recommendations(current_user: models.User, db: Session, snap):
     try:
-        # 1. Ambil seluruh history user
-        all_hist = db.query(models.History).all()
-        if not all_hist:
-            return {"status": "success", "data": []}
-            
-        hist_df = pd.DataFrame([{
-            'user_id': h.user_id,
-            'wisata_id': str(h.wisata_id)
-        } for h in all_hist])
-        
-        # 2. Build User-Item Matrix
-        all_users = hist_df['user_id'].unique()
-        R_train = pd.DataFrame(0.0, index=all_users, columns=dest_ids)
-        for (u, i), count in hist_df.groupby(['user_id', 'wisata_id']).size().items():
-            if u in R_train.index and i in R_train.columns:
-                R_train.at[u, i] = float(count)
-                
-        if current_user.id not in R_train.index:
-            return {"status": "success", "data": []} # User belum punya klik, CF murni butuh klik
-            
-        # 3. Hitung Kemiripan User
-        user_sim_df = pd.DataFrame(cosine_similarity(R_train), index=R_train.index, columns=R_train.index)
-        np.fill_diagonal(user_sim_df.values, 0.0)
-        
-        # 4. Ambil Top-30 K-Nearest Neighbors (Sesuai hasil Evaluasi)
-        k = 30
-        top_k_users = user_sim_df.loc[current_user.id].nlargest(k).index
-        top_k_sim = user_sim_df.loc[current_user.id, top_k_users]
-        if top_k_sim.max() == 0:
-            return {"status": "success", "data": []}
-            
-        # 5. Hitung Skor CF
-        item_scores = R_train.loc[top_k_users].mul(top_k_sim, axis=0).sum(axis=0)
+        # 1. Matriks User-Item dari interaction store (tanpa scan tabel history)
+        if not interaction_store.has_user(current_user.id):
+            return [] # User belum punya klik, CF murni butuh klik
+
+        if CF_ENGINE == "item":
+            # 2-5. Item-Based CF: jumlah daftar tetangga (precomputed) dari item yang diklik
+            clicks = interaction_store.user_clicks(current_user.id)
+            cf = item_cf_model.snapshot()  # item_ids & skor dari model yang sama
+            item_ids = cf.item_ids
+            item_scores = cf.score(list(clicks.keys()), list(clicks.values()))
+            if not item_scores.any():
+                return []
+        else:
+            # 2. User-Item Matrix (CSR) + norma baris yang sudah dihitung
+            cf = interaction_store.snapshot()
+            item_ids = cf.item_ids
+            user_row = cf.user_index.get(current_user.id)
+            if user_row is None:
+                return []
+
+            # 3-5. Kemiripan user ini saja vs user lain, Top-30 KNN (Sesuai hasil Evaluasi), Skor CF
+            k = 30
+            item_scores = recommender.user_knn_scores(cf.R, user_row, k=k, norms=cf.norms)
+            if item_scores is None:
+                return []
         
         # 6. Filter tempat yang sudah dikunjungi
-        u_train_items = hist_df[hist_df['user_id'] == current_user.id]['wisata_id'].unique()
-        item_scores = item_scores.drop(index=u_train_items, errors='ignore')
-        
-        # 7. Ambil 6 Tertinggi
-        top_6_recs = item_scores.nlargest(6).index.tolist()
+        u_train_items = interaction_store.user_item_ids(current_user.id)
+        seen = np.isin(item_ids, u_train_items)
         
-        # Format ke bentuk metadata list
-        results = [d for d in data_wisata_csv if str(d['id']) in top_6_recs]
-        # Urutkan sesuai urutan skor
-        results.sort(key=lambda x: top_6_recs.index(str(x['id'])) if str(x['id']) in top_6_recs else 999)
-        
-        return {"status": "success", "data": results[:6]}
+        # 7. Ambil 6 Tertinggi, langsung ke baris katalog (urut skor)
+        top_6_recs = [item_ids[i] for i in recommender.top_k_indices(item_scores, 6, exclude=seen)]
+        return snap.rows_for(top_6_recs)
         
     except Exception as e:
         print(f"Error Personal Rek (CF): {e}")
-        return {"status": "success", "data": []}
+        return None
 
 @app.get("/api/v1/recommendations/hybrid")
-def get_hybrid_recommendations(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_hybrid_recommendations(response: Response, current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db), _ready: None = Depends(require_ai_ready)):
     """Menampilkan 6 Rekomendasi Hybrid Filtering (Alpha = 0.6)"""
-    global dest_ids, data_wisata_csv, sbert_embeddings, embedding_model
+    return cached_recommendations("hybrid", current_user, db, response, compute_hybrid_recommendations)
+
+def compute_hybrid_recommendations(current_user: models.User, db: Session, snap):
+    global dest_ids, sbert_embeddings, embedding_model
     try:
-        # 1. Ambil seluruh history user
-        all_hist = db.query(models.History).all()
-        user_hist = [h for h in all_hist if h.user_id == current_user.id]
+        # 1. Ambil history user ini saja (matriks CF dari interaction store)
+        user_hist = db.query(models.History).filter(models.History.user_id == current_user.id).order_by(models.History.id).all()
         
         if not user_hist:
             if current_user.has_onboarded and current_user.preferences:
@@ -572,78 +750,145 @@ def get_hybrid_recommendations(current_user: models.User = Depends(get_current_u
                     prefs = json.loads(current_user.preferences)
                     query_text = " ".join(prefs)
                     q_vec = embedding_model.embed_query(query_text)
-                    cbf_scores = pd.Series(cosine_similarity([q_vec], sbert_embeddings).flatten(), index=dest_ids)
-                    top_6_recs = cbf_scores.nlargest(6).index.tolist()
-                    results = [d for d in data_wisata_csv if str(d['id']) in top_6_recs]
-                    results.sort(key=lambda x: top_6_recs.index(str(x['id'])) if str(x['id']) in top_6_recs else 999)
-                    return {"status": "success", "data": results[:6]}
+                    cbf_scores = recommender.cosine_scores(q_vec, sbert_embeddings)[0]
+                    return snap.rows_for([dest_ids[i] for i in recommender.top_k_indices(cbf_scores, 6)])
                 except Exception as e:
                     print(f"Cold Start Error: {e}")
-            return {"status": "success", "data": []}
+                    return None
+            return []
             
-        hist_df = pd.DataFrame([{
-            'user_id': h.user_id,
-            'wisata_id': str(h.wisata_id),
-            'wisata_name': h.wisata_name
-        } for h in all_hist])
-        
         # ==========================================
         # FASE 1: MEMORY-BASED CF
         # ==========================================
-        all_users = hist_df['user_id'].unique()
-        R_train = pd.DataFrame(0.0, index=all_users, columns=dest_ids)
-        for (u, i), count in hist_df.groupby(['user_id', 'wisata_id']).size().items():
-            if u in R_train.index and i in R_train.columns:
-                R_train.at[u, i] = float(count)
+        cf = interaction_store.snapshot()
+        item_ids = cf.item_ids
                 
-        cf_scores = pd.Series(0.0, index=dest_ids)
-        if current_user.id in R_train.index:
-            user_sim_df = pd.DataFrame(cosine_similarity(R_train), index=R_train.index, columns=R_train.index)
-            np.fill_diagonal(user_sim_df.values, 0.0)
-            
+        cf_scores = np.zeros(len(dest_ids), dtype=np.float32)
+        user_row = cf.user_index.get(current_user.id)
+        if user_row is not None:
             k = 30
-            top_k_users = user_sim_df.loc[current_user.id].nlargest(k).index
-            top_k_sim = user_sim_df.loc[current_user.id, top_k_users]
-            if top_k_sim.max() > 0:
-                cf_scores = R_train.loc[top_k_users].mul(top_k_sim, axis=0).sum(axis=0)
+            knn_scores = recommender.user_knn_scores(cf.R, user_row, k=k, norms=cf.norms)
+            if knn_scores is not None:
+                cf_scores = knn_scores if item_ids == dest_ids else \
+                    recommender.align_scores(knn_scores, item_ids, dest_index, len(dest_ids))
 
         # ==========================================
         # FASE 2: CONTENT-BASED FILTERING (SBERT)
         # ==========================================
-        u_train = hist_df[hist_df['user_id'] == current_user.id]
-        query_text = " ".join(u_train['wisata_name'].tolist())
-        q_vec = embedding_model.embed_query(query_text)
-        cbf_scores = pd.Series(cosine_similarity([q_vec], sbert_embeddings).flatten(), index=dest_ids)
+        # Profil user = rata-rata embedding destinasi yang diklik (tanpa panggilan model)
+        cbf_scores = profile_store.scores(current_user.id)
+        if cbf_scores is None:
+            # Belum ada profil (mis. semua klik ke wisata di luar katalog): embed nama wisata
+            q_vec = embedding_model.embed_query(" ".join(h.wisata_name for h in user_hist))
+            cbf_scores = recommender.cosine_scores(q_vec, sbert_embeddings)[0]
         
         # ==========================================
         # FASE 3: HYBRID FILTERING
         # ==========================================
-        cf_norm = (cf_scores - cf_scores.min()) / (cf_scores.max() - cf_scores.min()) if cf_scores.max() > cf_scores.min() else cf_scores * 0.0
-        cbf_norm = (cbf_scores - cbf_scores.min()) / (cbf_scores.max() - cbf_scores.min()) if cbf_scores.max() > cbf_scores.min() else cbf_scores * 0.0
-        
+        # Min-max + blend (Alpha = 0.6), mask tempat yang sudah dikunjungi, Top-6 argpartition
         alpha = 0.6
-        hybrid_scores = (alpha * cf_norm) + ((1 - alpha) * cbf_norm)
-        
-        # Filter tempat yang sudah dikunjungi
-        u_train_items = u_train['wisata_id'].unique()
-        hybrid_scores = hybrid_scores.drop(index=u_train_items, errors='ignore')
-        
-        # Ambil 6 Tertinggi
-        top_6_recs = hybrid_scores.nlargest(6).index.tolist()
-        
-        # Format ke bentuk metadata list
-        results = [d for d in data_wisata_csv if str(d['id']) in top_6_recs]
-        # Urutkan sesuai urutan skor
-        results.sort(key=lambda x: top_6_recs.index(str(x['id'])) if str(x['id']) in top_6_recs else 999)
-        
-        return {"status": "success", "data": results[:6]}
+        seen = recommender.seen_mask(dest_index, {str(h.wisata_id) for h in user_hist}, len(dest_ids))
+        top_idx, _ = recommender.hybrid_top_k(cf_scores, cbf_scores, alpha, 6, seen)
+        return snap.rows_for([dest_ids[i] for i in top_idx])
         
     except Exception as e:
         print(f"Error Hybrid Rek: {e}")
-        return {"status": "success", "data": []}
-    
+        return None
+
+def hybrid_recommendations_batch(users: List[models.User], db: Session, cf_snapshot, snap, alpha: float = 0.6, top_n: int = 6):
+    """Hybrid Top-N untuk satu potongan user (logika sama dengan endpoint hybrid).
+
+    CF: satu produk matriks-matriks sparse untuk semua user di potongan ini.
+    CBF: vektor profil user; satu panggilan `embed_documents` untuk sisanya.
+    """
+    R, store_user_ids, store_item_ids, norms, store_row = cf_snapshot
+    dest_pos = dest_index
+    user_ids = [u.id for u in users]
+
+    hist = db.query(models.History.user_id, models.History.wisata_id, models.History.wisata_name)\
+        .filter(models.History.user_id.in_(user_ids)).order_by(models.History.id).all()
+    names = {uid: [] for uid in user_ids}
+    seen = np.zeros((len(users), len(dest_ids)), dtype=bool)
+    row_of = {uid: b for b, uid in enumerate(user_ids)}
+    for uid, wid, name in hist:
+        names[uid].append(name)
+        if str(wid) in dest_pos: seen[row_of[uid], dest_pos[str(wid)]] = True
+
+    # Teks profil CBF: nama wisata yang pernah diklik, atau preferensi onboarding (cold start)
+    texts = {}
+    for u in users:
+        if names[u.id]:
+            texts[u.id] = " ".join(names[u.id])
+        elif u.has_onboarded and u.preferences:
+            texts[u.id] = " ".join(json.loads(u.preferences))
+
+    # FASE 1: CF (User-KNN, K=30) untuk semua user di store sekaligus
+    cf_scores = np.zeros((len(users), len(dest_ids)))
+    in_store = [b for b, uid in enumerate(user_ids) if names[uid] and uid in store_row]
+    if in_store:
+        knn, _ = recommender.user_knn_scores_batch(R, [store_row[user_ids[b]] for b in in_store], k=30, norms=norms)
+        cols = [(j, dest_pos[iid]) for j, iid in enumerate(store_item_ids) if iid in dest_pos]
+        src, dst = [c[0] for c in cols], [c[1] for c in cols]
+        cf_scores[np.ix_(in_store, dst)] = knn[:, src]
+
+    # FASE 2: CBF dari vektor profil; embedding batch hanya untuk user tanpa profil (cold start)
+    cbf_scores = np.zeros((len(users), len(dest_ids)))
+    profile_scores, has_profile = profile_store.scores_batch(user_ids)
+    profiled = [b for b, uid in enumerate(user_ids) if names[uid] and has_profile[b]]
+    cbf_scores[profiled] = profile_scores[profiled]
+    embed_rows = [b for b, uid in enumerate(user_ids) if uid in texts and b not in profiled]
+    if embed_rows:
+        vecs = embedding_model.embed_documents([texts[user_ids[b]] for b in embed_rows])
+        cbf_scores[embed_rows] = recommender.cosine_scores(vecs, sbert_embeddings)
+
+    # FASE 3: HYBRID
+    hybrid = recommender.hybrid_scores(cf_scores, cbf_scores, alpha)
+
+    for b, uid in enumerate(user_ids):
+        if names[uid]:
+            scores, top = hybrid[b], recommender.top_k_indices(hybrid[b], top_n, exclude=seen[b])
+        elif uid in texts:
+            scores, top = cbf_scores[b], recommender.top_k_indices(cbf_scores[b], top_n)  # cold start: CBF saja
+        else:
+            scores, top = None, []
+        data = []
+        for i in top:
+            card = snap.card(dest_ids[i]) or {"id": dest_ids[i]}
+            data.append({**card, "score": round(float(scores[i]), 4)})
+        yield {"user_id": uid, "data": data}
+
+@app.post("/api/admin/recommendations/batch")
+def batch_recommendations_admin(request: BatchRecommendationRequest, admin_user: models.User = Depends(get_current_admin), db: Session = Depends(get_db), _ready: None = Depends(require_ai_ready)):
+    """Rekomendasi hybrid Top-6 untuk banyak user sekaligus, di-stream sebagai NDJSON (satu user per baris)"""
+    query = db.query(models.User.id)
+    if request.user_ids is not None:  # [] = tidak ada user, bukan "semua"
+        query = query.filter(models.User.id.in_(request.user_ids))
+    user_ids = [uid for (uid,) in query.order_by(models.User.id).all()]
+
+    interaction_store.catch_up(db)
+    cf = interaction_store.snapshot()
+    cf_snapshot = (cf.R, cf.user_ids, cf.item_ids, cf.norms, cf.user_index)
+    snap = catalog.snapshot()
+
+    def generate():
+        chunk_db = SessionLocal()
+        try:
+            for start in range(0, len(user_ids), BATCH_CHUNK_SIZE):
+                chunk_ids = user_ids[start:start + BATCH_CHUNK_SIZE]
+                try:
+                    users = chunk_db.query(models.User).filter(models.User.id.in_(chunk_ids)).order_by(models.User.id).all()
+                    for line in hybrid_recommendations_batch(users, chunk_db, cf_snapshot, snap):
+                        yield json.dumps(line) + "\n"
+                except Exception as e:
+                    logger.error(f"❌ Batch rekomendasi gagal ({chunk_ids[0]}-{chunk_ids[-1]}): {e}")
+                    yield json.dumps({"user_ids": chunk_ids, "error": str(e)}) + "\n"
+        finally:
+            chunk_db.close()
+
+    logger.info(f"📦 Batch rekomendasi: {len(user_ids)} user, potongan {BATCH_CHUNK_SIZE}")
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 
-    
 KAMUS_PANDALUNGAN = {
     "nandi": "dimana", "nang": "ke", "nggon": "tempat", "dolan": "wisata",
     "mangan": "kuliner", "mbadog": "makan", "mbois": "keren", "tretan": "saudara",
@@ -662,78 +907,157 @@ def pandalungan_normalizer(text: str) -> str:
 # Chat dan rekom
 # =========================================================
 
-@app.post("/api/v1/chat")
-def chat_rag(req: ChatRequest, current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
-    global vector_db, data_wisata_csv
+def current_index_version() -> tuple:
+    """Versi index = counter proses ini + revisi di disk (ditulis juga oleh CLI
+    vector_sync.py & worker lain), agar cache tidak basi setelah sinkronisasi manual."""
+    return (index_version, vector_sync.index_revision(PATH_DB_VEKTOR))
+
+
+def cached_vector_search(query: str, k: int, filter: Optional[dict] = None):
+    """similarity_search_with_relevance_scores lewat retrieval_cache.
+
+    Hit: dokumen diambil per id dari koleksi Chroma (tanpa embed query & HNSW).
+    Miss: pencarian biasa; id + skor disimpan untuk versi index saat itu.
+    """
+    key = RetrievalCache.key(query, k, filter)
+    version = current_index_version()
+    hits = retrieval_cache.get(key, version)
+    if hits is not None:
+        found = vector_db._collection.get(ids=[doc_id for doc_id, _ in hits], include=["documents", "metadatas"])
+        by_id = {doc_id: (text, meta) for doc_id, text, meta in zip(found["ids"], found["documents"], found["metadatas"])}
+        # get() tidak menjamin urutan -> ikuti urutan skor yang tersimpan
+        Document = ai_services.document_class()
+        return [(Document(id=doc_id, page_content=by_id[doc_id][0], metadata=by_id[doc_id][1] or {}), score)
+                for doc_id, score in hits if doc_id in by_id]
+
+    docs_with_scores = vector_db.similarity_search_with_relevance_scores(query, k=k, filter=filter)
+    if all(doc.id for doc, _ in docs_with_scores):
+        retrieval_cache.set(key, [(doc.id, score) for doc, score in docs_with_scores], version)
+    return docs_with_scores
+
+
+def retrieve_chat_context(question: str, cache_partition: Optional[tuple] = None):
+    """Normalisasi dialek + pencarian vektor (embed query = CPU-bound, dijalankan di chat_executor).
+
+    Dengan `cache_partition`, semantic answer cache dicek dulu; jika ada jawaban mirip,
+    retrieval dilewati dan nilai cache dikembalikan sebagai elemen ketiga. Vektor query
+    (elemen keempat) dipakai ulang oleh remember_answer agar embed tidak jalan di event loop.
+    """
+    normalized_query = pandalungan_normalizer(question)
+    query_vector = None
+    if cache_partition is not None:
+        query_vector = embedding_model.embed_query(normalized_query)
+        cached = answer_cache.lookup(query_vector, cache_partition)
+        if cached is not None:
+            return normalized_query, [], cached[0], query_vector
+    # Hybrid Search: k=10 agar context tidak terlalu penuh
+    docs_with_scores = cached_vector_search(normalized_query, k=10)
+    return normalized_query, docs_with_scores, None, query_vector
+
+
+async def prepare_chat(loop, req: ChatRequest, user_id: int, db: Session, partition: Optional[tuple]):
+    """Retrieval (chat_executor) & sesi percakapan (thread pool) secara paralel.
+
+    Keduanya selalu ditunggu sampai selesai sebelum error dilempar: jika retrieval
+    gagal lebih dulu, load_chat_session masih memakai `db` dan penutupan sesi oleh
+    get_db tidak boleh terjadi bersamaan.
+    """
+    results = await asyncio.gather(
+        loop.run_in_executor(chat_executor, retrieve_chat_context, req.question, partition),
+        run_in_threadpool(load_chat_session, db, user_id, req.question, req.session_id),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+def answer_cache_partition(req: ChatRequest) -> Optional[tuple]:
+    """Partisi semantic cache (bahasa, versi katalog, versi index), atau None jika
+    pertanyaan adalah lanjutan percakapan dalam sesi (jawabannya bergantung riwayat)."""
+    if is_follow_up(req.question, has_history=bool(req.session_id)):
+        answer_cache.record_bypass("follow_up")
+        return None
+    return (req.language, catalog.version, current_index_version())
+
+
+def remember_answer(partition: Optional[tuple], query_vector: Optional[List[float]], ai_answer: str, recommendations: List[dict]):
+    if partition is not None and query_vector is not None and ai_answer:
+        # Vektor dari retrieve_chat_context (sudah di-embed di chat_executor)
+        answer_cache.store(query_vector, partition,
+                           {"answer": ai_answer, "recommendations": recommendations})
+
+
+def load_chat_session(db: Session, user_id: int, question: str, session_id: Optional[int]):
+    """Buat sesi baru jika perlu, lalu ambil 6 pesan terakhir sebagai teks riwayat.
+
+    Koneksi DB dikembalikan ke pool sebelum menunggu LLM (bisa beberapa detik);
+    sesi yang sama dipakai lagi saat menyimpan pesan.
+    """
     try:
-        llm = get_groq_llm()
-        session_id = req.session_id
-        
-        # 1. Handle Session
         if not session_id:
-            new_session = models.ChatSession(user_id=current_user.id, title=req.question[:30])
+            new_session = models.ChatSession(user_id=user_id, title=question[:30])
             db.add(new_session); db.commit(); db.refresh(new_session)
-            session_id = new_session.id
-
-        # 2. Pandalungan Normalization
-        normalized_query = pandalungan_normalizer(req.question)
-        user_query_lower = normalized_query.lower()
-
-        # 3. Hybrid Search: k=10 agar context tidak terlalu penuh
-        docs_with_scores = vector_db.similarity_search_with_relevance_scores(normalized_query, k=10)
-        
-        # 4. History Injection
+            return new_session.id, ""
         recent_chats = db.query(models.ChatMessage).filter(models.ChatMessage.session_id == session_id).order_by(models.ChatMessage.timestamp.desc()).limit(6).all()
-        history_text = "\n".join([f"{msg.sender.upper()}: {msg.content}" for msg in reversed(recent_chats)])
+        return session_id, "\n".join([f"{msg.sender.upper()}: {msg.content}" for msg in reversed(recent_chats)])
+    finally:
+        db.close()
 
-        # 5. Intent Detection (Weather & Stress)
-        is_complaining_weather = any(x in user_query_lower for x in ["hujan", "udan", "mendung", "badai"])
-        is_stressed = any(x in user_query_lower for x in ["stres", "pusing", "healing", "capek"])
 
-        # 6. Membangun Konteks & Kandidat Rekomendasi
-        context_list = []
-        final_candidates = [] 
-        seen_ids = set()
+def build_chat_candidates(docs_with_scores, user_query_lower: str, snap):
+    """Konteks prompt + kandidat kartu rekomendasi dari hasil retrieval."""
+    # Intent Detection (Weather & Stress)
+    is_complaining_weather = any(x in user_query_lower for x in ["hujan", "udan", "mendung", "badai"])
+    is_stressed = any(x in user_query_lower for x in ["stres", "pusing", "healing", "capek"])
 
-        csv_lookup = {str(w["id"]): w for w in data_wisata_csv}
+    context_list = []
+    final_candidates = [] 
+    seen_ids = set()
 
-        for doc, score in docs_with_scores:
-            # Threshold dihapus agar query pendek tetap dijawab
-            context_list.append(doc.page_content)
-            
-            if doc.metadata.get('type') == 'tourism' or 'id' in doc.metadata:
-                wid = str(doc.metadata.get('id'))
-                kat = doc.metadata.get('kategori', '')
-
-                if is_complaining_weather and kat in ["Pantai", "Alam"]: continue
-                if is_stressed and kat in ["Sejarah", "Makam"]: continue
-
-                if wid not in seen_ids:
-                    meta = dict(doc.metadata)
-                    # Sinkronisasi dengan CSV terbaru (menghindari stale URL)
-                    if wid in csv_lookup:
-                        meta['gambar'] = csv_lookup[wid].get('gambar', meta.get('gambar', ''))
-                        meta['nama_wisata'] = csv_lookup[wid].get('nama_wisata', meta.get('nama_wisata', ''))
-                        meta['kategori'] = csv_lookup[wid].get('kategori', meta.get('kategori', ''))
-                        meta['alamat'] = csv_lookup[wid].get('alamat', meta.get('alamat', ''))
-                    final_candidates.append(meta)
-                    seen_ids.add(wid)
-
-        # 2. LOGIKA GUARDRAIL (Di luar loop agar tidak NameError)
-        if not context_list:
-            context_text = "TIDAK ADA DATA TERKAIT PARIWISATA JEMBER DI DATABASE."
-        else:
-            context_text = "\n\n".join(context_list)
+    for doc, score in docs_with_scores:
+        # Threshold dihapus agar query pendek tetap dijawab
+        context_list.append(doc.page_content)
+        
+        if doc.metadata.get('type') == 'tourism' or 'id' in doc.metadata:
+            wid = str(doc.metadata.get('id'))
+            kat = doc.metadata.get('kategori', '')
+
+            if is_complaining_weather and kat in ["Pantai", "Alam"]: continue
+            if is_stressed and kat in ["Sejarah", "Makam"]: continue
+
+            if wid not in seen_ids:
+                meta = dict(doc.metadata)
+                # Sinkronisasi dengan katalog terbaru (menghindari stale URL)
+                row = snap.get(wid)
+                if row:
+                    meta['gambar'] = row.get('gambar', meta.get('gambar', ''))
+                    meta['nama_wisata'] = row.get('nama_wisata', meta.get('nama_wisata', ''))
+                    meta['kategori'] = row.get('kategori', meta.get('kategori', ''))
+                    meta['alamat'] = row.get('alamat', meta.get('alamat', ''))
+                final_candidates.append(meta)
+                seen_ids.add(wid)
+
+    # LOGIKA GUARDRAIL
+    if not context_list:
+        context_text = "TIDAK ADA DATA TERKAIT PARIWISATA JEMBER DI DATABASE."
+    else:
+        context_text = "\n\n".join(context_list)
+    return context_text, final_candidates
 
-        # Setup Language
-        language_instruction = "Gaya bicara: Santai, cerdas, membantu, dan menggunakan dialek Pandalungan Jember yang natural."
-        if req.language == "jowo":
-            language_instruction = "Gaya bicara: Gunakan bahasa Jawa Timuran / Suroboyoan / Pandalungan yang medok dan santai."
-        elif req.language == "madura":
-            language_instruction = "Gaya bicara: Gunakan campuran bahasa Madura (Pandalungan Jember) yang santai."
 
-        # 7. PROMPT ENGINEERING (HARDENED v2.0 — Audit)
-        base_prompt = f"""Identitas: Kamu adalah "Cak Jember", asisten wisata digital resmi JemberTrip yang ahli dalam segala hal seputar Kabupaten Jember — wisata, kuliner, transportasi, akomodasi, budaya, dan event.
+def build_chat_prompt(language: str, context_text: str, history_text: str):
+    """Prompt sistem Cak Jember (gaya bahasa + konteks + riwayat) sebagai ChatPromptTemplate."""
+    # Setup Language
+    language_instruction = "Gaya bicara: Santai, cerdas, membantu, dan menggunakan dialek Pandalungan Jember yang natural."
+    if language == "jowo":
+        language_instruction = "Gaya bicara: Gunakan bahasa Jawa Timuran / Suroboyoan / Pandalungan yang medok dan santai."
+    elif language == "madura":
+        language_instruction = "Gaya bicara: Gunakan campuran bahasa Madura (Pandalungan Jember) yang santai."
+
+    # 7. PROMPT ENGINEERING (HARDENED v2.0 — Audit)
+    base_prompt = f"""Identitas: Kamu adalah "Cak Jember", asisten wisata digital resmi JemberTrip yang ahli dalam segala hal seputar Kabupaten Jember — wisata, kuliner, transportasi, akomodasi, budaya, dan event.
         {language_instruction}
 
         ══════════════════════════════════════════
@@ -793,47 +1117,81 @@ def chat_rag(req: ChatRequest, current_user: models.User = Depends(get_current_u
         {history_text}
         """
 
-        prompt = ChatPromptTemplate.from_messages([("system", base_prompt), ("human", "{question}")])
-        chain = prompt | llm
-        response = chain.invoke({"question": req.question})
-        ai_answer = response.content
+    return ai_services.chat_prompt_template().from_messages([("system", base_prompt), ("human", "{question}")])
 
-        # 8. ADVANCED SMART SYNC (Sinkronisasi & Urutan Kartu)
-        synced_recommendations = []
-        added_ids = set()
 
-        user_q = req.question.lower()
+def sync_chat_recommendations(final_candidates: List[dict], ai_answer: str, question: str) -> List[dict]:
+    """ADVANCED SMART SYNC: kartu = kandidat yang disebut di jawaban AI / pertanyaan user."""
+    synced_recommendations = []
+    added_ids = set()
 
-        # Mencocokkan nama wisata yang ada di teks jawaban AI dengan metadata
-        for cand in final_candidates:
-            nama_wisata = cand.get('nama_wisata', '').lower()
-            wid = str(cand.get('id', ''))
+    user_q = question.lower()
 
-            nama_words = [w for w in nama_wisata.split() if len(w) > 3]
-            
-            if (nama_wisata in ai_answer.lower() or 
-                nama_wisata in user_q or
-                any(word in user_q for word in nama_words)):
-                
-                if wid not in added_ids:
-                    synced_recommendations.append(cand)
-                    added_ids.add(wid)
+    # Mencocokkan nama wisata yang ada di teks jawaban AI dengan metadata
+    for cand in final_candidates:
+        nama_wisata = cand.get('nama_wisata', '').lower()
+        wid = str(cand.get('id', ''))
+
+        nama_words = [w for w in nama_wisata.split() if len(w) > 3]
         
-        # Urutkan kartu berdasarkan posisi penyebutan pertama kali di teks jawaban AI
-        synced_recommendations.sort(key=lambda x: x.get('nama_wisata', '').lower() in user_q, reverse=True)
+        if (nama_wisata in ai_answer.lower() or 
+            nama_wisata in user_q or
+            any(word in user_q for word in nama_words)):
+            
+            if wid not in added_ids:
+                synced_recommendations.append(cand)
+                added_ids.add(wid)
+    
+    # Urutkan kartu berdasarkan posisi penyebutan pertama kali di teks jawaban AI
+    synced_recommendations.sort(key=lambda x: x.get('nama_wisata', '').lower() in user_q, reverse=True)
+
+    # Batasi maksimal 6 kartu
+    return synced_recommendations[:6]
+
+
+def save_chat_exchange(db: Session, session_id: int, question: str, ai_answer: str, recommendations: List[dict]):
+    db.add(models.ChatMessage(session_id=session_id, sender="user", content=question))
+    db.add(models.ChatMessage(
+        session_id=session_id, 
+        sender="ai", 
+        content=ai_answer, 
+        recommendations=recommendations
+    ))
+    db.commit()
 
-        # Batasi maksimal 6 kartu
-        synced_recommendations = synced_recommendations[:6]
+
+@app.post("/api/v1/chat")
+async def chat_rag(req: ChatRequest, current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db), _ready: None = Depends(require_ai_ready)):
+    # Async: selama menunggu Groq, thread pool FastAPI tetap bebas untuk route sync lain.
+    # Retrieval (embed query + Chroma) di chat_executor yang dibatasi; query DB di thread pool.
+    # Lepas koneksi yang dipegang get_current_user tanpa menunggu thread: thread pool
+    # bisa penuh oleh request lain yang sedang antre koneksi dari pool yang sama.
+    db.close()
+    try:
+        loop = asyncio.get_running_loop()
+        partition = answer_cache_partition(req)
+
+        # 1-4. Semantic cache / retrieval & sesi/riwayat percakapan berjalan bersamaan
+        (normalized_query, docs_with_scores, cached, query_vector), (session_id, history_text) = await prepare_chat(loop, req, current_user.id, db, partition)
+        if cached is not None:
+            # Pertanyaan hampir sama sudah pernah dijawab: tanpa panggilan LLM
+            await run_in_threadpool(save_chat_exchange, db, session_id, req.question, cached["answer"], cached["recommendations"])
+            return {"status": "success", "session_id": session_id, "answer": cached["answer"], "recommendations": cached["recommendations"]}
+
+        # 5-6. Intent, konteks & kandidat rekomendasi
+        context_text, final_candidates = build_chat_candidates(docs_with_scores, normalized_query.lower(), catalog.snapshot())
+
+        # 7. Prompt + LLM (async client, tidak memegang thread; key dipilih oleh groq_pool)
+        messages = build_chat_prompt(req.language, context_text, history_text).format_messages(question=req.question)
+        response = await groq_pool.ainvoke(messages)
+        ai_answer = response.content
+
+        # 8. Sinkronisasi & urutan kartu
+        synced_recommendations = sync_chat_recommendations(final_candidates, ai_answer, req.question)
+        remember_answer(partition, query_vector, ai_answer, synced_recommendations)
 
         # 9. Simpan ke Database
-        db.add(models.ChatMessage(session_id=session_id, sender="user", content=req.question))
-        db.add(models.ChatMessage(
-            session_id=session_id, 
-            sender="ai", 
-            content=ai_answer, 
-            recommendations=synced_recommendations
-        ))
-        db.commit()
+        await run_in_threadpool(save_chat_exchange, db, session_id, req.question, ai_answer, synced_recommendations)
 
         return {
             "status": "success", 
@@ -841,48 +1199,162 @@ def chat_rag(req: ChatRequest, current_user: models.User = Depends(get_current_u
             "answer": ai_answer, 
             "recommendations": synced_recommendations
         }
+    except GroqUnavailable as e:
+        raise groq_unavailable_error(e)
     except Exception as e:
         logger.error(f"Error Audit: {str(e)}")
         raise HTTPException(500, f"Error di Otak Cak Jember: {str(e)}")
 
 
+def sse_event(event: str, data: Any) -> str:
+    """Satu pesan Server-Sent Events (data JSON satu baris)."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def persist_chat_exchange(session_id: int, question: str, ai_answer: str, recommendations: List[dict]):
+    """Simpan pesan dengan sesi DB sendiri (dipanggil setelah stream selesai)."""
+    db = SessionLocal()
+    try:
+        save_chat_exchange(db, session_id, question, ai_answer, recommendations)
+    finally:
+        db.close()
+
+
+@app.post("/api/v1/chat/stream")
+async def chat_rag_stream(req: ChatRequest, current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db), _ready: None = Depends(require_ai_ready)):
+    """Varian streaming /api/v1/chat (SSE). Urutan event:
+    `meta` {session_id} -> `token` {text} ... -> `recommendations` {data} -> `done` {session_id, ttft_ms}
+    (`error` {detail} jika LLM gagal di tengah jalan). Pesan disimpan setelah stream selesai.
+    """
+    started = time.perf_counter()
+    db.close()  # sama seperti chat_rag: jangan pegang koneksi selama streaming
+    try:
+        loop = asyncio.get_running_loop()
+        partition = answer_cache_partition(req)
+        (normalized_query, docs_with_scores, cached, query_vector), (session_id, history_text) = await prepare_chat(loop, req, current_user.id, db, partition)
+        if cached is None:
+            context_text, final_candidates = build_chat_candidates(docs_with_scores, normalized_query.lower(), catalog.snapshot())
+            messages = build_chat_prompt(req.language, context_text, history_text).format_messages(question=req.question)
+            # Cek key sebelum stream dimulai agar "semua cooldown" tetap jadi 503 + Retry-After
+            groq_pool.check_available()
+    except GroqUnavailable as e:
+        raise groq_unavailable_error(e)
+    except Exception as e:
+        logger.error(f"Error Audit: {str(e)}")
+        raise HTTPException(500, f"Error di Otak Cak Jember: {str(e)}")
+
+    async def cached_stream():
+        # Jawaban dari semantic cache: dikirim utuh sebagai satu token
+        ttft_ms = (time.perf_counter() - started) * 1000
+        chat_ttft_ms.append(ttft_ms)
+        yield sse_event("meta", {"session_id": session_id})
+        yield sse_event("token", {"text": cached["answer"]})
+        yield sse_event("recommendations", {"data": cached["recommendations"]})
+        yield sse_event("done", {"session_id": session_id, "ttft_ms": round(ttft_ms, 1), "cached": True})
+        await run_in_threadpool(persist_chat_exchange, session_id, req.question, cached["answer"], cached["recommendations"])
+
+    async def event_stream():
+        yield sse_event("meta", {"session_id": session_id})
+        parts, ttft_ms = [], None
+        try:
+            async for chunk in groq_pool.astream(messages):
+                if not chunk.content:
+                    continue
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                    chat_ttft_ms.append(ttft_ms)
+                parts.append(chunk.content)
+                yield sse_event("token", {"text": chunk.content})
+        except Exception as e:
+            logger.error(f"Error Audit (stream): {str(e)}")
+            yield sse_event("error", {"detail": f"Error di Otak Cak Jember: {str(e)}"})
+            return
+
+        ai_answer = "".join(parts)
+        synced_recommendations = sync_chat_recommendations(final_candidates, ai_answer, req.question)
+        remember_answer(partition, query_vector, ai_answer, synced_recommendations)
+        yield sse_event("recommendations", {"data": synced_recommendations})
+        yield sse_event("done", {"session_id": session_id, "ttft_ms": round(ttft_ms or 0.0, 1)})
+
+        await run_in_threadpool(persist_chat_exchange, session_id, req.question, ai_answer, synced_recommendations)
+        logger.info(f"⚡ Chat stream: TTFT {ttft_ms or 0:.0f} ms, total {(time.perf_counter() - started) * 1000:.0f} ms, {len(parts)} potongan.")
+
+    return StreamingResponse(
+        cached_stream() if cached is not None else event_stream(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/api/v1/rekomendasi")
-def get_similar_wisata(req: RecommendationRequest):
-    global vector_db, data_wisata_csv
+def get_similar_wisata(req: RecommendationRequest, _ready: None = Depends(require_ai_ready)):
+    global vector_db
     try:
-        docs = vector_db.similarity_search(
-            req.query, 
-            k=10, 
-            filter={"type": "tourism"}
-        )
-        
-        # Buat lookup dict dari CSV terbaru (by id) untuk sinkronisasi gambar
-        csv_lookup = {str(w["id"]): w for w in data_wisata_csv}
+        docs = [doc for doc, _ in cached_vector_search(req.query, k=10, filter={"type": "tourism"})]
         
+        snap = catalog.snapshot()
         results = []
         for d in docs:
             meta = dict(d.metadata)
             # Sinkronkan gambar dari CSV terbaru (ChromaDB bisa stale)
-            wisata_id = str(meta.get("id", ""))
-            if wisata_id in csv_lookup:
-                meta["gambar"] = csv_lookup[wisata_id].get("gambar", meta.get("gambar", ""))
-                meta["nama_wisata"] = csv_lookup[wisata_id].get("nama_wisata", meta.get("nama_wisata", ""))
-                meta["kategori"] = csv_lookup[wisata_id].get("kategori", meta.get("kategori", ""))
-                meta["alamat"] = csv_lookup[wisata_id].get("alamat", meta.get("alamat", ""))
+            row = snap.get(meta.get("id", ""))
+            if row:
+                meta["gambar"] = row.get("gambar", meta.get("gambar", ""))
+                meta["nama_wisata"] = row.get("nama_wisata", meta.get("nama_wisata", ""))
+                meta["kategori"] = row.get("kategori", meta.get("kategori", ""))
+                meta["alamat"] = row.get("alamat", meta.get("alamat", ""))
             results.append({"metadata": meta})
         
         return {"status": "success", "results": results[:6]}
     except Exception as e:
         return {"status": "success", "results": []}
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Cek header If-None-Match (daftar dipisah koma, boleh W/ atau *)."""
+    if not if_none_match: return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
 @app.get("/api/v1/list-wisata")
-def list_wisata():
-    global data_wisata_csv
-    return {"status": "success", "data": data_wisata_csv}
+def list_wisata(
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = Query(None, description="Kolom dipisah koma, mis. id,nama_wisata,gambar"),
+    view: str = Query("full", pattern="^(full|card)$"),
+    kategori: Optional[str] = None,
+):
+    # Satu snapshot per request: data, total, dan ETag selalu konsisten
+    snap = catalog.snapshot()
+
+    columns = None
+    if fields:
+        columns = ["id"] + [f.strip() for f in fields.split(",") if f.strip() and f.strip() != "id"]
+        unknown = [c for c in columns if c not in catalog_store.CSV_COLUMNS]
+        if unknown: raise HTTPException(400, f"Field tidak dikenal: {', '.join(unknown)}")
+
+    # ETag kuat = isi katalog + parameter (halaman/proyeksi berbeda -> representasi berbeda)
+    params = f"{offset}|{limit}|{','.join(columns or [])}|{view}|{kategori or ''}"
+    etag = f'"{snap.digest}-{hashlib.sha1(params.encode("utf-8")).hexdigest()[:8]}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    rows = snap.rows_for(snap.ids_in_kategori(kategori)) if kategori else snap.rows
+    total = len(rows)
+    page = rows[offset:offset + limit] if limit else rows[offset:]
+    if columns:
+        page = [{c: r.get(c) for c in columns} for r in page]
+    elif view == "card":
+        page = [snap.card(r["id"]) for r in page]
+
+    next_offset = offset + len(page) if offset + len(page) < total else None
+    return FastJSONResponse(
+        {"status": "success", "data": page, "total": total, "offset": offset, "next_offset": next_offset},
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
 
 @app.get("/api/v1/wisata/{id}")
 def detail_wisata(id: str):
-    res = next((i for i in data_wisata_csv if str(i["id"]) == id), None)
+    res = catalog.snapshot().get(id)
     if res: return {"status": "success", "data": res}
     raise HTTPException(404, "Not found")
 
@@ -892,28 +1364,27 @@ def get_sessions(user: models.User = Depends(get_current_user), db: Session = De
 
 @app.get("/api/chat/{sid}/messages")
 def get_messages(sid: int, user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return {"status": "success", "data": [ChatMessageResponse.from_orm(m) for m in db.query(models.ChatMessage).filter(models.ChatMessage.session_id == sid).order_by(models.ChatMessage.timestamp.asc()).all()]}
+    return FastJSONResponse({"status": "success", "data": [ChatMessageResponse.from_orm(m) for m in db.query(models.ChatMessage).filter(models.ChatMessage.session_id == sid).order_by(models.ChatMessage.timestamp.asc()).all()]})
 
 # --- ADMIN ENDPOINTS ---
 @app.post("/api/admin/generate-desc")
 def generate_description_ai(req: GenerateDescRequest, admin_user: models.User = Depends(get_current_admin)):
     try:
-        llm = get_groq_llm()
         prompt = f"Buatkan deskripsi wisata menarik untuk: {req.nama_wisata} ({req.kategori}). Gaya bahasa santai dan emosional."
-        response = llm.invoke(prompt)
+        response = groq_pool.invoke(prompt)
         return {"status": "success", "description": response.content}
+    except GroqUnavailable as e: raise groq_unavailable_error(e)
     except Exception: raise HTTPException(500, "Gagal generate.")
 
 @app.get("/api/admin/stats")
 def get_admin_stats(admin_user: models.User = Depends(get_current_admin), db: Session = Depends(get_db)):
     try:
         popular = db.query(models.History.wisata_name, func.count(models.History.id).label('count')).group_by(models.History.wisata_name).order_by(func.count(models.History.id).desc()).first()
-        return {"status": "success", "data": {"total_users": db.query(models.User).count(), "total_wisata": len(data_wisata_csv), "total_chats": db.query(models.ChatSession).count(), "popular_wisata": popular[0] if popular else "-", "popular_count": popular[1] if popular else 0}}
+        return {"status": "success", "data": {"total_users": db.query(models.User).count(), "total_wisata": len(catalog.snapshot()), "total_chats": db.query(models.ChatSession).count(), "popular_wisata": popular[0] if popular else "-", "popular_count": popular[1] if popular else 0}}
     except Exception: return {"status": "error"}
 
 @app.post("/api/admin/add-wisata")
-def add_wisata_admin(nama_wisata: str = Form(...), deskripsi: str = Form(...), kategori: str = Form(...), alamat: str = Form(...), harga_tiket: str = Form(...), gambar: UploadFile = File(None), admin_user: models.User = Depends(get_current_admin)):
-    global data_wisata_csv
+def add_wisata_admin(nama_wisata: str = Form(...), deskripsi: str = Form(...), kategori: str = Form(...), alamat: str = Form(...), harga_tiket: str = Form(...), gambar: UploadFile = File(None), admin_user: models.User = Depends(get_current_admin), db: Session = Depends(get_db)):
     try:
         filename = ""
         if gambar and gambar.filename:
@@ -921,10 +1392,14 @@ def add_wisata_admin(nama_wisata: str = Form(...), deskripsi: str = Form(...), k
             path = f"uploads/{clean}"
             with open(path, "wb") as buffer: shutil.copyfileobj(gambar.file, buffer)
             filename = f"{get_public_url()}/images/{clean}"
-        new_entry = {"id": str(len(data_wisata_csv) + 1), "nama_wisata": nama_wisata, "deskripsi": deskripsi, "kategori": kategori, "alamat": alamat, "harga_tiket": harga_tiket, "gambar": filename, "combined_text": f"{nama_wisata} {kategori} {deskripsi}"}
-        data_wisata_csv.append(new_entry)
-        save_csv_changes()
-        if vector_db: vector_db.add_texts(texts=[new_entry["combined_text"]], metadatas=[new_entry])
+        new_entry = {"nama_wisata": nama_wisata, "deskripsi": deskripsi, "kategori": kategori, "alamat": alamat, "harga_tiket": harga_tiket, "gambar": filename, "combined_text": f"{nama_wisata} {kategori} {deskripsi}"}
+        def add(rows):
+            # Satu INSERT; id dari autoincrement tabel (tidak bentrok setelah ada yang dihapus)
+            new_row = models.Destinasi(position=catalog_store.next_position(db), **new_entry)
+            db.add(new_row); db.flush()  # id terisi, commit setelah index ikut tersinkron
+            return rows + [catalog_store.row_from_model(new_row)]
+
+        new_entry = catalog.update(add, commit=db.commit, rollback=db.rollback).rows[-1]
         return {"status": "success", "message": "Berhasil", "data": new_entry}
     except Exception as e: raise HTTPException(500, str(e))
 
@@ -932,45 +1407,53 @@ class ReorderRequest(BaseModel):
     new_order_ids: List[str]
 
 @app.put("/api/admin/wisata-reorder")
-def reorder_wisata_admin(request: ReorderRequest, admin_user: models.User = Depends(get_current_admin)):
-    global data_wisata_csv
-    id_to_data = {str(item["id"]): item for item in data_wisata_csv}
-    new_data = []
-    for wid in request.new_order_ids:
-        if wid in id_to_data:
-            new_data.append(id_to_data[wid])
-    
-    if len(new_data) == len(data_wisata_csv):
-        data_wisata_csv.clear()
-        data_wisata_csv.extend(new_data)
-        save_csv_changes()
-        return {"status": "success", "message": "Urutan diperbarui"}
-    else:
-        raise HTTPException(400, "Jumlah ID tidak cocok dengan jumlah data wisata")
+def reorder_wisata_admin(request: ReorderRequest, admin_user: models.User = Depends(get_current_admin), db: Session = Depends(get_db)):
+    def reorder(rows):
+        id_to_data = {item["id"]: item for item in rows}
+        new_data = [id_to_data[wid] for wid in request.new_order_ids if wid in id_to_data]
+        if len(new_data) != len(rows):
+            raise HTTPException(400, "Jumlah ID tidak cocok dengan jumlah data wisata")
+        db.bulk_update_mappings(models.Destinasi, [{"id": int(d["id"]), "position": pos} for pos, d in enumerate(new_data, start=1)])
+        return new_data
+
+    catalog.update(reorder, commit=db.commit, rollback=db.rollback)
+    return {"status": "success", "message": "Urutan diperbarui"}
 
 @app.put("/api/admin/wisata/{id}")
-def edit_wisata_admin(id: str, nama_wisata: str = Form(...), deskripsi: str = Form(...), kategori: str = Form(...), alamat: str = Form(...), harga_tiket: str = Form(...), gambar: UploadFile = File(None), admin_user: models.User = Depends(get_current_admin)):
-    idx = next((i for i, d in enumerate(data_wisata_csv) if str(d["id"]) == id), None)
-    if idx is None: raise HTTPException(404, "Not found")
+def edit_wisata_admin(id: str, nama_wisata: str = Form(...), deskripsi: str = Form(...), kategori: str = Form(...), alamat: str = Form(...), harga_tiket: str = Form(...), gambar: UploadFile = File(None), admin_user: models.User = Depends(get_current_admin), db: Session = Depends(get_db)):
+    if id not in catalog.snapshot(): raise HTTPException(404, "Not found")
     try:
-        current = data_wisata_csv[idx]
-        img = current.get("gambar", "")
+        img = None
         if gambar and gambar.filename:
             clean = f"{datetime.now().timestamp()}_{gambar.filename.replace(' ', '_')}"
             path = f"uploads/{clean}"
             with open(path, "wb") as buffer: shutil.copyfileobj(gambar.file, buffer)
             img = f"{get_public_url()}/images/{clean}"
-        updated = {**current, "nama_wisata": nama_wisata, "deskripsi": deskripsi, "kategori": kategori, "alamat": alamat, "harga_tiket": harga_tiket, "gambar": img, "combined_text": f"{nama_wisata} {kategori} {deskripsi}"}
-        data_wisata_csv[idx] = updated
-        save_csv_changes()
+        def edit(rows):
+            # Snapshot saat ini = isi `rows` (lock writer sedang dipegang)
+            idx = catalog.snapshot().position(id)
+            db_row = catalog_store.find_row(db, id)
+            if idx is None or db_row is None: raise HTTPException(404, "Not found")
+            changes = {"nama_wisata": nama_wisata, "deskripsi": deskripsi, "kategori": kategori, "alamat": alamat, "harga_tiket": harga_tiket, "gambar": img or rows[idx].get("gambar", ""), "combined_text": f"{nama_wisata} {kategori} {deskripsi}"}
+            for field, value in changes.items(): setattr(db_row, field, value)
+            db.flush()  # satu UPDATE untuk baris ini saja; commit setelah index tersinkron
+            rows[idx] = {**rows[idx], **changes}
+            return rows
+
+        updated = catalog.update(edit, commit=db.commit, rollback=db.rollback).get(id)
         return {"status": "success", "data": updated}
+    except HTTPException: raise
     except Exception as e: raise HTTPException(500, str(e))
 
 @app.delete("/api/admin/wisata/{id}")
-def delete_wisata_admin(id: str, admin_user: models.User = Depends(get_current_admin)):
-    global data_wisata_csv
-    data_wisata_csv = [d for d in data_wisata_csv if str(d['id']) != id]
-    save_csv_changes()
+def delete_wisata_admin(id: str, admin_user: models.User = Depends(get_current_admin), db: Session = Depends(get_db)):
+    def delete(rows):
+        db_row = catalog_store.find_row(db, id)
+        if db_row is not None:
+            db.delete(db_row); db.flush()
+        return [d for d in rows if d['id'] != id]
+
+    catalog.update(delete, commit=db.commit, rollback=db.rollback)
     return {"status": "success", "message": "Dihapus"}
 
 
@@ -982,6 +1465,18 @@ def delete_wisata_admin(id: str, admin_user: models.User = Depends(get_current_a
 #      NEW ADMIN MONITORING ENDPOINTS
 # ==========================================
 
+def chat_stream_stats():
+    samples = np.array(chat_ttft_ms)
+    if not len(samples):
+        return {"count": 0}
+    return {"count": len(samples), "ttft_p50_ms": round(float(np.percentile(samples, 50)), 1), "ttft_p95_ms": round(float(np.percentile(samples, 95)), 1)}
+
+@app.get("/api/admin/metrics")
+def get_cache_metrics(admin_user: models.User = Depends(get_current_admin)):
+    """Statistik cache in-memory (hit/miss) untuk memantau efektivitasnya"""
+    query_cache = embedding_model.cache.stats() if hasattr(embedding_model, "cache") else None
+    return {"status": "success", "data": {"query_embedding_cache": query_cache, "recommendation_cache": rec_cache.stats(), "catalog_version": catalog.version, "index_version": index_version, "chat_stream": chat_stream_stats(), "semantic_answer_cache": answer_cache.stats(), "retrieval_cache": retrieval_cache.stats(), "groq": groq_pool.stats()}}
+
 @app.get("/api/admin/users")
 def get_all_users(admin_user: models.User = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Melihat daftar user lengkap dengan ID-nya"""
@@ -1022,7 +1517,7 @@ def get_all_activities(admin_user: models.User = Depends(get_current_admin), db:
             "waktu": a.timestamp
         } for a in activities
     ]
-    return {"status": "success", "data": result}
+    return FastJSONResponse({"status": "success", "data": result})
 
 
 @app.get("/api/admin/user-activity-report")
@@ -1052,7 +1547,7 @@ def get_user_activity_report(admin_user: models.User = Depends(get_current_admin
             ]
         })
     
-    return {"status": "success", "data": report}
+    return FastJSONResponse({"status": "success", "data": report})
 
 
 
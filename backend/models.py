@@ -59,4 +59,30 @@ class ChatMessage(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     # [FIX RELASI] Ganti nama variabel jadi chat_session agar match dengan ChatSession.messages
-    chat_session = relationship("ChatSession", back_populates="messages")
\ No newline at end of file
+    chat_session = relationship("ChatSession", back_populates="messages")
+# --- MODEL DESTINASI (KATALOG WISATA) ---
+class Destinasi(Base):
+    __tablename__ = "destinasi"
+    __table_args__ = {"sqlite_autoincrement": True}  # id wisata yang dihapus tidak dipakai ulang
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    position = Column(Integer, index=True, default=0) # Urutan tampil (diatur admin)
+    nama_wisata = Column(String, index=True)
+    kategori = Column(String, index=True)
+    kota = Column(String, nullable=True)
+    alamat = Column(String, nullable=True)
+    deskripsi = Column(Text, nullable=True)
+    gambar = Column(String, nullable=True)
+    fitur = Column(Text, nullable=True)
+    fitur_bersih = Column(Text, nullable=True)
+    latitude = Column(String, nullable=True)
+    longitude = Column(String, nullable=True)
+    jam_buka = Column(String, nullable=True)
+    jam_tutup = Column(String, nullable=True)
+    rating = Column(String, nullable=True)
+    telepon = Column(String, nullable=True)
+    website = Column(String, nullable=True)
+    harga_tiket = Column(String, nullable=True)
+    sumber_data = Column(String, nullable=True)
+    tanggal_verifikasi = Column(String, nullable=True)
+    combined_text = Column(Text, nullable=True)
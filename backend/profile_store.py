@@ -0,0 +1,150 @@
+# backend/profile_store.py
+"""
+Vektor profil user di ruang embedding SBERT destinasi.
+
+Profil = rata-rata berbobot-waktu dari baris `sbert_embeddings` untuk setiap
+klik user (klik baru lebih berat, waktu paruh PROFILE_HALF_LIFE_DAYS).
+Disimpan sebagai jumlah berbobot + total bobot, sehingga klik baru cukup
+ditambahkan (O(D)) tanpa menghitung ulang riwayat. Bobot dihitung dalam log2
+relatif terhadap klik terbaru tiap user (acuan digeser & jumlah diskalakan saat
+ada klik lebih baru), jadi bobot selalu <= 1 dan tidak bisa overflow berapa pun
+waktu paruh dan umur data. Skor CBF menjadi satu
+perkalian matriks-vektor, tanpa memanggil model embedding.
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import recommender
+
+PROFILE_HALF_LIFE_DAYS = float(os.getenv("PROFILE_HALF_LIFE_DAYS", "30"))
+# Titik nol log-bobot: log2(bobot) = (t - _EPOCH) / waktu paruh
+_EPOCH = datetime(2025, 1, 1)
+
+
+class UserProfileStore:
+    def __init__(self, half_life_days: float = PROFILE_HALF_LIFE_DAYS):
+        self.half_life_seconds = half_life_days * 86400
+        self._lock = threading.Lock()
+        self._sums: Dict[int, np.ndarray] = {}
+        self._weights: Dict[int, float] = {}
+        # log2 bobot acuan per user (klik terbaru); _sums & _weights relatif terhadapnya
+        self._log_refs: Dict[int, float] = {}
+        self.item_index: Dict[str, int] = {}
+        self.embeddings: Optional[np.ndarray] = None
+        self.item_norms: Optional[np.ndarray] = None
+        self.built_upto = 0  # history_id terbesar yang ikut dibangun
+        # Sama, per user yang dibangun ulang sendiri lewat rebuild_users()
+        self._user_built_upto: Dict[int, int] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.embeddings is not None
+
+    def _log_weight(self, timestamp: Optional[datetime]) -> float:
+        seconds = ((timestamp or datetime.utcnow()) - _EPOCH).total_seconds()
+        return seconds / self.half_life_seconds
+
+    def rebuild(self, clicks: Iterable[Tuple[int, int, str, datetime]], embeddings: np.ndarray, item_ids: List[str]):
+        """Bangun ulang dari (history_id, user_id, wisata_id, timestamp) dan embedding destinasi.
+
+        `clicks` boleh berupa query SQLAlchemy: ia dibaca di dalam lock, sehingga
+        klik yang masuk bersamaan menunggu lalu diterapkan setelahnya.
+        """
+        with self._lock:
+            self.embeddings = np.asarray(embeddings, dtype=np.float32)
+            self.item_norms = np.linalg.norm(self.embeddings, axis=1)
+            self.item_index = {str(iid): pos for pos, iid in enumerate(item_ids)}
+            self._sums, self._weights, self._log_refs, self.built_upto = {}, {}, {}, 0
+            self._user_built_upto = {}
+            for hist_id, user_id, wisata_id, timestamp in clicks:
+                self._add(user_id, str(wisata_id), timestamp)
+                self.built_upto = max(self.built_upto, hist_id or 0)
+
+    def rebuild_users(self, user_ids: Iterable[int], clicks: Iterable[Tuple[int, int, str, datetime]],
+                      embeddings: np.ndarray, item_ids: List[str]):
+        """Ganti matriks item lalu bangun ulang profil beberapa user saja (mis. yang
+        pernah mengklik destinasi yang teksnya diedit / dihapus). `clicks` cukup
+        berisi klik user-user tersebut; dibaca di dalam lock seperti `rebuild()`."""
+        with self._lock:
+            self.embeddings = np.asarray(embeddings, dtype=np.float32)
+            self.item_norms = np.linalg.norm(self.embeddings, axis=1)
+            self.item_index = {str(iid): pos for pos, iid in enumerate(item_ids)}
+            for user_id in user_ids:
+                for store in (self._sums, self._weights, self._log_refs, self._user_built_upto):
+                    store.pop(user_id, None)
+            for hist_id, user_id, wisata_id, timestamp in clicks:
+                self._add(user_id, str(wisata_id), timestamp)
+                self._user_built_upto[user_id] = max(self._user_built_upto.get(user_id, 0), hist_id or 0)
+
+    def set_items(self, embeddings: np.ndarray, item_ids: List[str]):
+        """Ganti urutan/isi matriks item tanpa menyentuh profil (mis. katalog diurutkan ulang).
+        Jika vektor item yang sudah diklik berubah, pakai `rebuild()`."""
+        with self._lock:
+            self.embeddings = np.asarray(embeddings, dtype=np.float32)
+            self.item_norms = np.linalg.norm(self.embeddings, axis=1)
+            self.item_index = {str(iid): pos for pos, iid in enumerate(item_ids)}
+
+    def _add(self, user_id: int, wisata_id: str, timestamp: Optional[datetime]):
+        pos = self.item_index.get(wisata_id)
+        if pos is None:
+            return
+        log_w = self._log_weight(timestamp)
+        if user_id not in self._sums:
+            self._sums[user_id] = np.zeros(self.embeddings.shape[1], dtype=np.float64)
+            self._weights[user_id] = 0.0
+            self._log_refs[user_id] = log_w
+        elif log_w > self._log_refs[user_id]:
+            # Klik lebih baru jadi acuan: skalakan jumlah lama (rasio profil tetap)
+            scale = 2.0 ** (self._log_refs[user_id] - log_w)
+            self._sums[user_id] *= scale
+            self._weights[user_id] *= scale
+            self._log_refs[user_id] = log_w
+        w = 2.0 ** (log_w - self._log_refs[user_id])
+        self._sums[user_id] += w * self.embeddings[pos]
+        self._weights[user_id] += w
+
+    def add_click(self, user_id: int, wisata_id: str, history_id: Optional[int] = None,
+                  timestamp: Optional[datetime] = None):
+        with self._lock:
+            if not self.ready or (history_id is not None and
+                                  history_id <= max(self.built_upto, self._user_built_upto.get(user_id, 0))):
+                return  # belum dibangun, atau klik ini sudah termasuk
+            self._add(user_id, str(wisata_id), timestamp)
+
+    def __len__(self) -> int:
+        return len(self._sums)
+
+    def remove_user(self, user_id: int):
+        with self._lock:
+            self._sums.pop(user_id, None)
+            self._weights.pop(user_id, None)
+            self._log_refs.pop(user_id, None)
+            self._user_built_upto.pop(user_id, None)
+
+    def profile(self, user_id: int) -> Optional[np.ndarray]:
+        with self._lock:
+            if user_id not in self._sums:
+                return None
+            return (self._sums[user_id] / self._weights[user_id]).astype(np.float32)
+
+    def scores(self, user_id: int) -> Optional[np.ndarray]:
+        """Skor CBF (cosine profil vs semua destinasi), None jika user belum punya profil."""
+        vec = self.profile(user_id)
+        if vec is None:
+            return None
+        return recommender.cosine_scores(vec, self.embeddings, self.item_norms)[0]
+
+    def scores_batch(self, user_ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Skor CBF B×I untuk banyak user + mask user yang punya profil."""
+        vecs = [self.profile(uid) for uid in user_ids]
+        has_profile = np.array([v is not None for v in vecs], dtype=bool)
+        scores = np.zeros((len(user_ids), len(self.item_index)), dtype=np.float32)
+        if has_profile.any():
+            scores[has_profile] = recommender.cosine_scores(
+                np.stack([v for v in vecs if v is not None]), self.embeddings, self.item_norms
+            )
+        return scores, has_profile
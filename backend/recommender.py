@@ -0,0 +1,192 @@
+# backend/recommender.py
+"""
+Kernel skor rekomendasi berbasis NumPy/SciPy (tanpa pandas).
+
+Semua fungsi bekerja dengan indeks integer (baris user / kolom item) dan
+dipakai bersama oleh endpoint di main.py maupun skrip evaluasi.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+def top_k_indices(scores: np.ndarray, k: int, exclude: Optional[np.ndarray] = None) -> np.ndarray:
+    """Indeks k skor tertinggi, urut menurun.
+
+    Skor yang sama diurutkan berdasarkan indeks terkecil (setara
+    `Series.nlargest(keep='first')`). `exclude` = mask boolean item yang dilewati.
+    """
+    candidates = np.arange(len(scores)) if exclude is None else np.flatnonzero(~exclude)
+    values = scores[candidates]
+    k = min(k, len(values))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(values):
+        # argpartition O(n): ambil nilai ke-k, lalu semua kandidat >= nilai itu (termasuk seri)
+        kth_value = values[np.argpartition(-values, k - 1)[k - 1]]
+        keep = values >= kth_value
+        candidates, values = candidates[keep], values[keep]
+    order = np.lexsort((candidates, -values))
+    return candidates[order][:k]
+
+
+def row_norms(R: csr_matrix) -> np.ndarray:
+    return np.sqrt(np.asarray(R.multiply(R).sum(axis=1)).ravel())
+
+
+def user_knn_scores(R: csr_matrix, row: int, k: int = 30, norms: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """Skor item untuk SATU user dengan User-KNN (cosine) di matriks sparse.
+
+    Hanya menghitung kemiripan baris `row` terhadap user lain (R · r_u),
+    bukan matriks user×user penuh. Mengembalikan None jika tidak ada
+    tetangga dengan kemiripan > 0.
+    """
+    if norms is None:
+        norms = row_norms(R)
+    dots = R @ R[row].toarray().ravel()
+    denom = norms * norms[row]
+    sims = np.divide(dots, denom, out=np.zeros_like(dots, dtype=np.float64), where=denom > 0)
+    sims[row] = 0.0
+
+    neighbours = top_k_indices(sims, k)
+    neighbour_sims = sims[neighbours]
+    if neighbour_sims.size == 0 or neighbour_sims.max() == 0:
+        return None
+    return np.asarray(R[neighbours].T @ neighbour_sims).ravel()
+
+
+def build_item_neighbors(R: csr_matrix, top_n: int = 20):
+    """Precompute Top-N tetangga (cosine item-item) untuk setiap item.
+
+    Hasil disimpan ringkas: `neighbor_idx` int32 (I×N, -1 = kosong) dan
+    `neighbor_sim` float32 (I×N).
+    """
+    n_items = R.shape[1]
+    top_n = max(0, min(top_n, n_items - 1))
+    neighbor_idx = np.full((n_items, top_n), -1, dtype=np.int32)
+    neighbor_sim = np.zeros((n_items, top_n), dtype=np.float32)
+    if top_n == 0 or R.nnz == 0:
+        return neighbor_idx, neighbor_sim
+
+    co = (R.T @ R).tocsr()  # I×I ko-okurensi (sparse)
+    norms = np.sqrt(co.diagonal())
+    for item in range(n_items):
+        start, end = co.indptr[item], co.indptr[item + 1]
+        cols, dots = co.indices[start:end], co.data[start:end]
+        keep = cols != item
+        cols, dots = cols[keep], dots[keep]
+        denom = norms[item] * norms[cols]
+        sims = np.divide(dots, denom, out=np.zeros_like(dots, dtype=np.float64), where=denom > 0)
+        best = top_k_indices(sims, top_n)
+        best = best[sims[best] > 0]
+        neighbor_idx[item, :len(best)] = cols[best]
+        neighbor_sim[item, :len(best)] = sims[best]
+    return neighbor_idx, neighbor_sim
+
+
+def item_cf_scores(neighbor_idx: np.ndarray, neighbor_sim: np.ndarray, user_items: np.ndarray,
+                   weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """Skor item untuk satu user: jumlah kemiripan tetangga dari item yang pernah diklik."""
+    scores = np.zeros(neighbor_idx.shape[0], dtype=np.float64)
+    if len(user_items) == 0:
+        return scores
+    if weights is None:
+        weights = np.ones(len(user_items))
+    idx = neighbor_idx[user_items]
+    contrib = neighbor_sim[user_items] * np.asarray(weights, dtype=np.float64)[:, None]
+    valid = idx >= 0
+    np.add.at(scores, idx[valid], contrib[valid])
+    return scores
+
+
+def user_knn_scores_batch(R: csr_matrix, rows: np.ndarray, k: int = 30, norms: Optional[np.ndarray] = None):
+    """Skor User-KNN untuk banyak user sekaligus (produk matriks-matriks sparse).
+
+    Mengembalikan `(scores, has_neighbours)`: skor B×I dan mask baris yang
+    punya tetangga dengan kemiripan > 0 (setara `user_knn_scores` != None).
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    if norms is None:
+        norms = row_norms(R)
+    dots = (R[rows] @ R.T).tocsr()  # B×U, hanya pasangan user yang berbagi item
+    dots.sort_indices()
+
+    weight_rows, weight_cols, weight_vals = [], [], []
+    has_neighbours = np.zeros(len(rows), dtype=bool)
+    for b, row in enumerate(rows):
+        start, end = dots.indptr[b], dots.indptr[b + 1]
+        cols, vals = dots.indices[start:end], dots.data[start:end]
+        denom = norms[cols] * norms[row]
+        sims = np.divide(vals, denom, out=np.zeros_like(vals, dtype=np.float64), where=denom > 0)
+        sims[cols == row] = 0.0
+        best = top_k_indices(sims, k)
+        best = best[sims[best] > 0]
+        if len(best):
+            has_neighbours[b] = True
+            weight_rows.append(np.full(len(best), b))
+            weight_cols.append(cols[best])
+            weight_vals.append(sims[best])
+
+    if not weight_rows:
+        return np.zeros((len(rows), R.shape[1])), has_neighbours
+    W = csr_matrix(
+        (np.concatenate(weight_vals), (np.concatenate(weight_rows), np.concatenate(weight_cols))),
+        shape=(len(rows), R.shape[0]),
+    )
+    return np.asarray((W @ R).todense()), has_neighbours
+
+
+def cosine_scores(Q: np.ndarray, E: np.ndarray, e_norms: Optional[np.ndarray] = None) -> np.ndarray:
+    """Cosine similarity B×I antara vektor query (B×D) dan embedding item (I×D)."""
+    Q = np.atleast_2d(np.asarray(Q, dtype=np.float32))
+    if e_norms is None:
+        e_norms = np.linalg.norm(E, axis=1)
+    denom = np.linalg.norm(Q, axis=1)[:, None] * e_norms[None, :]
+    dots = Q @ E.T
+    return np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+
+
+def minmax_normalize(scores: np.ndarray) -> np.ndarray:
+    """Min-max per baris (sumbu terakhir); baris dengan skor konstan menjadi 0."""
+    scores = np.asarray(scores)
+    if scores.dtype not in (np.float32, np.float64):
+        scores = scores.astype(np.float64)
+    lo = scores.min(axis=-1, keepdims=True)
+    span = scores.max(axis=-1, keepdims=True) - lo
+    return np.divide(scores - lo, span, out=np.zeros_like(scores), where=span > 0)
+
+
+def seen_mask(item_index: Dict[str, int], seen_ids: Iterable[str], n_items: int) -> np.ndarray:
+    """Mask boolean item yang sudah dikunjungi (id di luar katalog diabaikan)."""
+    mask = np.zeros(n_items, dtype=bool)
+    cols = [item_index[str(i)] for i in seen_ids if str(i) in item_index]
+    mask[cols] = True
+    return mask
+
+
+def hybrid_scores(cf_scores: np.ndarray, cbf_scores: np.ndarray, alpha: float = 0.6) -> np.ndarray:
+    """alpha * minmax(CF) + (1 - alpha) * minmax(CBF) pada array float32 kontigu."""
+    cf = minmax_normalize(np.ascontiguousarray(cf_scores, dtype=np.float32))
+    cbf = minmax_normalize(np.ascontiguousarray(cbf_scores, dtype=np.float32))
+    return np.float32(alpha) * cf + np.float32(1 - alpha) * cbf
+
+
+def hybrid_top_k(cf_scores: np.ndarray, cbf_scores: np.ndarray, alpha: float = 0.6, k: int = 6,
+                 seen: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k hybrid (indeks item, urut menurun) beserta skor hybrid semua item.
+
+    Setara pipeline pandas lama: min-max, blend, `drop(seen)`, `nlargest(k)`.
+    """
+    scores = hybrid_scores(cf_scores, cbf_scores, alpha)
+    return top_k_indices(scores, k, exclude=seen), scores
+
+
+def align_scores(scores: np.ndarray, src_ids, dst_index: Dict[str, int], n_items: int) -> np.ndarray:
+    """Pindahkan skor berurutan `src_ids` ke urutan kolom `dst_index` (id hilang = 0)."""
+    out = np.zeros(n_items, dtype=scores.dtype)
+    for j, iid in enumerate(src_ids):
+        pos = dst_index.get(iid)
+        if pos is not None:
+            out[pos] = scores[j]
+    return out
@@ -0,0 +1,137 @@
+# backend/semantic_cache.py
+"""
+Cache jawaban chatbot berbasis kemiripan semantik pertanyaan.
+
+Pertanyaan yang hampir sama ("pantai terbaik di jember" / "pantai bagus jember?")
+memakai ulang jawaban + kartu rekomendasi sebelumnya tanpa memanggil LLM.
+Kunci pencarian = embedding pertanyaan yang sudah dinormalisasi; entri hanya
+dicocokkan dalam partisi yang sama (bahasa, versi katalog, versi index), jadi
+perubahan data otomatis membuat entri lama tidak terpakai lagi.
+
+Entri kedaluwarsa setelah TTL dan yang paling lama tidak dipakai dibuang saat
+penuh (LRU). Pertanyaan lanjutan dalam satu sesi ("harganya berapa?",
+"yang itu buka jam berapa?") bergantung pada riwayat, jadi tidak dicari dan
+tidak disimpan — lihat `is_follow_up()`.
+"""
+import os
+import re
+import time
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "2000"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "21600"))  # 6 jam
+
+# Kata rujukan ke percakapan sebelumnya (Indonesia + Jawa/Pandalungan)
+FOLLOW_UP_WORDS = {
+    "itu", "tersebut", "tadi", "sana", "situ", "kesana", "kesitu", "disana", "disitu",
+    "lainnya", "selain", "lagi", "juga", "terus", "lanjut", "kalau", "kalo",
+    "nomor", "pertama", "kedua", "ketiga", "iku", "kuwi", "barusan",
+}
+# Pertanyaan sependek ini di dalam sesi hampir selalu melanjutkan topik sebelumnya
+FOLLOW_UP_MAX_WORDS = 3
+
+
+def is_follow_up(question: str, has_history: bool) -> bool:
+    """True jika pertanyaan kemungkinan besar merujuk riwayat sesi (cache dilewati)."""
+    if not has_history:
+        return False
+    words = re.findall(r"\w+", question.lower())
+    if len(words) <= FOLLOW_UP_MAX_WORDS:
+        return True
+    return any(w in FOLLOW_UP_WORDS or w.endswith("nya") for w in words)
+
+
+class SemanticAnswerCache:
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, maxsize: int = SEMANTIC_CACHE_SIZE,
+                 ttl: Optional[float] = SEMANTIC_CACHE_TTL):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[Hashable, np.ndarray, Any, Optional[float]]]" = OrderedDict()
+        # partisi -> (daftar id entri, matriks vektor ternormalisasi), dibangun ulang saat berubah
+        self._index: Dict[Hashable, Tuple[List[int], np.ndarray]] = {}
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypasses: Counter = Counter()
+
+    @staticmethod
+    def _unit(vec) -> np.ndarray:
+        vec = np.asarray(vec, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def _partition_index(self, partition: Hashable) -> Tuple[List[int], np.ndarray]:
+        if partition not in self._index:
+            ids = [eid for eid, entry in self._entries.items() if entry[0] == partition]
+            matrix = np.stack([self._entries[eid][1] for eid in ids]) if ids else np.empty((0, 0), dtype=np.float32)
+            self._index[partition] = (ids, matrix)
+        return self._index[partition]
+
+    def _remove(self, eid: int):
+        partition = self._entries.pop(eid)[0]
+        self._index.pop(partition, None)
+
+    def lookup(self, vec, partition: Hashable) -> Optional[Tuple[Any, float]]:
+        """(nilai, similarity) entri termirip dalam partisi jika >= threshold, selain itu None."""
+        query = self._unit(vec)
+        now = time.monotonic()
+        with self._lock:
+            ids, matrix = self._partition_index(partition)
+            found, expired = None, []
+            if ids:
+                sims = matrix @ query
+                for pos in np.argsort(-sims):
+                    if sims[pos] < self.threshold:
+                        break
+                    expires_at = self._entries[ids[pos]][3]
+                    if expires_at is not None and expires_at <= now:
+                        expired.append(ids[pos])
+                        continue
+                    found = (ids[pos], float(sims[pos]))
+                    break
+            for eid in expired:
+                self._remove(eid)
+            if found is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(found[0])
+            self.hits += 1
+            return self._entries[found[0]][2], found[1]
+
+    def store(self, vec, partition: Hashable, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[self._next_id] = (partition, self._unit(vec), value, expires_at)
+            self._next_id += 1
+            self._index.pop(partition, None)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def record_bypass(self, reason: str):
+        self.bypasses[reason] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bypasses": dict(self.bypasses),
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,6 @@
+# backend/tests/conftest.py
+# Modul backend diimpor langsung (flat, tanpa package), sama seperti main.py.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
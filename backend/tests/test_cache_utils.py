@@ -0,0 +1,62 @@
+# backend/tests/test_cache_utils.py
+import time
+
+from cache_utils import RecommendationCache, RetrievalCache
+
+
+# ---------- RecommendationCache ----------
+def test_recommendation_cache_hit_and_user_invalidation():
+    cache = RecommendationCache()
+    cache.set("personal", 1, ["a"], cache.version, catalog_version=3)
+    assert cache.get("personal", 1, catalog_version=3) == ["a"]
+    cache.invalidate_user(1)
+    assert cache.get("personal", 1, catalog_version=3) is None
+
+
+def test_recommendation_cache_bump_version_invalidates_all():
+    cache = RecommendationCache()
+    cache.set("personal", 1, ["a"], cache.version)
+    cache.set("hybrid", 2, ["b"], cache.version)
+    cache.bump_version()
+    assert cache.get("personal", 1) is None and cache.get("hybrid", 2) is None
+
+
+def test_recommendation_cache_ignores_results_from_old_version():
+    cache = RecommendationCache()
+    version = cache.version  # diambil sebelum menghitung
+    cache.bump_version()     # model di-refresh selama perhitungan
+    cache.set("personal", 1, ["stale"], version)
+    assert cache.get("personal", 1) is None
+
+
+def test_recommendation_cache_catalog_version_mismatch_is_miss():
+    cache = RecommendationCache()
+    cache.set("personal", 1, ["a"], cache.version, catalog_version=1)
+    assert cache.get("personal", 1, catalog_version=2) is None
+
+
+# ---------- RetrievalCache ----------
+def test_retrieval_cache_key_normalizes_query_and_filter():
+    assert RetrievalCache.key("Pantai  Bagus ", 5) == RetrievalCache.key("pantai bagus", 5)
+    assert RetrievalCache.key("x", 5, {"b": 1, "a": 2}) == RetrievalCache.key("x", 5, {"a": 2, "b": 1})
+    assert RetrievalCache.key("x", 5) != RetrievalCache.key("x", 3)
+
+
+def test_retrieval_cache_version_invalidation():
+    cache = RetrievalCache()
+    key = RetrievalCache.key("pantai", 5)
+    hits = [("tourism:1", 0.9), ("tourism:2", 0.8)]
+    cache.set(key, hits, (0, "rev-a"))
+    assert list(cache.get(key, (0, "rev-a"))) == hits
+    assert cache.get(key, (1, "rev-a")) is None  # index diubah server ini
+    assert cache.get(key, (0, "rev-b")) is None  # index diubah CLI / worker lain
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_retrieval_cache_ttl_expiry():
+    cache = RetrievalCache(ttl=0.05)
+    key = RetrievalCache.key("pantai", 5)
+    cache.set(key, [("tourism:1", 0.9)], 0)
+    assert cache.get(key, 0) is not None
+    time.sleep(0.1)
+    assert cache.get(key, 0) is None
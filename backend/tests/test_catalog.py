@@ -0,0 +1,50 @@
+# backend/tests/test_catalog.py
+import pytest
+
+from catalog import Catalog
+
+ROWS = [{"id": "1", "nama_wisata": "Pantai Papuma", "kategori": "Pantai"},
+        {"id": "2", "nama_wisata": "Air Terjun Tancak", "kategori": "Air Terjun"}]
+
+
+def add_row(rows):
+    return rows + [{"id": "3", "nama_wisata": "Puncak Rembangan", "kategori": "Gunung"}]
+
+
+def test_update_runs_listeners_then_commit_then_swaps_snapshot():
+    catalog, calls = Catalog(ROWS), []
+
+    def listener(snapshot):
+        # Snapshot baru belum terpasang selama listener berjalan
+        calls.append(("listener", len(snapshot), len(catalog.snapshot())))
+
+    catalog.on_change(listener)
+    snapshot = catalog.update(add_row, commit=lambda: calls.append(("commit", len(catalog.snapshot()))),
+                              rollback=lambda: calls.append(("rollback",)))
+    assert calls == [("listener", 3, 2), ("commit", 2)]
+    assert catalog.snapshot() is snapshot and snapshot.version == 1 and "3" in snapshot
+
+
+@pytest.mark.parametrize("failing", ["mutate", "listener", "commit"])
+def test_update_rolls_back_and_keeps_old_snapshot_on_failure(failing):
+    catalog, calls = Catalog(ROWS), []
+    before = catalog.snapshot()
+
+    def fail_if(step):
+        if step == failing:
+            raise RuntimeError(f"{step} gagal")
+
+    def mutate(rows):
+        fail_if("mutate")
+        return add_row(rows)
+
+    catalog.on_change(lambda snapshot: fail_if("listener"))
+
+    def commit():
+        fail_if("commit")
+        calls.append("commit")
+
+    with pytest.raises(RuntimeError):
+        catalog.update(mutate, commit=commit, rollback=lambda: calls.append("rollback"))
+    assert calls == ["rollback"]
+    assert catalog.snapshot() is before and catalog.version == 0
@@ -0,0 +1,42 @@
+# backend/tests/test_embedding_store.py
+import os
+
+import numpy as np
+
+from embedding_store import EmbeddingStore
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_cache_reuses_rows_by_id_and_text(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "emb"), "model-a")
+    embed = CountingEmbedder()
+    first = store.load_or_embed(["1", "2", "3"], ["aa", "bbb", "c"], embed)
+    reordered = store.load_or_embed(["3", "1", "2"], ["c", "aa", "bbb"], embed)
+    assert embed.texts == ["aa", "bbb", "c"]
+    np.testing.assert_array_equal(reordered, first[[2, 0, 1]])
+    # Satu file berisi kunci + matriks (tidak ada pasangan file yang bisa tertukar)
+    assert os.listdir(tmp_path) == ["emb.npz"]
+
+
+def test_changed_text_and_model_are_re_embedded(tmp_path):
+    embed = CountingEmbedder()
+    EmbeddingStore(str(tmp_path / "emb"), "model-a").load_or_embed(["1", "2"], ["aa", "bbb"], embed)
+    EmbeddingStore(str(tmp_path / "emb"), "model-a").load_or_embed(["1", "2"], ["aa", "bbbb"], embed)
+    EmbeddingStore(str(tmp_path / "emb"), "model-b").load_or_embed(["1"], ["aa"], embed)
+    assert embed.texts == ["aa", "bbb", "bbbb", "aa"]
+
+
+def test_known_vectors_skip_embedding(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "emb"), "model-a")
+    embed = CountingEmbedder()
+    out = store.load_or_embed(["1", "2"], ["aa", "bbb"], embed, known={"1": np.array([9.0, 9.0])})
+    assert embed.texts == ["bbb"]
+    np.testing.assert_array_equal(out, [[9.0, 9.0], [3.0, 1.0]])
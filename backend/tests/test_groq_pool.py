@@ -0,0 +1,161 @@
+# backend/tests/test_groq_pool.py
+import asyncio
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from groq_pool import GroqPool, GroqUnavailable
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeAPIError(Exception):
+    """Bentuk error SDK Groq: `status_code` + `response.headers`."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"error {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse(headers or {})
+
+
+class FakeLLM:
+    def __init__(self, state):
+        self.state = state
+        self.failures = []      # dilempar sebelum ada respons
+        self.mid_stream = []    # dilempar setelah potongan pertama stream
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+
+    def invoke(self, messages):
+        self._next()
+        return AIMessage(content=f"ok {self.state.slot}", usage_metadata={"input_tokens": 3, "output_tokens": 2, "total_tokens": 5})
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+    async def astream(self, messages):
+        self._next()
+        for text in ("halo ", "lur"):
+            yield AIMessageChunk(content=text)
+            if self.mid_stream:
+                raise self.mid_stream.pop(0)
+
+
+def make_pool(n_keys=2, **kwargs):
+    llms = {}
+
+    def factory(state):
+        llms[state.slot] = FakeLLM(state)
+        return llms[state.slot]
+
+    pool = GroqPool(factory=factory, backoff=0.0, **kwargs)
+    pool.set_keys([f"gsk_test{slot:04d}" for slot in range(1, n_keys + 1)])
+    pool.build_clients()
+    return pool, llms
+
+
+def key_stats(pool, slot):
+    return pool.stats()["keys"][slot - 1]
+
+
+def test_no_keys_is_configuration_error():
+    pool = GroqPool(factory=FakeLLM)
+    with pytest.raises(GroqUnavailable) as exc:
+        pool.invoke("x")
+    assert exc.value.retry_after is None
+
+
+def test_keys_are_not_usable_before_clients_are_built():
+    pool = GroqPool(factory=FakeLLM)
+    pool.set_keys(["gsk_test0001"])
+    with pytest.raises(GroqUnavailable) as exc:
+        pool.check_available()
+    assert exc.value.retry_after is not None
+
+
+def test_429_cools_key_down_and_fails_over():
+    pool, llms = make_pool()
+    llms[1].failures = [FakeAPIError(429, {"retry-after": "20"})]
+    assert pool.invoke("x").content == "ok 2"
+    stats = key_stats(pool, 1)
+    assert stats["errors"] == {"429": 1} and 19 < stats["cooldown_seconds"] <= 20
+    assert pool.retries == 1
+    # Key 1 masih cooldown -> permintaan berikutnya tetap ke key 2
+    assert pool.invoke("x").content == "ok 2"
+
+
+def test_all_keys_cooling_raises_with_retry_after():
+    pool, llms = make_pool()
+    llms[1].failures = [FakeAPIError(429, {"retry-after": "30"})]
+    llms[2].failures = [FakeAPIError(429, {"retry-after": "7"})]
+    with pytest.raises(GroqUnavailable) as exc:
+        pool.invoke("x")
+    assert 6 < exc.value.retry_after <= 7
+    with pytest.raises(GroqUnavailable):
+        pool.check_available()
+
+
+def test_client_error_is_not_retried():
+    pool, llms = make_pool()
+    llms[1].failures = [FakeAPIError(400)]
+    with pytest.raises(FakeAPIError):
+        pool.invoke("x")
+    assert llms[2].calls == 0 and key_stats(pool, 1)["cooldown_seconds"] == 0
+
+
+def test_non_network_exception_is_raised_without_cooldown():
+    pool, llms = make_pool()
+    llms[1].failures = [ValueError("bug")]
+    with pytest.raises(ValueError):
+        pool.invoke("x")
+    assert llms[2].calls == 0 and pool.retries == 0
+    assert key_stats(pool, 1)["errors"] == {} and key_stats(pool, 1)["cooldown_seconds"] == 0
+
+
+def test_network_error_fails_over_async():
+    pool, llms = make_pool()
+    llms[1].failures = [httpx.ConnectTimeout("timeout")]
+    assert asyncio.run(pool.ainvoke("x")).content == "ok 2"
+    assert key_stats(pool, 1)["errors"] == {"network": 1}
+
+
+def test_stream_retries_only_before_first_chunk():
+    pool, llms = make_pool()
+
+    async def collect():
+        return [chunk.content async for chunk in pool.astream("x")]
+
+    llms[1].failures = [FakeAPIError(503)]
+    assert asyncio.run(collect()) == ["halo ", "lur"]
+    assert key_stats(pool, 1)["errors"] == {"5xx": 1}
+
+
+def test_stream_error_after_first_chunk_is_raised():
+    pool, llms = make_pool()
+    llms[1].mid_stream = [FakeAPIError(503)]
+
+    async def collect():
+        return [chunk.content async for chunk in pool.astream("x")]
+
+    with pytest.raises(FakeAPIError):
+        asyncio.run(collect())
+    assert llms[2].calls == 0
+
+
+def test_least_loaded_key_is_chosen():
+    pool, _ = make_pool(n_keys=3)
+    first = pool._acquire(set())
+    second = pool._acquire(set())
+    third = pool._acquire(set())
+    assert {first.slot, second.slot, third.slot} == {1, 2, 3}
+    for state in (first, second, third):
+        pool._release(state)
+    assert all(k["in_flight"] == 0 for k in pool.stats()["keys"])
@@ -0,0 +1,93 @@
+# backend/tests/test_interaction_store.py
+import threading
+
+import numpy as np
+
+from interaction_store import InteractionStore
+from recommender import row_norms
+
+ITEMS = ["1", "2", "3", "4", "5"]
+
+
+def build(clicks, items=ITEMS) -> InteractionStore:
+    store = InteractionStore()
+    store.rebuild([(hist_id, uid, wid) for hist_id, (uid, wid) in enumerate(clicks, start=1)], items)
+    return store
+
+
+def assert_same_matrix(a, b):
+    assert a.user_ids == b.user_ids and a.item_ids == b.item_ids and a.user_index == b.user_index
+    np.testing.assert_array_equal(a.R.toarray(), b.R.toarray())
+    np.testing.assert_allclose(a.norms, b.norms)
+
+
+def test_incremental_clicks_match_full_rebuild():
+    base = [(1, "1"), (1, "2"), (2, "2")]
+    extra = [(1, "1"), (2, "3"), (3, "5"), (2, "2"), (3, "9")]  # sel lama, sel baru, user baru, item di luar katalog
+    store = build(base)
+    store.snapshot()
+    for uid, wid in extra:
+        store.add_click(uid, wid)
+    assert_same_matrix(store.snapshot(), build(base + extra).snapshot())
+    assert store.user_clicks(3) == {"5": 1.0, "9": 1.0}
+
+
+def test_existing_cell_update_is_copy_on_write():
+    store = build([(1, "1"), (2, "1")])
+    before = store.snapshot()
+    dense_before = before.R.toarray().copy()
+    store.add_click(1, "1")
+    after = store.snapshot()
+    np.testing.assert_array_equal(before.R.toarray(), dense_before)  # pembaca lama tidak berubah
+    assert after.R[0, 0] == 2.0
+    np.testing.assert_allclose(after.norms, row_norms(after.R))
+
+
+def test_add_click_skips_already_loaded_history_ids():
+    store = build([(1, "1"), (1, "2")])  # history id 1..2 sudah dimuat
+    store.add_click(1, "1", history_id=2)
+    store.add_click(1, "1", history_id=3)
+    store.add_click(1, "1", history_id=3)
+    assert store.user_clicks(1) == {"1": 2.0, "2": 1.0}
+
+
+def test_set_items_and_remove_user():
+    store = build([(1, "1"), (1, "3"), (2, "3")])
+    store.set_items(["3", "1"])
+    snap = store.snapshot()
+    assert snap.item_ids == ["3", "1"]
+    np.testing.assert_array_equal(snap.R.toarray(), [[1.0, 1.0], [1.0, 0.0]])
+    store.remove_user(1)
+    snap = store.snapshot()
+    assert snap.user_ids == [2] and snap.user_index == {2: 0}
+    np.testing.assert_array_equal(snap.R.toarray(), [[1.0, 0.0]])
+
+
+def test_snapshot_stays_consistent_under_concurrent_writes():
+    store = build([(uid, ITEMS[uid % 5]) for uid in range(20)])
+    errors, stop = [], threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            snap = store.snapshot()
+            if snap.R.shape != (len(snap.user_ids), len(snap.item_ids)) or len(snap.norms) != snap.R.shape[0]:
+                errors.append("shape")
+            elif any(snap.user_index[uid] != pos for pos, uid in enumerate(snap.user_ids)):
+                errors.append("index")
+            elif not np.allclose(snap.norms, row_norms(snap.R)):
+                errors.append("norms")
+
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    rng = np.random.default_rng(0)
+    for step in range(600):
+        uid = int(rng.integers(0, 40))
+        if step % 50 == 49:
+            store.remove_user(uid)
+        else:
+            store.add_click(uid, ITEMS[int(rng.integers(0, 5))])
+    stop.set()
+    for t in threads:
+        t.join()
+    assert errors == []
@@ -0,0 +1,82 @@
+# backend/tests/test_recommender.py
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import csr_matrix
+from sklearn.metrics.pairwise import cosine_similarity
+
+import recommender
+
+
+def random_clicks(seed: int, n_users: int = 25, n_items: int = 15, density: float = 0.25) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(1, 4, size=(n_users, n_items)).astype(float)
+    return np.where(rng.random((n_users, n_items)) < density, counts, 0.0)
+
+
+def pandas_user_knn(dense: np.ndarray, row: int, k: int):
+    """Jalur lama main.py (DataFrame + cosine_similarity penuh + nlargest)."""
+    R_train = pd.DataFrame(dense)
+    sim = cosine_similarity(R_train)
+    np.fill_diagonal(sim, 0.0)  # pandas copy-on-write: isi diagonal sebelum dibungkus DataFrame
+    user_sim_df = pd.DataFrame(sim, index=R_train.index, columns=R_train.index)
+    top_k_users = user_sim_df.loc[row].nlargest(k).index
+    top_k_sim = user_sim_df.loc[row, top_k_users]
+    if top_k_sim.max() == 0:
+        return None
+    return R_train.loc[top_k_users].mul(top_k_sim, axis=0).sum(axis=0).to_numpy()
+
+
+# ---------- top_k_indices ----------
+def test_top_k_indices_sorted_descending():
+    scores = np.array([0.1, 0.9, 0.5, 0.7])
+    assert recommender.top_k_indices(scores, 3).tolist() == [1, 3, 2]
+
+
+def test_top_k_indices_ties_follow_nlargest_keep_first():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        scores = rng.integers(0, 5, size=30).astype(float)  # banyak seri
+        k = int(rng.integers(1, 31))
+        expected = pd.Series(scores).nlargest(k, keep="first").index.tolist()
+        assert recommender.top_k_indices(scores, k).tolist() == expected
+
+
+def test_top_k_indices_exclude_and_bounds():
+    scores = np.array([5.0, 4.0, 3.0, 2.0])
+    exclude = np.array([True, False, True, False])
+    assert recommender.top_k_indices(scores, 10, exclude=exclude).tolist() == [1, 3]
+    assert recommender.top_k_indices(scores, 0).tolist() == []
+    assert recommender.top_k_indices(np.array([]), 3).tolist() == []
+
+
+# ---------- User-KNN ----------
+@pytest.mark.parametrize("seed,k", [(1, 30), (2, 5), (3, 3)])
+def test_user_knn_matches_pandas_path(seed, k):
+    dense = random_clicks(seed)
+    R = csr_matrix(dense)
+    norms = recommender.row_norms(R)
+    for row in range(dense.shape[0]):
+        expected = pandas_user_knn(dense, row, k)
+        got = recommender.user_knn_scores(R, row, k=k, norms=norms)
+        if expected is None:
+            assert got is None
+        else:
+            np.testing.assert_allclose(got, expected, atol=1e-12)
+
+
+def test_user_knn_without_overlap_returns_none():
+    R = csr_matrix(np.array([[1.0, 0.0], [0.0, 1.0]]))
+    assert recommender.user_knn_scores(R, 0, k=30) is None
+
+
+def test_user_knn_batch_matches_single_user():
+    dense = random_clicks(4)
+    R = csr_matrix(dense)
+    rows = np.arange(dense.shape[0])
+    scores, has_neighbours = recommender.user_knn_scores_batch(R, rows, k=5)
+    for row in rows:
+        single = recommender.user_knn_scores(R, row, k=5)
+        assert has_neighbours[row] == (single is not None)
+        if single is not None:
+            np.testing.assert_allclose(scores[row], single, atol=1e-12)
@@ -0,0 +1,50 @@
+import requests
+import argparse
+import getpass
+import json
+
+# Konfigurasi
+API_URL = "http://localhost:8000"
+
+def batch_rekomendasi():
+    print("=== 📦 ALAT REKOMENDASI BATCH JEMBERTRIP (Hybrid Top-6) ===")
+
+    parser = argparse.ArgumentParser(description="Ambil rekomendasi hybrid banyak user sekaligus (NDJSON)")
+    parser.add_argument("--users", help="Daftar user_id dipisah koma (kosong = semua user)")
+    parser.add_argument("--out", default="rekomendasi_batch.jsonl", help="File output NDJSON")
+    parser.add_argument("--url", default=API_URL, help="Alamat backend")
+    args = parser.parse_args()
+
+    username = input("Username ADMIN: ").strip()
+    password = getpass.getpass("Password: ")
+
+    try:
+        # 1. Login admin untuk mendapatkan token
+        login = requests.post(f"{args.url}/api/auth/login", json={"username": username, "password": password})
+        if login.status_code != 200:
+            print(f"\n❌ LOGIN GAGAL! Error {login.status_code}: {login.json()}")
+            return
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        # 2. Kirim daftar user, hasil di-stream per baris (satu user per baris)
+        payload = {"user_ids": [int(u) for u in args.users.split(",")] if args.users else None}
+        total, errors = 0, 0
+        with requests.post(f"{args.url}/api/admin/recommendations/batch", json=payload, headers=headers, stream=True) as response:
+            if response.status_code != 200:
+                print(f"\n❌ GAGAL! Error {response.status_code}: {response.text}")
+                return
+            with open(args.out, "w", encoding="utf-8") as f:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line: continue
+                    f.write(line + "\n")
+                    if "error" in json.loads(line): errors += 1
+                    else: total += 1
+
+        print(f"\n✅ SUKSES! {total} user ditulis ke '{args.out}'" + (f" ({errors} potongan gagal)" if errors else ""))
+
+    except Exception as e:
+        print(f"\n❌ ERROR KONEKSI: {e}")
+        print(f"Pastikan backend menyala di {args.url}")
+
+if __name__ == "__main__":
+    batch_rekomendasi()
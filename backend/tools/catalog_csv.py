@@ -0,0 +1,45 @@
+import os
+import sys
+import argparse
+
+# Jalankan dari folder backend:  python tools/catalog_csv.py export
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+import catalog
+from database import SessionLocal, engine
+
+# Konfigurasi
+DEFAULT_CSV = "data/destinasi_final.csv"
+
+def catalog_csv():
+    print("=== 🗂️ ALAT IMPOR/EKSPOR KATALOG DESTINASI JEMBERTRIP ===")
+
+    parser = argparse.ArgumentParser(description="Sinkronisasi tabel destinasi <-> CSV pipeline data")
+    parser.add_argument("aksi", choices=["import", "export"], help="import: CSV -> tabel, export: tabel -> CSV")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="Path file CSV")
+    parser.add_argument("--replace", action="store_true", help="(import) Kosongkan tabel destinasi dulu")
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if args.aksi == "import":
+            existing = db.query(models.Destinasi).count()
+            if existing and not args.replace:
+                print(f"❌ Tabel destinasi sudah berisi {existing} baris. Pakai --replace untuk menimpa.")
+                return
+            total = catalog.import_csv(db, args.csv, replace=args.replace)
+            print(f"\n✅ SUKSES! {total} destinasi diimpor dari '{args.csv}'.")
+            print("Restart backend agar katalog di memori ikut diperbarui.")
+        else:
+            total = catalog.export_csv(db, args.csv)
+            print(f"\n✅ SUKSES! {total} destinasi diekspor ke '{args.csv}'.")
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ GAGAL: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    catalog_csv()
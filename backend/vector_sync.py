@@ -0,0 +1,295 @@
+# backend/vector_sync.py
+"""
+Sinkronisasi inkremental Vector DB (ChromaDB) dengan data sumber: tabel
+`destinasi` (katalog wisata, lihat catalog.py) dan file CSV pendukung chatbot.
+
+Setiap baris sumber mendapat ID dokumen yang stabil (`<type>:<id baris>`) dan
+hash konten. Saat sinkronisasi hanya baris baru / berubah yang di-embed dan
+di-upsert, baris yang sudah dihapus dari CSV ikut dihapus dari index.
+
+Setiap sinkronisasi yang mengubah index menulis revisi baru ke file
+`index_revision` di folder Vector DB. Server memakainya sebagai bagian versi
+retrieval cache, sehingga perubahan dari CLI ini (atau worker lain) ikut
+membatalkan cache tanpa restart.
+
+Jalankan manual dari folder backend:
+    python vector_sync.py            # sinkronkan
+    python vector_sync.py --dry-run  # hanya tampilkan ringkasan perubahan
+"""
+import os
+import sys
+import json
+import uuid
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger("uvicorn")
+
+# (doc_id, teks yang di-embed, metadata)
+SourceDocument = Tuple[str, str, Dict]
+
+# Tipe dokumen yang dikelola oleh sinkronisasi ini. Potongan PDF hasil
+# ingestion.py (type knowledge tanpa `topik`) tidak pernah disentuh.
+MANAGED_TYPES = {"tourism", "kuliner", "hotel", "transportation", "event", "knowledge"}
+INDEX_REVISION_FILE = "index_revision"
+
+
+def resolve_data_path(path: str) -> str:
+    return path if os.path.exists(path) else f"../{path}"
+
+
+def index_revision(persist_directory: str) -> str:
+    """Revisi index di disk ("" jika belum pernah ditandai)."""
+    try:
+        with open(os.path.join(persist_directory, INDEX_REVISION_FILE), "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def mark_index_changed(persist_directory: str):
+    """Tulis revisi baru (atomik) setelah dokumen di Vector DB berubah."""
+    path = os.path.join(persist_directory, INDEX_REVISION_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(uuid.uuid4().hex)
+    os.replace(tmp_path, path)
+
+
+def content_hash(text: str, metadata: Dict) -> str:
+    payload = json.dumps([text, metadata], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _row_key(row, position: int) -> str:
+    value = str(row.get("id", "")).strip()
+    return value if value else f"row{position}"
+
+
+def _finalize(doc_type: str, items: List[Tuple[str, str, Dict]]) -> List[SourceDocument]:
+    """Beri ID stabil + hash konten, dan pastikan ID unik dalam satu sumber."""
+    docs = []
+    seen: Dict[str, int] = {}
+    for key, text, meta in items:
+        doc_id = f"{doc_type}:{key}"
+        if doc_id in seen:
+            seen[doc_id] += 1
+            doc_id = f"{doc_id}#{seen[doc_id]}"
+        else:
+            seen[doc_id] = 0
+        meta = dict(meta)
+        meta["content_hash"] = content_hash(text, meta)
+        docs.append((doc_id, text, meta))
+    return docs
+
+
+# ==========================================
+#       BUILDER DOKUMEN PER SUMBER CSV
+# ==========================================
+def tourism_text(row) -> str:
+    """Teks dokumen tourism. Vektornya juga dipakai sebagai embedding SBERT (CBF/profil),
+    jadi Vector DB, cache disk, dan skrip evaluasi harus meng-embed teks yang sama."""
+    return (
+        f"Nama Wisata: {row['nama_wisata']}. "
+        f"Kategori: {row['kategori']}. "
+        f"Alamat: {row['alamat']}. "
+        f"Deskripsi: {row['deskripsi']}. "
+        f"Harga Tiket: {row['harga_tiket']}."
+    )
+
+
+def build_tourism_documents(df: pd.DataFrame) -> List[SourceDocument]:
+    items = []
+    for pos, (_, row) in enumerate(df.iterrows()):
+        meta = row.to_dict()
+        meta['type'] = 'tourism'
+        items.append((_row_key(row, pos), tourism_text(row), meta))
+    return _finalize("tourism", items)
+
+
+def build_kuliner_documents(df: pd.DataFrame) -> List[SourceDocument]:
+    items = []
+    for pos, (_, row) in enumerate(df.iterrows()):
+        content = (
+            f"Kuliner/Oleh-oleh: {row['nama']}. "
+            f"Kategori: {row['kategori']}. "
+            f"Alamat: {row['alamat']}. "
+            f"Menu Andalan: {row['menu']}. "
+            f"Harga: {row['harga']}."
+        )
+        items.append((_row_key(row, pos), content, {"type": "kuliner", "kategori": row['kategori'], "content": content}))
+    return _finalize("kuliner", items)
+
+
+def build_hotel_documents(df: pd.DataFrame) -> List[SourceDocument]:
+    items = []
+    for pos, (_, row) in enumerate(df.iterrows()):
+        content = (
+            f"Hotel/Penginapan: {row['nama']}. "
+            f"Kelas: {row['kelas']}. "
+            f"Alamat: {row['alamat']}. "
+            f"Fasilitas: {row['fasilitas']}. "
+            f"Estimasi Harga: {row['harga']}."
+        )
+        items.append((_row_key(row, pos), content, {"type": "hotel", "kategori": row['kelas'], "content": content}))
+    return _finalize("hotel", items)
+
+
+def build_transportation_documents(df: pd.DataFrame) -> List[SourceDocument]:
+    items = []
+    for pos, (_, row) in enumerate(df.iterrows()):
+        content = (
+            f"Transportasi: {row['kategori']} - {row['nama_layanan']}. "
+            f"Rute: {row['rute_relasi']}. "
+            f"Jadwal: {row['jam_berangkat']} sampai {row['jam_tiba']}. "
+            f"Kelas: {row['kelas_tipe']}. "
+            f"Estimasi Harga: {row['estimasi_harga']}. "
+            f"Sumber: {row['sumber']}."
+        )
+        items.append((_row_key(row, pos), content, {"type": "transportation", "kategori": row['kategori'], "content": content}))
+    return _finalize("transportation", items)
+
+
+def build_event_documents(df: pd.DataFrame) -> List[SourceDocument]:
+    items = []
+    for pos, (_, row) in enumerate(df.iterrows()):
+        content = (
+            f"Event/Budaya: {row['nama_event']}. "
+            f"Kategori: {row['kategori']}. "
+            f"Lokasi: {row['lokasi']}. "
+            f"Waktu Pelaksanaan: {row['waktu_pelaksanaan']}. "
+            f"Deskripsi: {row['deskripsi']}."
+        )
+        items.append((_row_key(row, pos), content, {"type": "event", "kategori": row['kategori'], "content": content}))
+    return _finalize("event", items)
+
+
+def build_knowledge_documents(df: pd.DataFrame) -> List[SourceDocument]:
+    items = []
+    for pos, (_, row) in enumerate(df.iterrows()):
+        combined = f"Topik: {row.get('topik', 'Umum')} | Tanya: {row.get('question', '')} | Jawab: {row.get('answer', '')}"
+        items.append((_row_key(row, pos), combined, {"type": "knowledge", "topik": row.get('topik', 'Umum'), "content": combined}))
+    return _finalize("knowledge", items)
+
+
+# (path CSV, builder) untuk sumber selain destinasi wisata
+CSV_SOURCES = [
+    ("data/kuliner.csv", build_kuliner_documents),
+    ("data/hotel.csv", build_hotel_documents),
+    ("data/transportasi.csv", build_transportation_documents),
+    ("data/event.csv", build_event_documents),
+    ("data/knowledge_base.csv", build_knowledge_documents),
+]
+
+
+def collect_source_documents(df_wisata: Optional[pd.DataFrame]) -> List[SourceDocument]:
+    """Kumpulkan dokumen dari destinasi wisata + semua CSV pendukung chatbot."""
+    docs: List[SourceDocument] = []
+    if df_wisata is not None:
+        docs.extend(build_tourism_documents(df_wisata))
+    for path, builder in CSV_SOURCES:
+        final_path = resolve_data_path(path)
+        if os.path.exists(final_path):
+            docs.extend(builder(pd.read_csv(final_path).fillna("")))
+    return docs
+
+
+# ==========================================
+#           ENGINE SINKRONISASI
+# ==========================================
+def _is_managed(doc_id: str, meta: Dict) -> bool:
+    """Dokumen milik sinkronisasi: punya hash konten, atau dokumen lama (ID acak)
+    dari startup sebelumnya dengan tipe yang sama."""
+    if meta.get("content_hash"):
+        return True
+    doc_type = meta.get("type")
+    if doc_type == "knowledge":
+        # Knowledge Base CSV selalu punya `topik`; potongan PDF tidak
+        return "topik" in meta
+    return doc_type in MANAGED_TYPES
+
+
+def plan_sync(vector_db, documents: List[SourceDocument]) -> Dict:
+    """Bandingkan isi Vector DB dengan dokumen sumber tanpa menulis apa pun."""
+    existing = vector_db._collection.get(include=["metadatas"])
+    existing_hash = {}
+    to_delete = []
+    wanted = {doc_id for doc_id, _, _ in documents}
+    for doc_id, meta in zip(existing.get("ids", []), existing.get("metadatas") or []):
+        meta = meta or {}
+        if doc_id in wanted:
+            existing_hash[doc_id] = meta.get("content_hash")
+        elif _is_managed(doc_id, meta):
+            to_delete.append(doc_id)
+
+    added = [d for d in documents if d[0] not in existing_hash]
+    updated = [d for d in documents if d[0] in existing_hash and existing_hash[d[0]] != d[2]["content_hash"]]
+    unchanged = len(documents) - len(added) - len(updated)
+    return {"added": added, "updated": updated, "deleted": to_delete, "unchanged": unchanged}
+
+
+def summarize(plan: Dict) -> Dict[str, int]:
+    return {
+        "added": len(plan["added"]),
+        "updated": len(plan["updated"]),
+        "deleted": len(plan["deleted"]),
+        "unchanged": plan["unchanged"],
+    }
+
+
+def sync_vector_index(vector_db, documents: List[SourceDocument], dry_run: bool = False,
+                      persist_directory: Optional[str] = None) -> Dict[str, int]:
+    """Upsert dokumen baru/berubah, hapus dokumen yang sudah tidak ada di sumber.
+    Dengan `persist_directory`, revisi index ditandai jika ada yang berubah."""
+    plan = plan_sync(vector_db, documents)
+    summary = summarize(plan)
+    if dry_run:
+        return summary
+
+    if plan["deleted"]:
+        vector_db.delete(ids=plan["deleted"])
+    changed = plan["added"] + plan["updated"]
+    if changed:
+        vector_db.add_texts(
+            texts=[text for _, text, _ in changed],
+            metadatas=[meta for _, _, meta in changed],
+            ids=[doc_id for doc_id, _, _ in changed],
+        )
+    if persist_directory and (changed or plan["deleted"]):
+        mark_index_changed(persist_directory)
+    logger.info(
+        f"🔄 Sinkronisasi Vector DB: +{summary['added']} baru, ~{summary['updated']} berubah, "
+        f"-{summary['deleted']} dihapus, {summary['unchanged']} tetap."
+    )
+    return summary
+
+
+if __name__ == "__main__":
+    import ai_services
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    import catalog
+    import models
+    from database import SessionLocal, engine
+
+    dry_run = "--dry-run" in sys.argv
+    # Katalog wisata dari tabel destinasi (sumber yang diubah admin), bukan CSV ekspor
+    models.Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        df = catalog.catalog_frame(catalog.load_rows(session))
+    finally:
+        session.close()
+    if df is None:
+        # Tabel masih kosong (backend belum pernah start): pakai CSV yang akan diimpor
+        csv_path = resolve_data_path("data/destinasi_final.csv")
+        if os.path.exists(csv_path):
+            df = catalog.catalog_frame(pd.read_csv(csv_path, dtype=str).to_dict("records"))
+
+    model = ai_services.create_embedding_model("sentence-transformers/all-MiniLM-L6-v2")
+    db = ai_services.open_vector_db("db_jembertrip_v2", model)
+    result = sync_vector_index(db, collect_source_documents(df), dry_run=dry_run, persist_directory="db_jembertrip_v2")
+    print(json.dumps(result, indent=2))
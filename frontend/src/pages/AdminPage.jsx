@@ -122,7 +122,7 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || "http://127.0.0.1:8000
 
   const fetchData = async () => {
     try {
-      const res = await axios.get(`${API_BASE_URL}/api/v1/list-wisata?limit=1000`);
+      const res = await axios.get(`${API_BASE_URL}/api/v1/list-wisata`);
       setWisataList(res.data.data);
       setFilteredList(res.data.data);
     } catch (err) {
@@ -211,32 +211,69 @@ function ChatPage() {
     setLoading(true);
 
     try {
-      const response = await axios.post(`${API_BASE_URL}/api/v1/chat`, {
-        question: userMessage.text,
-        session_id: currentSessionId,
-        language: language // Kirim bahasa yang tersimpan
-      }, {
-        headers: { 
+      // Streaming (SSE): token jawaban tampil begitu datang, kartu rekomendasi di akhir
+      const response = await fetch(`${API_BASE_URL}/api/v1/chat/stream`, {
+        method: 'POST',
+        headers: {
           Authorization: `Bearer ${token}`,
-          'Content-Type': 'application/json'
-        }
+          'Content-Type': 'application/json',
+          'ngrok-skip-browser-warning': '69420'
+        },
+        body: JSON.stringify({
+          question: userMessage.text,
+          session_id: currentSessionId,
+          language: language // Kirim bahasa yang tersimpan
+        })
       });
+      if (!response.ok) {
+        const httpError = new Error(`HTTP ${response.status}`);
+        httpError.response = { status: response.status };
+        throw httpError;
+      }
 
-      if (response.data.status === "success") {
-        if (!currentSessionId && response.data.session_id) {
-          setCurrentSessionId(response.data.session_id);
-          await loadChatSessions();
-        }
-
-        const aiMessage = { 
-            sender: 'ai', 
-            text: response.data.answer,
-            sources: response.data.sources,
-            recommendations: response.data.recommendations,
+      const updateAiMessage = (patch) => setMessages((prev) => {
+        const last = prev[prev.length - 1];
+        if (last?.streaming) return [...prev.slice(0, -1), { ...last, ...patch(last) }];
+        return [...prev, {
+            sender: 'ai', text: '', streaming: true, ...patch({ text: '' }),
             timestamp: new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
-        };
-        setMessages((prev) => [...prev, aiMessage]);
+        }];
+      });
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let finished = false;
+      while (!finished) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const dataLine = raw.match(/^data: (.*)$/m)?.[1];
+          if (!event || !dataLine) continue;
+          const data = JSON.parse(dataLine);
+
+          if (event === "meta") {
+            if (!currentSessionId && data.session_id) {
+              setCurrentSessionId(data.session_id);
+              loadChatSessions();
+            }
+          } else if (event === "token") {
+            updateAiMessage((msg) => ({ text: msg.text + data.text }));
+          } else if (event === "recommendations") {
+            updateAiMessage(() => ({ recommendations: data.data }));
+          } else if (event === "error") {
+            throw new Error(data.detail);
+          } else if (event === "done") {
+            finished = true;
+          }
+        }
       }
+      updateAiMessage(() => ({ streaming: false }));
     } catch (err) {
       console.error("Error Chat AI:", err);
       let errorText = "Waduh, sori banget Bro! Server lagi pusing nih 😵 Coba tanya lagi nanti ya.";
@@ -249,7 +286,7 @@ function ChatPage() {
           isError: true,
           timestamp: new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
       };
-      setMessages((prev) => [...prev, errorMessage]);
+      setMessages((prev) => [...prev.map((m) => (m.streaming ? { ...m, streaming: false } : m)), errorMessage]);
     } finally {
       setLoading(false);
     }
@@ -437,7 +474,7 @@ function ChatPage() {
                   ))}
               </AnimatePresence>
 
-              {loading && (
+              {loading && !messages[messages.length - 1]?.streaming && (
                   <motion.div initial={{ opacity: 0 }} animate={{ opacity: 1 }} className="flex justify-start w-full">
                       <div className="flex gap-3 max-w-[85%]">
                           <div className="w-8 h-8 rounded-full bg-secondary/10 border border-secondary/20 text-secondary flex-shrink-0 flex items-center justify-center mt-auto"><Bot size={16} /></div>
@@ -12,7 +12,7 @@ import { motion, AnimatePresence } from "framer-motion";
 
 // Konfigurasi URL API
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || "http://127.0.0.1:8000";
-const API_DESTINASI_URL = `${API_BASE_URL}/api/v1/list-wisata?limit=100&offset=0`;
+const API_DESTINASI_URL = `${API_BASE_URL}/api/v1/list-wisata?view=card`;
 
 function WisataHome() {
   // --- STATE ---